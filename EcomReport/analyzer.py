@@ -1,18 +1,79 @@
+import os
+import pathlib
+import sqlite3
+import threading
+
+import numpy as np
 import pandas as pd
 
+from processor import SQLITE_TABLE
+from partitioned import parallel_group_sum
+from sketches import DistinctSet, HyperLogLog, SpaceSaving, TDigest
+
+VALID_PERIODS = ['D', 'W', 'M', 'Q', 'Y']
+
+
+def _validate_n_top(n_top):
+    """Raises ValueError unless n_top is a positive integer."""
+    if not isinstance(n_top, int) or n_top <= 0:
+        raise ValueError("n_top must be a positive integer.")
+
+
+def _validate_period(period):
+    """Raises ValueError unless period is one of VALID_PERIODS."""
+    if period not in VALID_PERIODS:
+        raise ValueError(f"Invalid period '{period}'. Choose from: {', '.join(VALID_PERIODS)}")
+
+
+def _sketch_error_bounds(order_sketch, product_sketch, value_digest):
+    """
+    Describes the error of the approximate results, for display in the report: the
+    standard error of the order count and the maximum overestimation of product totals.
+    A t-digest gives no such bound, so quantiles report the target rank accuracy it was built for.
+    """
+    return {
+        'total_orders_relative_error': order_sketch.relative_error,
+        'top_products_max_error': product_sketch.max_error,
+        'quantile_rank_target': value_digest.relative_error
+    }
+
+
+def _plain_index(series):
+    """Converts a categorical group index back to plain labels, so results look the same whatever the key dtype."""
+    if isinstance(series.index, pd.CategoricalIndex):
+        series.index = series.index.astype(object)
+    return series
+
+
 class DataAnalyzer:
     """
     Performs statistical and business analysis on a sales DataFrame.
     This class is independent of input or output formats, focusing solely on extracting insights from data.
     """
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, approximate: bool = False, relative_error: float = 0.01,
+                 workers: int = 1):
+        """
+        Args:
+            df (pd.DataFrame): Processed sales data, regular or compact (money as
+                'valor_total_cents', see DataProcessor.process_data(compact=True)).
+            approximate (bool): Use mergeable sketches (HyperLogLog for distinct orders,
+                Space-Saving for top products, t-digest for quantiles) instead of exact aggregations.
+            relative_error (float): Target error of the sketches in approximate mode.
+            workers (int, optional): Processes used to group large frames by product and
+                category (see partitioned.parallel_group_sum). None uses one per core; 1 stays serial.
+        """
         # Validate that the input is a pandas DataFrame
         if not isinstance(df, pd.DataFrame):
             raise TypeError("Input to DataAnalyzer must be a pandas DataFrame.")
         self.df = df
 
+        # Compact frames store money as integer cents; results are always in currency units
+        self._value_column, self._value_scale = 'valor_total', 1
+        if 'valor_total' not in df.columns and 'valor_total_cents' in df.columns:
+            self._value_column, self._value_scale = 'valor_total_cents', 100
+
         # Validate required columns
-        required_columns = ['valor_total', 'id_pedido', 'data_do_pedido']
+        required_columns = [self._value_column, 'id_pedido', 'data_do_pedido']
         missing_columns = [col for col in required_columns if col not in self.df.columns]
         if missing_columns:
             raise ValueError(f"DataFrame is missing required columns: {', '.join(missing_columns)}")
@@ -21,6 +82,101 @@ class DataAnalyzer:
         if not pd.api.types.is_datetime64_any_dtype(self.df['data_do_pedido']):
             self.df['data_do_pedido'] = pd.to_datetime(self.df['data_do_pedido'])
 
+        # Time roll-up cube: built once from the rows, every period is derived from it
+        self._daily = None
+        self._daily_breakdowns = {}
+        self._period_cache = {}
+
+        # Approximate mode: sketches are built once, on first use
+        self.approximate = approximate
+        self.relative_error = relative_error
+        self._sketches = None
+
+        # Group-by of product and category on several processes for large frames
+        self.workers = workers
+
+        # The memoized cube, breakdowns, periods and sketches are built by whichever thread
+        # asks first (e.g. concurrent requests in server.py); the lock makes that happen once
+        self._lock = threading.RLock()
+
+    def _money(self, values):
+        """Converts sums of the value column (float64, float32 or cents) to float64 currency units."""
+        if isinstance(values, (pd.Series, pd.DataFrame)):
+            values = values.astype('float64')
+            values = values / self._value_scale if self._value_scale != 1 else values
+            return values.rename('valor_total') if isinstance(values, pd.Series) else values
+        values = np.float64(values)
+        return values / self._value_scale if self._value_scale != 1 else values
+
+    def _group_sum(self, key):
+        """Sums the value column by key, on several processes unless workers is 1."""
+        if self.workers == 1:
+            return _plain_index(self.df.groupby(key, observed=True)[self._value_column].sum())
+        return parallel_group_sum(self.df[key], self.df[self._value_column], self.workers)
+
+    def _order_days(self):
+        """Returns the order dates truncated to the day, the grain of the roll-up cube."""
+        return self.df['data_do_pedido'].dt.normalize()
+
+    def _daily_cube(self, with_orders: bool = False) -> pd.DataFrame:
+        """
+        Builds (once) the daily aggregate with revenue and, on first request, order count per day.
+        Coarser periods are resampled from it in O(days) instead of O(rows).
+
+        Args:
+            with_orders (bool): Make sure the (more expensive) 'pedidos' column is present.
+
+        Returns:
+            pd.DataFrame: Daily table indexed by 'data_do_pedido' with 'valor_total' (and 'pedidos').
+        """
+        with self._lock:
+            if self._daily is None:
+                self._daily = self._money(self.df.groupby(self._order_days())[self._value_column].sum()).to_frame()
+            if with_orders and 'pedidos' not in self._daily.columns:
+                self._daily['pedidos'] = self.df.groupby(self._order_days())['id_pedido'].nunique()
+            return self._daily
+
+    def _daily_breakdown(self, by: str) -> pd.DataFrame:
+        """
+        Builds (once per column) the daily revenue broken down by product or category.
+
+        Returns:
+            pd.DataFrame: Days as rows, one column per product/category.
+        """
+        with self._lock:
+            if by not in self._daily_breakdowns:
+                daily = self._money(self.df.groupby([self._order_days(), by], observed=True)[self._value_column].sum())
+                breakdown = daily.unstack(fill_value=0)
+                if isinstance(breakdown.columns, pd.CategoricalIndex):
+                    breakdown.columns = breakdown.columns.astype(object)
+                self._daily_breakdowns[by] = breakdown
+            return self._daily_breakdowns[by]
+
+    def _get_sketches(self):
+        """Builds (once) the sketches used in approximate mode."""
+        with self._lock:
+            if self._sketches is None:
+                order_sketch = HyperLogLog(self.relative_error)
+                order_sketch.update(self.df['id_pedido'])
+                product_sketch = SpaceSaving(self.relative_error)
+                values = self._money(self.df[self._value_column])
+                product_sketch.update(self.df['id_produto'], values)
+                value_digest = TDigest(self.relative_error)
+                value_digest.update(values)
+                self._sketches = (order_sketch, product_sketch, value_digest)
+            return self._sketches
+
+    def get_error_bounds(self):
+        """
+        Describes the error of the approximate results.
+
+        Returns:
+            dict: Error of each approximate metric, or an empty dict in exact mode.
+        """
+        if not self.approximate:
+            return {}
+        return _sketch_error_bounds(*self._get_sketches())
+
     def get_summary_stats(self):
         """
         Calculates high-level metrics about sales.
@@ -33,8 +189,11 @@ class DataAnalyzer:
             return {'total_revenue': 0, 'total_orders': 0, 'average_order_value': 0}
 
         # Calculate total revenue and number of unique orders
-        total_revenue = self.df['valor_total'].sum()
-        total_orders = self.df['id_pedido'].nunique()
+        total_revenue = self._money(self.df[self._value_column].sum())
+        if self.approximate:
+            total_orders = self._get_sketches()[0].count()
+        else:
+            total_orders = self.df['id_pedido'].nunique()
         
         # Compute average order value, handling division by zero
         average_order_value = total_revenue / total_orders if total_orders > 0 else 0
@@ -56,12 +215,30 @@ class DataAnalyzer:
             pd.DataFrame: A DataFrame with the top products and their total sales values.
         """
         # Validate n_top parameter
-        if not isinstance(n_top, int) or n_top <= 0:
-            raise ValueError("n_top must be a positive integer.")
+        _validate_n_top(n_top)
+
+        if self.approximate:
+            sales_by_product = self._get_sketches()[1].top(n_top).rename_axis('id_produto').rename('valor_total')
+            return sales_by_product.reset_index()
 
         # Group by product ID and sum total sales, then select top N
-        sales_by_product = self.df.groupby('id_produto')['valor_total'].sum().nlargest(n_top)
-        return sales_by_product.reset_index()
+        sales_by_product = self._group_sum('id_produto').nlargest(n_top)
+        return self._money(sales_by_product).reset_index()
+
+    def get_order_value_quantiles(self, quantiles=(0.5, 0.9, 0.99)) -> dict:
+        """
+        Calculates order-value quantiles (exact, or from the t-digest in approximate mode).
+
+        Args:
+            quantiles (iterable): Quantiles between 0 and 1.
+
+        Returns:
+            dict: Quantile -> order value.
+        """
+        if self.approximate:
+            value_digest = self._get_sketches()[2]
+            return {q: value_digest.quantile(q) for q in quantiles}
+        return {q: float(self._money(self.df[self._value_column].quantile(q))) for q in quantiles}
 
     def get_sales_by_period(self, period: str = 'M') -> pd.DataFrame:
         """
@@ -74,16 +251,45 @@ class DataAnalyzer:
             pd.DataFrame: A DataFrame with total revenue by period.
         """
         # Validate period parameter
-        valid_periods = ['D', 'W', 'M', 'Q', 'Y']
-        if period not in valid_periods:
-            raise ValueError(f"Invalid period '{period}'. Choose from: {', '.join(valid_periods)}")
+        _validate_period(period)
 
-        # Set 'data_do_pedido' as index for time-based resampling
-        df_indexed = self.df.set_index('data_do_pedido')
-        
-        # Aggregate sales by period efficiently
-        sales_by_period = df_indexed['valor_total'].resample(period).sum()
-        return sales_by_period.reset_index()
+        # Derive the period from the daily cube and memoize it, so switching periods stays cheap
+        with self._lock:
+            if period not in self._period_cache:
+                sales_by_period = self._daily_cube()['valor_total'].resample(period).sum()
+                self._period_cache[period] = sales_by_period.reset_index()
+            return self._period_cache[period].copy()
+
+    def get_orders_by_period(self, period: str = 'M') -> pd.DataFrame:
+        """
+        Counts orders by time period, derived from the daily cube.
+
+        Args:
+            period (str): Time period for grouping orders. Valid options are 'D', 'W', 'M', 'Q', 'Y'.
+
+        Returns:
+            pd.DataFrame: A DataFrame with the number of orders ('pedidos') by period.
+        """
+        _validate_period(period)
+        return self._daily_cube(with_orders=True)['pedidos'].resample(period).sum().reset_index()
+
+    def get_period_breakdown(self, period: str = 'M', by: str = 'categoria') -> pd.DataFrame:
+        """
+        Calculates total sales by time period and product or category, derived from the daily cube.
+
+        Args:
+            period (str): Time period for grouping sales. Valid options are 'D', 'W', 'M', 'Q', 'Y'.
+            by (str): 'categoria' or 'id_produto'.
+
+        Returns:
+            pd.DataFrame: One row per period, one column per category/product.
+        """
+        _validate_period(period)
+        if by not in ('categoria', 'id_produto'):
+            raise ValueError("by must be 'categoria' or 'id_produto'.")
+        if by not in self.df.columns:
+            return pd.DataFrame()
+        return self._daily_breakdown(by).resample(period).sum()
 
     def get_sales_by_category(self) -> pd.DataFrame:
         """
@@ -97,5 +303,448 @@ class DataAnalyzer:
             return pd.DataFrame(columns=['categoria', 'valor_total'])
 
         # Group by category and sum total sales
-        sales_by_category = self.df.groupby('categoria')['valor_total'].sum()
-        return sales_by_category.reset_index()
\ No newline at end of file
+        sales_by_category = self._group_sum('categoria')
+        return self._money(sales_by_category).reset_index()
+
+
+class SalesAggregates:
+    """
+    Mergeable partial aggregates of a sales dataset.
+    Chunks are folded in with `update` and partials built elsewhere (another file,
+    another process) are combined with `merge`, so memory depends on the number of
+    distinct orders, products, categories and days, never on the number of rows.
+    The distinct orders, usually the largest of these, are kept in a compact
+    DistinctSet (8 bytes per order for integer ids), so tens of millions of orders
+    fit in a few hundred MB. For more, approximate mode keeps the distinct orders and
+    the per-product sums in fixed-size sketches, so memory stays bounded for any
+    number of keys.
+    """
+    def __init__(self, approximate: bool = False, relative_error: float = 0.01):
+        """
+        Args:
+            approximate (bool): Keep distinct orders in a HyperLogLog and product sums in a Space-Saving summary.
+            relative_error (float): Target error of the sketches.
+        """
+        self.approximate = approximate
+        self.relative_error = relative_error
+        self.rows = 0
+        self.total_revenue = 0.0
+        self.order_ids = None if approximate else DistinctSet()
+        self.order_sketch = HyperLogLog(relative_error) if approximate else None
+        self.product_sketch = SpaceSaving(relative_error) if approximate else None
+        # Order-value quantiles can only be streamed approximately, so the digest is always kept
+        self.value_digest = TDigest(relative_error)
+        self.has_category = False
+        self.by_product = pd.Series(dtype='float64', name='valor_total')
+        self.by_category = pd.Series(dtype='float64', name='valor_total')
+        self.by_day = pd.Series(dtype='float64', index=pd.DatetimeIndex([]), name='valor_total')
+
+    @staticmethod
+    def _group_sum(chunk, key):
+        """Sums valor_total by key, with a plain (non-categorical) index so partials align."""
+        return _plain_index(chunk.groupby(key, observed=True)['valor_total'].sum())
+
+    @staticmethod
+    def _add(left, right):
+        """Sums two keyed partials, treating missing keys as zero."""
+        if left.empty:
+            return right
+        if right.empty:
+            return left
+        return left.add(right, fill_value=0)
+
+    def update(self, chunk: pd.DataFrame):
+        """
+        Folds a cleaned chunk (as yielded by DataProcessor.iter_chunks) into the partials.
+
+        Args:
+            chunk (pd.DataFrame): Chunk with standardized column names and types.
+        """
+        if chunk.empty:
+            return
+
+        self.rows += len(chunk)
+        self.total_revenue += chunk['valor_total'].sum()
+        self.value_digest.update(chunk['valor_total'])
+
+        if self.approximate:
+            self.order_sketch.update(chunk['id_pedido'])
+            self.product_sketch.update(chunk['id_produto'], chunk['valor_total'])
+        else:
+            self.order_ids.update(chunk['id_pedido'].unique())
+            self.by_product = self._add(self.by_product, self._group_sum(chunk, 'id_produto'))
+
+        days = chunk['data_do_pedido'].dt.normalize()
+        self.by_day = self._add(self.by_day, chunk.groupby(days)['valor_total'].sum())
+
+        if 'categoria' in chunk.columns:
+            self.has_category = True
+            self.by_category = self._add(self.by_category, self._group_sum(chunk, 'categoria'))
+
+    def merge(self, other: 'SalesAggregates'):
+        """
+        Merges another set of partials into this one.
+
+        Args:
+            other (SalesAggregates): Partials built from a disjoint part of the data.
+
+        Returns:
+            SalesAggregates: self, to allow chaining.
+        """
+        if other.approximate != self.approximate:
+            raise ValueError("Exact and approximate aggregates cannot be merged.")
+
+        self.rows += other.rows
+        self.total_revenue += other.total_revenue
+        self.value_digest.merge(other.value_digest)
+        if self.approximate:
+            self.order_sketch.merge(other.order_sketch)
+            self.product_sketch.merge(other.product_sketch)
+        else:
+            self.order_ids.merge(other.order_ids)
+            self.by_product = self._add(self.by_product, other.by_product)
+        self.has_category = self.has_category or other.has_category
+        self.by_category = self._add(self.by_category, other.by_category)
+        self.by_day = self._add(self.by_day, other.by_day)
+        return self
+
+
+class StreamingAnalyzer:
+    """
+    Out-of-core counterpart of DataAnalyzer.
+    Answers the same queries from SalesAggregates, so the source file never has
+    to fit in memory. Results match the ones DataAnalyzer returns for the same data.
+    """
+    def __init__(self, aggregates: SalesAggregates):
+        if not isinstance(aggregates, SalesAggregates):
+            raise TypeError("Input to StreamingAnalyzer must be a SalesAggregates instance.")
+        self.aggregates = aggregates
+        self._period_cache = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_chunks(cls, chunks, approximate: bool = False, relative_error: float = 0.01):
+        """
+        Builds the analyzer by folding an iterable of cleaned chunks.
+
+        Args:
+            chunks (iterable): Cleaned DataFrames, e.g. DataProcessor.iter_chunks().
+            approximate (bool): Use sketches for distinct orders and top products.
+            relative_error (float): Target error of the sketches.
+
+        Returns:
+            StreamingAnalyzer: Analyzer over the merged partials.
+        """
+        aggregates = SalesAggregates(approximate, relative_error)
+        for chunk in chunks:
+            aggregates.update(chunk)
+        return cls(aggregates)
+
+    def get_summary_stats(self):
+        """
+        Calculates high-level metrics about sales.
+
+        Returns:
+            dict: A dictionary containing total revenue, total orders, and average order value.
+        """
+        if self.aggregates.rows == 0:
+            return {'total_revenue': 0, 'total_orders': 0, 'average_order_value': 0}
+
+        total_revenue = self.aggregates.total_revenue
+        if self.aggregates.approximate:
+            total_orders = self.aggregates.order_sketch.count()
+        else:
+            total_orders = self.aggregates.order_ids.count()
+        average_order_value = total_revenue / total_orders if total_orders > 0 else 0
+
+        return {
+            'total_revenue': total_revenue,
+            'total_orders': total_orders,
+            'average_order_value': average_order_value
+        }
+
+    def get_sales_by_product(self, n_top: int = 5) -> pd.DataFrame:
+        """
+        Identifies the top N best-selling products based on total sales value.
+
+        Args:
+            n_top (int): Number of top products to return. Defaults to 5.
+
+        Returns:
+            pd.DataFrame: A DataFrame with the top products and their total sales values.
+        """
+        _validate_n_top(n_top)
+
+        if self.aggregates.approximate:
+            sales_by_product = self.aggregates.product_sketch.top(n_top).rename_axis('id_produto').rename('valor_total')
+            return sales_by_product.reset_index()
+
+        # Sort by key first so ties are broken the same way as groupby().nlargest()
+        by_product = self.aggregates.by_product.sort_index().rename_axis('id_produto')
+        return by_product.nlargest(n_top).reset_index()
+
+    def get_error_bounds(self):
+        """
+        Describes the error of the approximate results.
+
+        Returns:
+            dict: Error of each approximate metric, or an empty dict in exact mode.
+        """
+        if not self.aggregates.approximate:
+            return {}
+        aggregates = self.aggregates
+        return _sketch_error_bounds(aggregates.order_sketch, aggregates.product_sketch, aggregates.value_digest)
+
+    def get_order_value_quantiles(self, quantiles=(0.5, 0.9, 0.99)) -> dict:
+        """
+        Estimates order-value quantiles from the t-digest (always approximate when streaming).
+
+        Args:
+            quantiles (iterable): Quantiles between 0 and 1.
+
+        Returns:
+            dict: Quantile -> order value.
+        """
+        return {q: self.aggregates.value_digest.quantile(q) for q in quantiles}
+
+    def get_sales_by_period(self, period: str = 'M') -> pd.DataFrame:
+        """
+        Calculates total sales by time period (e.g., 'D' for day, 'W' for week, 'M' for month).
+
+        Args:
+            period (str): Time period for grouping sales. Valid options are 'D', 'W', 'M', 'Q', 'Y'.
+
+        Returns:
+            pd.DataFrame: A DataFrame with total revenue by period.
+        """
+        _validate_period(period)
+
+        # by_day already is the daily roll-up; memoize each period derived from it
+        with self._lock:
+            if period not in self._period_cache:
+                by_day = self.aggregates.by_day.sort_index().rename_axis('data_do_pedido')
+                self._period_cache[period] = by_day.resample(period).sum().reset_index()
+            return self._period_cache[period].copy()
+
+    def get_sales_by_category(self) -> pd.DataFrame:
+        """
+        Calculates total sales by product category, if category information is available.
+
+        Returns:
+            pd.DataFrame: A DataFrame with total sales by category, or empty if 'categoria' column is missing.
+        """
+        if not self.aggregates.has_category:
+            return pd.DataFrame(columns=['categoria', 'valor_total'])
+
+        return self.aggregates.by_category.sort_index().rename_axis('categoria').reset_index()
+
+
+class SqlAnalyzer:
+    """
+    Counterpart of DataAnalyzer over a SQLite database written by DataProcessor.to_sqlite.
+    Aggregations are pushed down as SQL, optionally bounded to a date range that the
+    index on 'data_do_pedido' narrows down, so only their results are loaded into
+    memory. Periods are resampled from a daily roll-up, as in DataAnalyzer.
+    """
+    def __init__(self, db_path, start=None, end=None, table: str = SQLITE_TABLE):
+        """
+        Args:
+            db_path (str): SQLite database file.
+            start (str or datetime, optional): First day to analyze (included).
+            end (str or datetime, optional): Last day to analyze (included).
+            table (str): Table written by DataProcessor.to_sqlite.
+        """
+        if not os.path.isfile(db_path):
+            raise FileNotFoundError(f"Database not found: {db_path}")
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name '{table}'.")
+        # Read-only: queries can never modify the stored history
+        self.conn = sqlite3.connect(f"{pathlib.Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+        self.table = table
+
+        # Date bounds as seconds since the epoch, the stored representation
+        conditions, self._params = [], []
+        if start is not None:
+            conditions.append('data_do_pedido >= ?')
+            self._params.append(int(pd.Timestamp(start).normalize().timestamp()))
+        if end is not None:
+            conditions.append('data_do_pedido < ?')
+            self._params.append(int((pd.Timestamp(end).normalize() + pd.Timedelta(days=1)).timestamp()))
+        self._conditions = conditions
+
+        self._daily = None
+        self._period_cache = {}
+
+    def close(self):
+        self.conn.close()
+
+    def _sql(self, select, condition=None, tail=''):
+        """Builds 'SELECT <select> FROM <table> WHERE <date bounds> <tail>'."""
+        conditions = self._conditions + ([condition] if condition else [])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return f"SELECT {select} FROM {self.table} {where} {tail}"
+
+    def _query(self, select, condition=None, tail='', params=()):
+        """Runs a query built by _sql and returns the result as a DataFrame."""
+        return pd.read_sql_query(self._sql(select, condition, tail), self.conn, params=[*self._params, *params])
+
+    def _daily_rollup(self, select, group=''):
+        """Aggregates per day (and optionally another column); returns the result with a datetime 'data_do_pedido'."""
+        day = "date(data_do_pedido, 'unixepoch')"
+        daily = self._query(f"{day} AS data_do_pedido{group and ', ' + group}, {select}",
+                            tail=f"GROUP BY {day}{group and ', ' + group}")
+        daily['data_do_pedido'] = pd.to_datetime(daily['data_do_pedido'])
+        return daily
+
+    def _daily_cube(self, with_orders: bool = False) -> pd.DataFrame:
+        """
+        Builds (once) the daily revenue and, on first request, order count per day.
+
+        Returns:
+            pd.DataFrame: Daily table indexed by 'data_do_pedido' with 'valor_total' (and 'pedidos').
+        """
+        if self._daily is None:
+            self._daily = self._daily_rollup('SUM(valor_total) AS valor_total').set_index('data_do_pedido')
+        if with_orders and 'pedidos' not in self._daily.columns:
+            orders = self._daily_rollup('COUNT(DISTINCT id_pedido) AS pedidos').set_index('data_do_pedido')
+            self._daily['pedidos'] = orders['pedidos']
+        return self._daily
+
+    def get_error_bounds(self):
+        """SQL aggregations are exact; there are no error bounds to report."""
+        return {}
+
+    def get_summary_stats(self):
+        """
+        Calculates high-level metrics about sales.
+
+        Returns:
+            dict: A dictionary containing total revenue, total orders, and average order value.
+        """
+        rows, total_revenue, total_orders = self._query(
+            'COUNT(*), SUM(valor_total), COUNT(DISTINCT id_pedido)').iloc[0].tolist()
+        if rows == 0:
+            return {'total_revenue': 0, 'total_orders': 0, 'average_order_value': 0}
+        # The row comes back as floats; counts are integers in every analyzer
+        total_orders = int(total_orders)
+
+        average_order_value = total_revenue / total_orders if total_orders > 0 else 0
+        return {
+            'total_revenue': total_revenue,
+            'total_orders': total_orders,
+            'average_order_value': average_order_value
+        }
+
+    def get_sales_by_product(self, n_top: int = 5) -> pd.DataFrame:
+        """
+        Identifies the top N best-selling products based on total sales value.
+
+        Args:
+            n_top (int): Number of top products to return. Defaults to 5.
+
+        Returns:
+            pd.DataFrame: A DataFrame with the top products and their total sales values.
+        """
+        _validate_n_top(n_top)
+        # Ties are broken by product id, like groupby().nlargest()
+        return self._query('id_produto, SUM(valor_total) AS valor_total',
+                           tail='GROUP BY id_produto ORDER BY valor_total DESC, id_produto LIMIT ?', params=[n_top])
+
+    def get_order_value_quantiles(self, quantiles=(0.5, 0.9, 0.99)) -> dict:
+        """
+        Calculates exact order-value quantiles (linear interpolation, as pandas does).
+
+        Args:
+            quantiles (iterable): Quantiles between 0 and 1.
+
+        Returns:
+            dict: Quantile -> order value.
+        """
+        rows = int(self._query('COUNT(*)').iloc[0, 0])
+        if rows == 0:
+            return {q: np.nan for q in quantiles}
+
+        # Positions of the two values around each quantile, in sorted order
+        positions = {q: q * (rows - 1) for q in quantiles}
+        needed = {index for position in positions.values()
+                  for index in (int(position), min(int(position) + 1, rows - 1))}
+
+        # One sort for all quantiles: the sorted values are streamed from the cursor
+        # and only the needed ones are kept, stopping after the last of them
+        values = {}
+        last = max(needed)
+        cursor = self.conn.execute(self._sql('valor_total', tail='ORDER BY valor_total'), self._params)
+        try:
+            for index, (value,) in enumerate(cursor):
+                if index in needed:
+                    values[index] = value
+                    if index == last:
+                        break
+        finally:
+            cursor.close()
+
+        result = {}
+        for q, position in positions.items():
+            below = int(position)
+            low, high = values[below], values[min(below + 1, rows - 1)]
+            result[q] = float(low + (high - low) * (position - below))
+        return result
+
+    def get_sales_by_period(self, period: str = 'M') -> pd.DataFrame:
+        """
+        Calculates total sales by time period (e.g., 'D' for day, 'W' for week, 'M' for month).
+
+        Args:
+            period (str): Time period for grouping sales. Valid options are 'D', 'W', 'M', 'Q', 'Y'.
+
+        Returns:
+            pd.DataFrame: A DataFrame with total revenue by period.
+        """
+        _validate_period(period)
+        if period not in self._period_cache:
+            sales_by_period = self._daily_cube()['valor_total'].resample(period).sum()
+            self._period_cache[period] = sales_by_period.reset_index()
+        return self._period_cache[period].copy()
+
+    def get_orders_by_period(self, period: str = 'M') -> pd.DataFrame:
+        """
+        Counts orders by time period, derived from the daily roll-up.
+
+        Args:
+            period (str): Time period for grouping orders. Valid options are 'D', 'W', 'M', 'Q', 'Y'.
+
+        Returns:
+            pd.DataFrame: A DataFrame with the number of orders ('pedidos') by period.
+        """
+        _validate_period(period)
+        return self._daily_cube(with_orders=True)['pedidos'].resample(period).sum().reset_index()
+
+    def get_period_breakdown(self, period: str = 'M', by: str = 'categoria') -> pd.DataFrame:
+        """
+        Calculates total sales by time period and product or category.
+
+        Args:
+            period (str): Time period for grouping sales. Valid options are 'D', 'W', 'M', 'Q', 'Y'.
+            by (str): 'categoria' or 'id_produto'.
+
+        Returns:
+            pd.DataFrame: One row per period, one column per category/product.
+        """
+        _validate_period(period)
+        if by not in ('categoria', 'id_produto'):
+            raise ValueError("by must be 'categoria' or 'id_produto'.")
+        daily = self._daily_rollup('SUM(valor_total) AS valor_total', group=by).dropna(subset=[by])
+        if daily.empty:
+            return pd.DataFrame()
+        breakdown = daily.pivot(index='data_do_pedido', columns=by, values='valor_total').fillna(0)
+        return breakdown.resample(period).sum()
+
+    def get_sales_by_category(self) -> pd.DataFrame:
+        """
+        Calculates total sales by product category, if category information is available.
+
+        Returns:
+            pd.DataFrame: A DataFrame with total sales by category, or empty if no row has a category.
+        """
+        return self._query('categoria, SUM(valor_total) AS valor_total', condition='categoria IS NOT NULL',
+                           tail='GROUP BY categoria ORDER BY categoria')
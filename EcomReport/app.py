@@ -2,12 +2,32 @@ import tkinter as tk
 from tkinter import filedialog, messagebox
 from PIL import Image, ImageTk
 import os
+import queue
+import shutil
+import tempfile
+import threading
 import pandas as pd
 
 # Import classes from our modules
-from processor import DataProcessor
+from processor import DataProcessor, STREAMING_THRESHOLD_BYTES
 from analyzer import DataAnalyzer
 from reporter import SalesReporter
+from cache import ChartCache, ProcessedDataCache
+from incremental import IncrementalAnalyzer
+from preview import CsvPager
+from tracing import NULL_TRACE, PipelineTrace
+
+# Interval (ms) at which the GUI drains progress events from the worker thread
+POLL_INTERVAL_MS = 100
+# Lines shown at once in the CSV preview; only this window is read from disk
+PREVIEW_LINES = 100
+# Lines moved per mouse wheel step in the preview
+WHEEL_LINES = 3
+
+
+class ReportCancelled(Exception):
+    """Raised inside the worker thread when the user cancels report generation."""
+
 
 class SalesApp:
     """
@@ -26,7 +46,23 @@ class SalesApp:
 
         self.filepath = None
         self.report_image = None
-        self.report_path = None  # Store report path for PDF saving
+        self.report_path = None  # Report image shown in the right pane
+        self.report_pdf_path = None  # Vector PDF written alongside it, copied on "Save as PDF"
+        # Every run writes its report files here; the folder is deleted when the window closes
+        self.report_dir = tempfile.TemporaryDirectory(prefix='ecomreport_', ignore_cleanup_errors=True)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.cache = ProcessedDataCache()
+        self.chart_cache = ChartCache()
+
+        # Background report generation: the worker only talks to the GUI through this queue
+        self.events = queue.Queue()
+        self.worker = None
+        self.cancel_event = threading.Event()
+        self.chart_labels = []
+
+        # Paged CSV preview: the pager maps the file, preview_offset is the first visible line
+        self.pager = None
+        self.preview_offset = 0
 
         self._create_widgets()
 
@@ -45,6 +81,16 @@ class SalesApp:
         self.btn_save_pdf = tk.Button(control_frame, text="3. Save as PDF", command=self._save_as_pdf, state=tk.DISABLED)
         self.btn_save_pdf.pack(side=tk.LEFT, padx=10)
 
+        self.btn_cancel = tk.Button(control_frame, text="Cancel", command=self._cancel_report, state=tk.DISABLED)
+        self.btn_cancel.pack(side=tk.LEFT, padx=10)
+
+        self.btn_clear_cache = tk.Button(control_frame, text="Clear Cache", command=self._clear_cache)
+        self.btn_clear_cache.pack(side=tk.LEFT, padx=10)
+
+        # When checked, the time spent in each pipeline stage is shown in the status bar
+        self.trace_enabled = tk.BooleanVar(value=False)
+        tk.Checkbutton(control_frame, text="Show stage timings", variable=self.trace_enabled).pack(side=tk.LEFT, padx=10)
+
         # Status bar label
         self.status_label = tk.Label(self.root, text="Waiting for file selection...", bd=1, relief=tk.SUNKEN, anchor=tk.W)
         self.status_label.pack(fill=tk.X, padx=5, pady=5)
@@ -57,16 +103,27 @@ class SalesApp:
         preview_frame = tk.Frame(paned_window)
         paned_window.add(preview_frame)
 
-        preview_label = tk.Label(preview_frame, text="CSV File Preview (First 100 Lines):")
-        preview_label.pack()
+        self.preview_label = tk.Label(preview_frame, text="CSV File Preview:")
+        self.preview_label.pack()
+
+        # Jump to any line of the file (available as soon as the line index reaches it)
+        goto_frame = tk.Frame(preview_frame)
+        goto_frame.pack(fill=tk.X)
+        self.goto_entry = tk.Entry(goto_frame, width=12)
+        self.goto_entry.pack(side=tk.LEFT, padx=5)
+        self.goto_entry.bind('<Return>', lambda event: self._goto_line())
+        tk.Button(goto_frame, text="Go to line", command=self._goto_line).pack(side=tk.LEFT)
 
-        # Text widget with scrollbars for preview
+        # Text widget with scrollbars for preview. It only holds the visible window of the
+        # file, so the vertical scrollbar and the mouse wheel move through the file itself.
         self.preview_text = tk.Text(preview_frame, wrap=tk.NONE)
         self.preview_text.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        self.preview_text.bind('<MouseWheel>', self._on_preview_wheel)
+        self.preview_text.bind('<Button-4>', self._on_preview_wheel)
+        self.preview_text.bind('<Button-5>', self._on_preview_wheel)
 
-        self.scrollbar_y = tk.Scrollbar(preview_frame, command=self.preview_text.yview)
+        self.scrollbar_y = tk.Scrollbar(preview_frame, command=self._scroll_preview)
         self.scrollbar_y.pack(side=tk.RIGHT, fill=tk.Y)
-        self.preview_text.config(yscrollcommand=self.scrollbar_y.set)
 
         self.scrollbar_x = tk.Scrollbar(preview_frame, command=self.preview_text.xview, orient=tk.HORIZONTAL)
         self.scrollbar_x.pack(side=tk.BOTTOM, fill=tk.X)
@@ -75,6 +132,7 @@ class SalesApp:
         # Right frame for report image
         report_frame = tk.Frame(paned_window)
         paned_window.add(report_frame)
+        self.report_frame = report_frame
 
         self.report_canvas = tk.Label(report_frame)
         self.report_canvas.pack(pady=10, padx=10, expand=True, fill=tk.BOTH)
@@ -95,7 +153,7 @@ class SalesApp:
                 self.status_label.config(text="Invalid file format. Please select a CSV file.")
                 self.btn_generate.config(state=tk.DISABLED)
                 self.btn_save_pdf.config(state=tk.DISABLED)
-                self.preview_text.delete('1.0', tk.END)
+                self._close_preview()
                 return
             self.status_label.config(text=f"Selected file: {os.path.basename(self.filepath)}")
             self.btn_generate.config(state=tk.NORMAL)
@@ -105,71 +163,282 @@ class SalesApp:
             self.status_label.config(text="File selection canceled.")
             self.btn_generate.config(state=tk.DISABLED)
             self.btn_save_pdf.config(state=tk.DISABLED)
-            self.preview_text.delete('1.0', tk.END)
+            self._close_preview()
 
     def _display_preview(self):
-        """Reads and displays the first 100 lines of the CSV file in the text widget."""
+        """Maps the selected CSV file and shows its first lines in the text widget."""
+        self._close_preview()
         try:
-            self.preview_text.delete('1.0', tk.END)  # Clear previous content
-            with open(self.filepath, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            # Join up to 101 lines to include 100 data rows plus header
-            preview_content = "".join(lines[:101])
-            self.preview_text.insert('1.0', preview_content)
+            self.pager = CsvPager(self.filepath)
+            self.preview_offset = 0
+            self._render_preview()
+            self._watch_preview_index(self.pager)
         except Exception as e:
-            self.preview_text.delete('1.0', tk.END)
+            self._close_preview()
             self.preview_text.insert('1.0', f"Error loading preview: {e}")
 
+    def _close_preview(self):
+        """Releases the mapped file of the previous preview and clears the text widget."""
+        if self.pager is not None:
+            self.pager.close()
+            self.pager = None
+        self.preview_text.delete('1.0', tk.END)
+        self.preview_label.config(text="CSV File Preview:")
+        self.scrollbar_y.set(0.0, 1.0)
+
+    def _render_preview(self):
+        """Reads the visible window of lines from the mapped file and shows it."""
+        text, end = self.pager.read_lines(self.preview_offset, PREVIEW_LINES)
+        self.preview_text.delete('1.0', tk.END)
+        self.preview_text.insert('1.0', text)
+        size = self.pager.size or 1
+        self.scrollbar_y.set(self.preview_offset / size, end / size)
+
+    def _update_preview_label(self):
+        """Shows the visible line numbers, or the indexing progress while they are unknown."""
+        first = self.pager.line_number(self.preview_offset)
+        if first is None:
+            position = "lines ?"
+        else:
+            shown = len(self.preview_text.get('1.0', 'end-1c').splitlines())
+            position = f"lines {first + 1:,}-{first + max(shown, 1):,}"
+
+        if self.pager.total_lines is None:
+            self.preview_label.config(text=f"CSV File Preview ({position}, indexing {self.pager.progress:.0%}):")
+        else:
+            self.preview_label.config(text=f"CSV File Preview ({position} of {self.pager.total_lines:,}):")
+
+    def _watch_preview_index(self, pager):
+        """Refreshes the preview label until the background line index of this pager is complete."""
+        if self.pager is not pager:
+            return  # Another file was selected meanwhile
+        self._update_preview_label()
+        if pager.total_lines is None:
+            self.root.after(500, lambda: self._watch_preview_index(pager))
+
+    def _scroll_preview(self, action, amount, unit=None):
+        """Handles the vertical scrollbar: drag ('moveto') or arrow / trough clicks ('scroll')."""
+        if self.pager is None:
+            return
+        if action == 'moveto':
+            self.preview_offset = self.pager.offset_at_fraction(float(amount))
+        else:
+            lines = int(amount) * (PREVIEW_LINES if unit == 'pages' else 1)
+            self.preview_offset = self.pager.move(self.preview_offset, lines)
+        self._render_preview()
+        self._update_preview_label()
+
+    def _on_preview_wheel(self, event):
+        """Scrolls the preview through the file with the mouse wheel."""
+        if event.num == 4 or event.delta > 0:
+            self._scroll_preview('scroll', -WHEEL_LINES, 'units')
+        else:
+            self._scroll_preview('scroll', WHEEL_LINES, 'units')
+        return 'break'
+
+    def _goto_line(self):
+        """Jumps the preview to the line number typed in the entry."""
+        if self.pager is None:
+            return
+        try:
+            line = int(self.goto_entry.get().replace(',', '').strip())
+        except ValueError:
+            self.status_label.config(text="Enter a line number to jump to.")
+            return
+
+        offset = self.pager.offset_of_line(line - 1)
+        if offset is None:
+            self.status_label.config(text=f"Line {line:,} is not indexed yet ({self.pager.progress:.0%} done), try again shortly.")
+            return
+        self.preview_offset = offset
+        self._render_preview()
+        self._update_preview_label()
+
     def _generate_report(self):
         """
-        Orchestrates the workflow: process -> analyze -> report.
-        Updates the status and displays the final report.
+        Starts the workflow (process -> analyze -> report) on a background thread.
+        Progress, charts and the final report arrive through the event queue.
         """
         if not self.filepath:
             messagebox.showerror("Error", "Please select a CSV file first.")
             return
+        if self.worker is not None and self.worker.is_alive():
+            return
 
+        self._clear_report_pane()
+        self.cancel_event.clear()
+        self.btn_generate.config(state=tk.DISABLED)
+        self.btn_select.config(state=tk.DISABLED)
+        self.btn_save_pdf.config(state=tk.DISABLED)
+        self.btn_cancel.config(state=tk.NORMAL)
         self.status_label.config(text="Processing data...")
-        self.root.update_idletasks()
-        
+
+        trace = PipelineTrace() if self.trace_enabled.get() else NULL_TRACE
+        self.worker = threading.Thread(target=self._run_pipeline, args=(self.filepath, trace), daemon=True)
+        self.worker.start()
+        self.root.after(POLL_INTERVAL_MS, self._poll_events)
+
+    def _check_cancelled(self):
+        """Stops the worker if the user pressed Cancel."""
+        if self.cancel_event.is_set():
+            raise ReportCancelled()
+
+    def _run_pipeline(self, filepath, trace=NULL_TRACE):
+        """
+        Runs process -> analyze -> report. Executed on the worker thread, so it never
+        touches Tk widgets; every update is sent to the GUI as an event.
+
+        Args:
+            filepath (str): Path to the selected CSV file.
+            trace (PipelineTrace, optional): Records the time spent in each stage.
+        """
+        reporter = None
         try:
-            # 1. Data processing
-            processor = DataProcessor(self.filepath)
-            processed_df = processor.process_data()
-            
-            if processed_df is None:
-                raise ValueError("Error processing data. Check the input file.")
-
-            # 2. Data analysis
-            self.status_label.config(text="Analyzing data...")
-            self.root.update_idletasks()
-            analyzer = DataAnalyzer(processed_df)
-            analysis_results = {
-                'summary_stats': analyzer.get_summary_stats(),
-                'sales_by_product': analyzer.get_sales_by_product(),
-                'sales_by_period': analyzer.get_sales_by_period(),
-                'sales_by_category': analyzer.get_sales_by_category()
-            }
-
-            # 3. Generate visual report
-            self.status_label.config(text="Generating report...")
-            self.root.update_idletasks()
-            reporter = SalesReporter(analysis_results)
-            reporter.generate_charts()
-            self.report_path = reporter.compile_report()
+            processor = DataProcessor(filepath, trace=trace)
+            if os.path.getsize(filepath) > STREAMING_THRESHOLD_BYTES:
+                # 1+2. Large file: clean and aggregate chunk by chunk, parsing only rows appended since the last run
+                self.events.put(('status', "Processing and analyzing data in chunks..."))
+                incremental = IncrementalAnalyzer(filepath, trace=trace)
+                analyzer = incremental.update(on_chunk=lambda chunk: self._check_cancelled())
+            else:
+                # 1. Data processing (reuse the cached result if the file is unchanged)
+                with trace.stage('cache_load'):
+                    processed_df = self.cache.load(filepath)
+                if processed_df is None:
+                    # Read chunk by chunk so Cancel also stops a long parse, not only the stages after it
+                    processed_df = processor.process_data(on_chunk=lambda chunk: self._check_cancelled())
+
+                    if processed_df is None:
+                        raise ValueError("Error processing data. Check the input file.")
+                    self.cache.store(filepath, processed_df)
+
+                # 2. Data analysis
+                self._check_cancelled()
+                self.events.put(('status', "Analyzing data..."))
+                analyzer = DataAnalyzer(processed_df, workers=None)  # Large frames are grouped on every core
+
+            with trace.stage('analyze'):
+                analysis_results = {
+                    'summary_stats': analyzer.get_summary_stats(),
+                    'sales_by_product': analyzer.get_sales_by_product(),
+                    'sales_by_period': analyzer.get_sales_by_period(),
+                    'sales_by_category': analyzer.get_sales_by_category()
+                }
+
+            # 3. Generate visual report, sending each chart to the GUI as soon as it is ready
+            self._check_cancelled()
+            self.events.put(('status', "Generating charts..."))
+            reporter = SalesReporter(analysis_results, trace=trace, chart_cache=self.chart_cache)
+
+            def on_chart(chart):
+                # Send a copy: the GUI resizes it while the reporter keeps the original
+                self.events.put(('chart', chart.copy()))
+                self._check_cancelled()
+
+            reporter.generate_charts(on_chart=on_chart)
+            self.events.put(('status', "Compiling report..."))
+            fd, report_path = tempfile.mkstemp(prefix='sales_report_', suffix='.png', dir=self.report_dir.name)
+            os.close(fd)
+            reporter.compile_report(report_path)
+            # Written now (reusing the figures drawn above), so "Save as PDF" is just a copy
+            pdf_path = reporter.save_pdf(os.path.splitext(report_path)[0] + '.pdf')
 
             # 4. Display report
-            self._display_report(self.report_path)
-            self.btn_save_pdf.config(state=tk.NORMAL)  # Enable PDF save button
-            self.status_label.config(text="Report generated successfully!")
-        
+            self.events.put(('done', (report_path, pdf_path, trace.summary() if trace.enabled else None)))
+
+        except ReportCancelled:
+            if reporter is not None:
+                reporter.discard_charts()
+            self.events.put(('cancelled', None))
         except Exception as e:
-            # Capture detailed error message and display in a dialog
-            error_message = f"Failed to generate report.\n\nError Details:\n{e}"
-            messagebox.showerror("Report Generation Error", error_message)
-            self.status_label.config(text="Failed to generate report.")
-            self.btn_save_pdf.config(state=tk.DISABLED)
+            if reporter is not None:
+                reporter.discard_charts()
+            self.events.put(('error', e))
+
+    def _poll_events(self):
+        """Applies the events sent by the worker thread to the GUI."""
+        finished = False
+        try:
+            while True:
+                kind, payload = self.events.get_nowait()
+                if kind == 'status':
+                    self.status_label.config(text=payload)
+                elif kind == 'chart':
+                    self._show_chart(payload)
+                elif kind == 'done':
+                    self._remove_previous_report()
+                    self.report_path, self.report_pdf_path, timings = payload
+                    self._clear_report_pane()
+                    self._display_report(self.report_path)
+                    self.btn_save_pdf.config(state=tk.NORMAL)  # Enable PDF save button
+                    self.status_label.config(text="Report generated successfully!" + (f" {timings}" if timings else ""))
+                    finished = True
+                elif kind == 'cancelled':
+                    self._clear_report_pane()
+                    self.status_label.config(text="Report generation canceled.")
+                    finished = True
+                elif kind == 'error':
+                    # Capture detailed error message and display in a dialog
+                    error_message = f"Failed to generate report.\n\nError Details:\n{payload}"
+                    messagebox.showerror("Report Generation Error", error_message)
+                    self.status_label.config(text="Failed to generate report.")
+                    self.btn_save_pdf.config(state=tk.DISABLED)
+                    finished = True
+        except queue.Empty:
+            pass
+
+        if finished:
+            self.btn_cancel.config(state=tk.DISABLED)
+            self.btn_generate.config(state=tk.NORMAL)
+            self.btn_select.config(state=tk.NORMAL)
+        else:
+            self.root.after(POLL_INTERVAL_MS, self._poll_events)
+
+    def _remove_previous_report(self):
+        """Deletes the report files of the previous run; every run gets its own unique files."""
+        for path in (self.report_path, self.report_pdf_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+        self.report_path = None
+        self.report_pdf_path = None
+
+    def _on_close(self):
+        """Closes the window, deleting the report files of this session."""
+        self.cancel_event.set()
+        self.report_dir.cleanup()
+        self.root.destroy()
+
+    def _cancel_report(self):
+        """Asks the worker thread to stop at its next checkpoint."""
+        self.cancel_event.set()
+        self.btn_cancel.config(state=tk.DISABLED)
+        self.status_label.config(text="Canceling...")
+
+    def _show_chart(self, chart):
+        """Appends a freshly rendered chart to the right pane while the report is being built."""
+        right_pane_width = int(self.root.winfo_width() * 0.7 - 60)  # Approximate right pane width (70%)
+        chart.thumbnail((right_pane_width, (self.root.winfo_height() - 150) // 4), Image.Resampling.LANCZOS)
+        chart_image = ImageTk.PhotoImage(chart)
+        label = tk.Label(self.report_frame, image=chart_image)
+        label.image = chart_image  # Keep a reference so Tk does not discard the image
+        label.pack(pady=2, before=self.report_canvas)
+        self.chart_labels.append(label)
+
+    def _clear_report_pane(self):
+        """Removes the progressive charts and the previous report from the right pane."""
+        for label in self.chart_labels:
+            label.destroy()
+        self.chart_labels = []
+        self.report_canvas.config(image='')
+        self.report_canvas.image = None
+
+    def _clear_cache(self):
+        """Removes every processed file and rendered chart from the cache."""
+        self.cache.invalidate()
+        self.chart_cache.invalidate()
+        if self.filepath:
+            IncrementalAnalyzer(self.filepath).invalidate()
+        self.status_label.config(text="Processed data and chart cache cleared.")
 
     def _display_report(self, report_path):
         """Loads and displays the report image in the GUI canvas."""
@@ -186,8 +455,8 @@ class SalesApp:
             self.btn_save_pdf.config(state=tk.DISABLED)
 
     def _save_as_pdf(self):
-        """Saves the generated report image as a PDF file."""
-        if not self.report_path or not os.path.exists(self.report_path):
+        """Saves the generated report as a PDF file."""
+        if not self.report_pdf_path or not os.path.exists(self.report_pdf_path):
             messagebox.showerror("Error", "No report available to save as PDF.")
             return
 
@@ -203,11 +472,8 @@ class SalesApp:
             return
 
         try:
-            # Convert the report image to PDF
-            image = Image.open(self.report_path)
-            if image.mode != 'RGB':
-                image = image.convert('RGB')  # Ensure compatibility with PDF
-            image.save(pdf_path, "PDF", resolution=100.0)
+            # The vector PDF was already written together with the report image
+            shutil.copyfile(self.report_pdf_path, pdf_path)
             self.status_label.config(text=f"Report saved as PDF: {os.path.basename(pdf_path)}")
         except Exception as e:
             messagebox.showerror("Save Error", f"Failed to save PDF: {e}")
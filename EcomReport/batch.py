@@ -0,0 +1,176 @@
+import argparse
+import contextlib
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+# Import classes from our modules
+from processor import DataProcessor, STREAMING_THRESHOLD_BYTES
+from analyzer import DataAnalyzer, StreamingAnalyzer
+from reporter import SalesReporter
+from tracing import NULL_TRACE, PipelineTrace
+
+
+def collect_files(source):
+    """
+    Resolves the input of a batch run into a sorted list of CSV files.
+
+    Args:
+        source (str): A directory (all *.csv inside it) or a glob pattern.
+
+    Returns:
+        list: Paths of the CSV files found.
+    """
+    if os.path.isdir(source):
+        source = os.path.join(source, '*.csv')
+    return sorted(path for path in glob.glob(source, recursive=True) if os.path.isfile(path))
+
+
+def generate_report(filepath, output_dir, approximate=False, relative_error=0.01, trace=False, compact=False):
+    """
+    Runs processor -> analyzer -> reporter for a single file.
+    Executed inside a worker process; every error is captured in the returned entry
+    so one bad file never stops the batch.
+
+    Args:
+        filepath (str): Path to the sales CSV file.
+        output_dir (str): Directory reserved for this file's report and log.
+        approximate (bool): Use sketches (approximate distinct orders, top products and quantiles).
+        relative_error (float): Target error of the sketches in approximate mode.
+        trace (bool): Write a per-stage trace (durations, rows, memory) to trace.json.
+        compact (bool): Keep the processed data in the compact representation (less memory).
+
+    Returns:
+        dict: Index entry with the status, summary statistics and report paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    entry = {
+        'file': filepath,
+        'status': 'error',
+        'report': None,
+        'pdf': None,
+        'total_revenue': None,
+        'total_orders': None,
+        'average_order_value': None,
+        'error': None
+    }
+
+    # Keep each file's processing messages in its own log instead of interleaving them
+    with open(os.path.join(output_dir, 'log.txt'), 'w', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log):
+        pipeline_trace = PipelineTrace() if trace else NULL_TRACE
+        try:
+            processor = DataProcessor(filepath, trace=pipeline_trace)
+            if os.path.getsize(filepath) > STREAMING_THRESHOLD_BYTES:
+                with pipeline_trace.stage('aggregate'):
+                    analyzer = StreamingAnalyzer.from_chunks(processor.iter_chunks(), approximate, relative_error)
+            else:
+                processed_df = processor.process_data(compact=compact)
+                if processed_df is None:
+                    raise ValueError("Error processing data. Check the input file.")
+                analyzer = DataAnalyzer(processed_df, approximate, relative_error)
+
+            with pipeline_trace.stage('analyze'):
+                analysis_results = {
+                    'summary_stats': analyzer.get_summary_stats(),
+                    'sales_by_product': analyzer.get_sales_by_product(),
+                    'sales_by_period': analyzer.get_sales_by_period(),
+                    'sales_by_category': analyzer.get_sales_by_category()
+                }
+                if approximate:
+                    analysis_results['order_value_quantiles'] = analyzer.get_order_value_quantiles()
+                    analysis_results['error_bounds'] = analyzer.get_error_bounds()
+
+            reporter = SalesReporter(analysis_results, trace=pipeline_trace)
+            reporter.generate_charts(parallel=False)  # Files are already processed in parallel
+            entry['report'] = reporter.compile_report(os.path.join(output_dir, 'sales_report.png'))
+            entry['pdf'] = reporter.save_pdf(os.path.join(output_dir, 'sales_report.pdf'))
+            entry.update(analysis_results['summary_stats'])
+            entry['status'] = 'ok'
+        except Exception as e:
+            print(f"Failed to generate report: {e}")
+            entry['error'] = str(e)
+        finally:
+            if trace:
+                pipeline_trace.save_json(os.path.join(output_dir, 'trace.json'))
+
+    return entry
+
+
+def _output_dirs(files, output_root):
+    """Gives every input file its own output directory, disambiguating repeated names."""
+    seen = {}
+    dirs = {}
+    for path in files:
+        name = os.path.splitext(os.path.basename(path))[0]
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        dirs[path] = os.path.join(output_root, name if count == 0 else f"{name}_{count}")
+    return dirs
+
+
+def run_batch(source, output_root, workers=None, approximate=False, relative_error=0.01, trace=False,
+              compact=False):
+    """
+    Generates one report per CSV file in parallel and writes a consolidated index.
+
+    Args:
+        source (str): Directory or glob pattern of sales CSV files.
+        output_root (str): Directory where per-file folders and index.csv are written.
+        workers (int, optional): Number of worker processes. Defaults to one per core.
+        approximate (bool): Use sketches instead of exact distinct counts and top-N.
+        relative_error (float): Target error of the sketches in approximate mode.
+        trace (bool): Write a per-stage trace.json next to every report.
+        compact (bool): Use the compact in-memory representation of the processed data.
+
+    Returns:
+        pd.DataFrame: The consolidated index, one row per input file.
+    """
+    files = collect_files(source)
+    if not files:
+        raise ValueError(f"No CSV files found for '{source}'.")
+
+    os.makedirs(output_root, exist_ok=True)
+    output_dirs = _output_dirs(files, output_root)
+    workers = workers or os.cpu_count() or 1
+
+    entries = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(generate_report, path, output_dirs[path], approximate, relative_error, trace, compact)
+                   for path in files]
+        for done, future in enumerate(as_completed(futures), start=1):
+            entry = future.result()
+            entries.append(entry)
+            print(f"[{done}/{len(files)}] {entry['status']}: {entry['file']}")
+
+    index = pd.DataFrame(entries).sort_values('file').reset_index(drop=True)
+    index.to_csv(os.path.join(output_root, 'index.csv'), index=False)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate sales reports for many CSV files without the GUI.")
+    parser.add_argument('source', help="Directory or glob pattern of sales CSV files (e.g. 'stores/*.csv').")
+    parser.add_argument('-o', '--output', default='reports', help="Output directory. Defaults to 'reports'.")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Worker processes. Defaults to one per core.")
+    parser.add_argument('--approximate', action='store_true',
+                        help="Approximate distinct orders, top products and order-value quantiles with sketches.")
+    parser.add_argument('--error', type=float, default=0.01,
+                        help="Target relative error in approximate mode. Defaults to 0.01.")
+    parser.add_argument('--trace', action='store_true',
+                        help="Write per-stage durations, row counts and memory deltas to <report folder>/trace.json.")
+    parser.add_argument('--compact', action='store_true',
+                        help="Keep processed data compact (integer ids, categoricals, money in cents) to use less memory.")
+    args = parser.parse_args()
+
+    index = run_batch(args.source, args.output, args.workers, args.approximate, args.error, args.trace, args.compact)
+    failed = (index['status'] != 'ok').sum()
+    print(f"\nDone: {len(index) - failed} report(s) generated, {failed} failed.")
+    print(f"Index saved to: {os.path.join(args.output, 'index.csv')}")
+
+
+# Batch entry point
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Import classes from our modules
+from processor import DataProcessor, STREAMING_THRESHOLD_BYTES
+from analyzer import DataAnalyzer, StreamingAnalyzer
+from reporter import SalesReporter
+
+# resource is Unix-only and psutil is optional; without either, peak RSS is reported as null
+try:
+    import resource
+except ImportError:
+    resource = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+VARIANTS = ('header', 'headerless', 'aliased')
+# Column layout of each variant, mirroring the files in 'test csv files'
+VARIANT_COLUMNS = {
+    'header': ['cor', 'id_produto', 'valor_total', 'categoria', 'data_do_pedido', 'id_pedido'],
+    'aliased': ['ID do Pedido', 'Data do Pedido', 'ID do Produto', 'Valor Total', 'categoria', 'cor'],
+    'headerless': ['id_pedido', 'data_do_pedido', 'id_produto', 'valor_total'],
+}
+# Header names of the 'aliased' variant, all recognized through DataProcessor.COLUMN_ALIASES
+ALIASED_NAMES = {
+    'id_pedido': 'ID do Pedido',
+    'data_do_pedido': 'Data do Pedido',
+    'id_produto': 'ID do Produto',
+    'valor_total': 'Valor Total',
+}
+GENERATOR_CHUNK_ROWS = 1_000_000
+N_PRODUCTS = 5_000
+CATEGORIES = ['Eletrônicos', 'Roupas', 'Casa', 'Esportes', 'Livros', 'Beleza', 'Brinquedos', 'Mercado']
+COLORS = ['vermelho', 'azul', 'verde', 'preto', 'branco']
+# Share of dirty rows, so the cleaning filters have work to do
+MISSING_RATE = 0.002
+NEGATIVE_RATE = 0.002
+
+_DATES = np.array(pd.date_range('2023-01-01', periods=730, freq='D').strftime('%Y-%m-%d'), dtype=object)
+_PRODUCT_NAMES = np.array([f'PROD{i:05d}' for i in range(N_PRODUCTS)], dtype=object)
+_CATEGORY_NAMES = np.array(CATEGORIES, dtype=object)
+_COLOR_NAMES = np.array(COLORS, dtype=object)
+
+
+def _synthetic_chunk(start, rows, total_rows, seed):
+    """
+    Builds rows [start, start + rows) of the synthetic data set. Every chunk has its own
+    seed, so the content only depends on (total_rows, seed), never on how it is written.
+
+    Returns:
+        pd.DataFrame: The chunk, with standardized column names.
+    """
+    rng = np.random.default_rng([seed, start])
+    index = np.arange(start, start + rows)
+
+    # About three items per order, dates spread over two years in order-id order
+    products = (rng.zipf(1.3, rows) - 1) % N_PRODUCTS
+    values = np.round(rng.lognormal(4.0, 1.0, rows), 2)
+    negative = rng.random(rows) < NEGATIVE_RATE
+    values[negative] = -values[negative]
+    values[rng.random(rows) < MISSING_RATE] = np.nan
+    values[index < 10] = np.abs(np.nan_to_num(values[index < 10], nan=1.0))  # Clean first rows for inference
+
+    # Text columns are looked up from small tables, which keeps generation fast at 1e8 rows
+    days = index * 730 // max(total_rows, 1)
+    return pd.DataFrame({
+        'id_pedido': 1_000_000 + index // 3,
+        'data_do_pedido': _DATES[days],
+        'id_produto': _PRODUCT_NAMES[products],
+        'valor_total': values,
+        'categoria': _CATEGORY_NAMES[products % len(CATEGORIES)],
+        'cor': _COLOR_NAMES[rng.integers(0, len(COLORS), rows)],
+    })
+
+
+def _chunk_csv(start, rows, total_rows, seed, variant):
+    """Formats one chunk of the synthetic data set as CSV text in the layout of `variant`."""
+    chunk = _synthetic_chunk(start, rows, total_rows, seed)
+    if variant == 'aliased':
+        chunk = chunk.rename(columns=ALIASED_NAMES)
+    return chunk[VARIANT_COLUMNS[variant]].to_csv(header=variant != 'headerless' and start == 0,
+                                                  index=False, float_format='%.2f', lineterminator='\n')
+
+
+def generate_sales_csv(filepath, rows, variant='header', seed=0, workers=None):
+    """
+    Writes a deterministic synthetic sales file. Chunks are formatted in parallel
+    and written in order, so memory stays bounded even for 1e8 rows.
+
+    Args:
+        filepath (str): Where to write the CSV file.
+        rows (int): Number of data rows.
+        variant (str): 'header' (standard names plus an unused column), 'aliased'
+            (alias names such as 'Data do Pedido') or 'headerless' (like vendas.csv).
+        seed (int): Seed of the generator; the same arguments always give the same file.
+        workers (int, optional): Number of worker processes. Defaults to one per core.
+
+    Returns:
+        str: The path of the file.
+    """
+    if variant not in VARIANTS:
+        raise ValueError(f"Invalid variant: {variant}. Choose from {', '.join(VARIANTS)}.")
+
+    starts = list(range(0, rows, GENERATOR_CHUNK_ROWS))
+    sizes = [min(GENERATOR_CHUNK_ROWS, rows - start) for start in starts]
+    tmp_path = filepath + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f, \
+            ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        # map() yields in submission order, so the file does not depend on the number of workers
+        for text in executor.map(_chunk_csv, starts, sizes, [rows] * len(starts),
+                                 [seed] * len(starts), [variant] * len(starts)):
+            f.write(text)
+    os.replace(tmp_path, filepath)
+    return filepath
+
+
+def _reset_peak_rss():
+    """Resets the peak RSS counter of this process (Linux only). Returns True if it was reset."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss():
+    """Returns the peak resident set size of this process in bytes, or None if unavailable."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024  # bytes on macOS, KiB elsewhere
+    if psutil is not None:
+        return getattr(psutil.Process().memory_info(), 'peak_wset', None)
+    return None
+
+
+def _measure(stages, name, rows, func):
+    """Runs one stage, appends its wall time, peak RSS and throughput to `stages` and returns its result."""
+    per_stage = _reset_peak_rss()
+    start = time.perf_counter()
+    result = func()
+    wall = time.perf_counter() - start
+    stages.append({
+        'stage': name,
+        'wall_seconds': round(wall, 6),
+        'peak_rss_bytes': _peak_rss(),
+        'peak_rss_scope': 'stage' if per_stage else 'process',
+        'rows': rows,
+        'rows_per_second': round(rows / wall, 1) if wall > 0 else None,
+    })
+    return result
+
+
+def _analysis_results(analyzer):
+    """Runs the queries the report needs, like the GUI and batch mode do."""
+    return {
+        'summary_stats': analyzer.get_summary_stats(),
+        'sales_by_product': analyzer.get_sales_by_product(),
+        'sales_by_period': analyzer.get_sales_by_period(),
+        'sales_by_category': analyzer.get_sales_by_category()
+    }
+
+
+def run_case(filepath, rows, mode='auto', report=True, compact=False, workers=1):
+    """
+    Benchmarks the pipeline stages on one file. Meant to run in a fresh process
+    per file, so memory peaks and caches of one case never leak into the next.
+
+    Args:
+        filepath (str): Path to the sales CSV file.
+        rows (int): Number of data rows in the file (for throughput).
+        mode (str): 'memory' (process_data + DataAnalyzer), 'streaming'
+            (iter_chunks + StreamingAnalyzer) or 'auto' (by STREAMING_THRESHOLD_BYTES).
+        report (bool): Also benchmark chart rendering and report composition.
+        compact (bool): Load the data in the compact representation (memory mode only).
+        workers (int, optional): Processes of the product/category group-by (memory mode only,
+            see DataAnalyzer). None uses one per core.
+
+    Returns:
+        dict: The stages of the case with their measurements.
+    """
+    if mode == 'auto':
+        mode = 'streaming' if os.path.getsize(filepath) > STREAMING_THRESHOLD_BYTES else 'memory'
+
+    stages = []
+    # The processor reports its column mapping on stdout; keep the JSON output clean
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        processor = DataProcessor(filepath)
+        if mode == 'streaming':
+            def process_and_analyze():
+                analyzer = StreamingAnalyzer.from_chunks(processor.iter_chunks())
+                return analyzer.aggregates.rows, _analysis_results(analyzer)
+            clean_rows, results = _measure(stages, 'process_and_analyze', rows, process_and_analyze)
+        else:
+            df = _measure(stages, 'process', rows, lambda: processor.process_data(compact=compact))
+            if df is None:
+                raise ValueError(f"Error processing {filepath}.")
+            clean_rows = len(df)
+            data_bytes = int(df.memory_usage(deep=True).sum())
+            results = _measure(stages, 'analyze', clean_rows, lambda: _analysis_results(DataAnalyzer(df, workers=workers)))
+            del df
+
+        if report:
+            reporter = SalesReporter(results)
+            _measure(stages, 'render_charts', clean_rows, lambda: reporter.generate_charts(parallel=False))
+            with tempfile.TemporaryDirectory(prefix='ecomreport_benchmark_') as report_dir:
+                _measure(stages, 'compose_report', clean_rows,
+                         lambda: reporter.compile_report(os.path.join(report_dir, 'sales_report.png')))
+                _measure(stages, 'write_pdf', clean_rows,
+                         lambda: reporter.save_pdf(os.path.join(report_dir, 'sales_report.pdf')))
+
+    case = {'mode': mode, 'compact': compact, 'workers': workers, 'clean_rows': clean_rows, 'stages': stages}
+    if mode == 'memory':
+        case['dataframe_bytes'] = data_bytes
+    return case
+
+
+def _git_revision():
+    """Returns the current git commit of the code being benchmarked, if available."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(row_counts, variants=VARIANTS, data_dir=None, seed=0, mode='auto', report=True, compact=False,
+                  workers=1):
+    """
+    Generates (or reuses) the synthetic files and benchmarks each one in its own process.
+
+    Args:
+        row_counts (list): Data sizes to benchmark, e.g. [10_000, 1_000_000].
+        variants (iterable): File layouts to benchmark (see VARIANTS).
+        data_dir (str, optional): Where the generated files are kept between runs.
+            Defaults to an 'ecomreport_benchmark' folder in the system temp directory.
+        seed (int): Seed of the synthetic data.
+        mode (str): 'auto', 'memory' or 'streaming' (see run_case).
+        report (bool): Also benchmark the report stages.
+        compact (bool): Use the compact DataFrame representation.
+        workers (int, optional): Processes of the product/category group-by (see run_case).
+
+    Returns:
+        dict: The environment and the measurements of every case, ready for json.dump.
+    """
+    data_dir = data_dir or os.path.join(tempfile.gettempdir(), 'ecomreport_benchmark')
+    os.makedirs(data_dir, exist_ok=True)
+
+    cases = []
+    for rows in row_counts:
+        for variant in variants:
+            filepath = os.path.join(data_dir, f"sales_{rows}_{variant}_seed{seed}.csv")
+            if not os.path.exists(filepath):
+                print(f"Generating {filepath}...", file=sys.stderr)
+                generate_sales_csv(filepath, rows, variant, seed)
+
+            print(f"Benchmarking {rows:,} rows ({variant})...", file=sys.stderr)
+            # A fresh process per case: clean memory peak and no warm caches from previous cases
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                case = executor.submit(run_case, filepath, rows, mode, report, compact, workers).result()
+            case.update({'rows': rows, 'variant': variant, 'file_bytes': os.path.getsize(filepath)})
+            cases.append(case)
+
+    return {
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': seed,
+        'cases': cases,
+    }
+
+
+def compare(baseline, current):
+    """
+    Prints the wall time of every stage in `current` relative to `baseline`.
+
+    Args:
+        baseline (dict): Earlier output of run_benchmark.
+        current (dict): Newer output of run_benchmark.
+    """
+    def by_stage(result):
+        return {(case['rows'], case['variant'], stage['stage']): stage['wall_seconds']
+                for case in result['cases'] for stage in case['stages']}
+
+    old, new = by_stage(baseline), by_stage(current)
+    print(f"{'rows':>12} {'variant':<11} {'stage':<22} {'before':>10} {'after':>10} {'ratio':>7}")
+    for key in sorted(old.keys() & new.keys()):
+        rows, variant, stage = key
+        ratio = new[key] / old[key] if old[key] else float('inf')
+        print(f"{rows:>12,} {variant:<11} {stage:<22} {old[key]:>10.3f} {new[key]:>10.3f} {ratio:>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the EcomReport pipeline on synthetic sales data.")
+    parser.add_argument('--rows', type=float, nargs='+', default=[1e4, 1e5, 1e6],
+                        help="Data sizes to benchmark (1e4 to 1e8). Defaults to 1e4 1e5 1e6.")
+    parser.add_argument('--variants', nargs='+', choices=VARIANTS, default=list(VARIANTS),
+                        help="File layouts to benchmark. Defaults to all.")
+    parser.add_argument('--mode', choices=['auto', 'memory', 'streaming'], default='auto',
+                        help="Load the file whole or in chunks. Defaults to 'auto' (by file size).")
+    parser.add_argument('--no-report', action='store_true', help="Skip the chart and report stages.")
+    parser.add_argument('--compact', action='store_true', help="Load the data in the compact representation.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes for the product/category group-by in memory mode (0 = one per core). Defaults to 1.")
+    parser.add_argument('--data-dir', default=None, help="Where generated files are kept and reused.")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic data. Defaults to 0.")
+    parser.add_argument('-o', '--output', default=None, help="JSON file for the results. Defaults to stdout.")
+    parser.add_argument('--compare', default=None, metavar='BASELINE',
+                        help="Earlier results JSON to compare the new results against.")
+    args = parser.parse_args()
+
+    result = run_benchmark([int(rows) for rows in args.rows], args.variants, args.data_dir,
+                           args.seed, args.mode, not args.no_report, args.compact, args.workers or None)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"Results saved to: {args.output}", file=sys.stderr)
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), result)
+
+
+# Benchmark entry point
+if __name__ == "__main__":
+    main()
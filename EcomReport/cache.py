@@ -0,0 +1,288 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+from PIL import Image
+
+# Parquet needs pyarrow; without it the cache falls back to pandas' pickle format
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'parquet'
+except ImportError:
+    CACHE_FORMAT = 'pickle'
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.ecomreport_cache')
+
+
+class DiskLRUCache:
+    """
+    Size-bounded on-disk cache with least-recently-used eviction.
+    Every entry is a single file inside `cache_dir`; an `index.json` file keeps
+    its size, source and last access time so eviction survives restarts.
+    """
+    INDEX_NAME = 'index.json'
+
+    def __init__(self, cache_dir, max_bytes):
+        """
+        Args:
+            cache_dir (str): Directory where entries are stored. Created if missing.
+            max_bytes (int): Maximum total size of the entries before eviction.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._index_path = os.path.join(self.cache_dir, self.INDEX_NAME)
+        self._index = self._load_index()
+
+    def _load_index(self):
+        """Reads the index file, starting over if it is missing or corrupted."""
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_index(self):
+        """
+        Writes the index atomically so a crash never leaves it half-written. Every write
+        goes through its own temporary file, so processes sharing the cache (batch
+        workers, the server) never interleave their writes; the last one replaces the index.
+        """
+        fd, tmp_path = tempfile.mkstemp(prefix='index-', suffix='.tmp', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._index, f)
+            os.replace(tmp_path, self._index_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def _entry_path(self, key):
+        """Returns the path of the file that stores an entry."""
+        return os.path.join(self.cache_dir, self._index[key]['filename'])
+
+    def _lookup(self, key):
+        """
+        Returns the path of a cached entry and marks it as recently used.
+
+        Returns:
+            str: Path to the entry file.
+            None: If the entry is not cached (or its file has disappeared).
+        """
+        if key not in self._index:
+            return None
+
+        path = self._entry_path(key)
+        if not os.path.exists(path):
+            del self._index[key]
+            self._save_index()
+            return None
+
+        self._index[key]['last_access'] = time.time()
+        self._save_index()
+        return path
+
+    def _register(self, key, filename, source=None):
+        """Adds a freshly written entry to the index and evicts old entries if needed."""
+        path = os.path.join(self.cache_dir, filename)
+        self._index[key] = {
+            'filename': filename,
+            'size': os.path.getsize(path),
+            'source': source,
+            'last_access': time.time()
+        }
+        self._evict()
+        self._save_index()
+
+    def _remove(self, key):
+        """Deletes an entry and its file."""
+        entry = self._index.pop(key)
+        try:
+            os.remove(os.path.join(self.cache_dir, entry['filename']))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """Removes least-recently-used entries until the cache fits in max_bytes."""
+        total_size = sum(entry['size'] for entry in self._index.values())
+        by_age = sorted(self._index, key=lambda k: self._index[k]['last_access'])
+        for key in by_age:
+            if total_size <= self.max_bytes:
+                break
+            total_size -= self._index[key]['size']
+            self._remove(key)
+
+    def total_size(self):
+        """Returns the total size in bytes of the cached entries."""
+        return sum(entry['size'] for entry in self._index.values())
+
+    def invalidate(self, source=None):
+        """
+        Removes cached entries.
+
+        Args:
+            source (str, optional): Only remove entries created from this source file.
+                If omitted, the whole cache is cleared.
+        """
+        if source is not None:
+            source = os.path.abspath(source)
+        for key in list(self._index):
+            if source is None or self._index[key]['source'] == source:
+                self._remove(key)
+        self._save_index()
+
+
+class ProcessedDataCache(DiskLRUCache):
+    """
+    Caches the cleaned, typed DataFrame produced by DataProcessor in a columnar file.
+    Entries are keyed by the source file's path, size, modification time and a
+    content hash, so an unchanged file is loaded without parsing the CSV again.
+    """
+    # Sampled hashing reads SAMPLE_BLOCKS blocks of SAMPLE_BLOCK_SIZE bytes instead of the whole file
+    SAMPLE_BLOCK_SIZE = 1024 * 1024
+    SAMPLE_BLOCKS = 16
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=2 * 1024 ** 3, full_hash_limit=None):
+        """
+        Args:
+            cache_dir (str): Directory where entries are stored. Created if missing.
+            max_bytes (int): Maximum total size of the entries before eviction.
+            full_hash_limit (int, optional): Files larger than this are hashed from sampled
+                blocks only. Faster, but an in-place edit outside the sampled blocks that keeps
+                the size and modification time unchanged then returns the stale entry.
+                Defaults to None: every file is hashed in full.
+        """
+        super().__init__(cache_dir, max_bytes)
+        self.full_hash_limit = full_hash_limit
+        # Remembers the last key computed by load(), so a miss followed by store() hashes the file once
+        self._last_fingerprint = (None, None)
+
+    def _content_hash(self, filepath, size):
+        """Hashes the file content (or evenly spaced blocks of it above full_hash_limit)."""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(filepath, 'rb') as f:
+            if self.full_hash_limit is None or size <= self.full_hash_limit:
+                for block in iter(lambda: f.read(self.SAMPLE_BLOCK_SIZE), b''):
+                    digest.update(block)
+            else:
+                step = (size - self.SAMPLE_BLOCK_SIZE) // (self.SAMPLE_BLOCKS - 1)
+                for i in range(self.SAMPLE_BLOCKS):
+                    f.seek(i * step)
+                    digest.update(f.read(self.SAMPLE_BLOCK_SIZE))
+        return digest.hexdigest()
+
+    def fingerprint(self, filepath, variant='', reuse=False):
+        """
+        Builds the cache key of a source file.
+
+        Args:
+            filepath (str): Path to the source CSV file.
+            variant (str): Extra discriminator for different processing options.
+            reuse (bool): Return the last key computed if the path, size and modification
+                time still match, instead of hashing the content again. Only store() does,
+                right after the load() that missed; lookups always hash the content.
+
+        Returns:
+            str: Hex key identifying this exact version of the file.
+        """
+        abs_path = os.path.abspath(filepath)
+        stat = os.stat(abs_path)
+        identity = (abs_path, stat.st_size, stat.st_mtime_ns, variant)
+        if reuse and self._last_fingerprint[0] == identity:
+            return self._last_fingerprint[1]
+
+        parts = [abs_path, str(stat.st_size), str(stat.st_mtime_ns),
+                 self._content_hash(abs_path, stat.st_size), variant, CACHE_FORMAT]
+        key = hashlib.blake2b('|'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+        self._last_fingerprint = (identity, key)
+        return key
+
+    def load(self, filepath, variant=''):
+        """
+        Returns the cached DataFrame for a file, if it has not changed since it was stored.
+
+        Returns:
+            pd.DataFrame: The processed data.
+            None: On a cache miss.
+        """
+        key = self.fingerprint(filepath, variant)
+        path = self._lookup(key)
+        if path is None:
+            return None
+
+        try:
+            if CACHE_FORMAT == 'parquet':
+                return pd.read_parquet(path)
+            return pd.read_pickle(path)
+        except Exception as e:
+            print(f"Discarding unreadable cache entry {path}: {e}")
+            self._remove(key)
+            self._save_index()
+            return None
+
+    def store(self, filepath, df, variant=''):
+        """
+        Writes a processed DataFrame to the cache.
+
+        Args:
+            filepath (str): Path to the source CSV file the data was built from.
+            df (pd.DataFrame): The cleaned and typed DataFrame.
+            variant (str): Extra discriminator for different processing options.
+        """
+        key = self.fingerprint(filepath, variant, reuse=True)
+        filename = f"{key}.{CACHE_FORMAT}"
+        path = os.path.join(self.cache_dir, filename)
+
+        if CACHE_FORMAT == 'parquet':
+            df.to_parquet(path)
+        else:
+            df.to_pickle(path)
+
+        self._register(key, filename, source=os.path.abspath(filepath))
+
+
+class ChartCache(DiskLRUCache):
+    """
+    Caches rendered report charts by a hash of their data and parameters (see
+    SalesReporter), so a chart whose input did not change is reused instead of
+    rendered again. An entry is just the chart as a PNG file: nothing is unpickled,
+    and the vector PDF redraws the figures of cached charts from their data.
+    """
+    def __init__(self, cache_dir=os.path.join(DEFAULT_CACHE_DIR, 'charts'), max_bytes=256 * 1024 ** 2):
+        super().__init__(cache_dir, max_bytes)
+
+    def load(self, key):
+        """
+        Returns a cached chart.
+
+        Returns:
+            PIL.Image.Image: The chart.
+            None: On a cache miss.
+        """
+        path = self._lookup(key)
+        if path is None:
+            return None
+
+        try:
+            with Image.open(path) as image:
+                return image.convert('RGB')
+        except Exception as e:
+            print(f"Discarding unreadable cache entry {path}: {e}")
+            self._remove(key)
+            self._save_index()
+            return None
+
+    def store(self, key, image):
+        """
+        Writes a rendered chart to the cache.
+
+        Args:
+            key (str): Hash of the chart's data and parameters.
+            image (PIL.Image.Image): The rendered chart.
+        """
+        filename = f"{key}.png"
+        image.save(os.path.join(self.cache_dir, filename), format='PNG')
+        self._register(key, filename)
@@ -0,0 +1,162 @@
+import hashlib
+import os
+import pickle
+import sys
+
+# Import classes from our modules
+from processor import DataProcessor
+from analyzer import SalesAggregates, StreamingAnalyzer
+from cache import DEFAULT_CACHE_DIR
+from tracing import NULL_TRACE
+
+# Bump when the layout of the saved state changes, so old states are rebuilt
+STATE_VERSION = 4
+# Bytes read at a time when hashing the processed part
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class IncrementalAnalyzer:
+    """
+    Append-aware analysis of a growing sales file.
+    Persists the running SalesAggregates together with the byte offset processed so far
+    and a hash of the whole processed part, so a later run only parses the appended tail.
+    If any byte of the processed part changed, it falls back to a full rebuild. Hashing
+    reads the file once per run, which is still far cheaper than parsing it.
+    """
+    def __init__(self, filepath, state_dir=DEFAULT_CACHE_DIR, chunksize=1_000_000, trace=NULL_TRACE):
+        """
+        Args:
+            filepath (str): Path to the sales CSV file.
+            state_dir (str): Directory where the persisted state is kept.
+            chunksize (int): Number of rows per chunk when parsing.
+            trace (PipelineTrace, optional): Records the reading, cleaning and aggregation stages.
+        """
+        self.filepath = filepath
+        self.chunksize = chunksize
+        self.trace = trace
+        os.makedirs(state_dir, exist_ok=True)
+        key = hashlib.blake2b(os.path.abspath(filepath).encode('utf-8'), digest_size=16).hexdigest()
+        self.state_path = os.path.join(state_dir, f"{key}.state")
+
+        # Filled by update(): 'full', 'incremental' or 'unchanged', and the rows parsed
+        self.last_mode = None
+        self.rows_added = 0
+
+    @staticmethod
+    def _hash_range(f, start, end, digest):
+        """Feeds the bytes [start, end) of the file to digest."""
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(HASH_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+
+    def _load_state(self):
+        """Returns the persisted state, or None if there is none (or it is unreadable)."""
+        try:
+            with open(self.state_path, 'rb') as f:
+                state = pickle.load(f)
+        except (FileNotFoundError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        return state if state.get('version') == STATE_VERSION else None
+
+    def _save_state(self, state):
+        """Writes the state atomically so an interrupted run never corrupts it."""
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.state_path)
+
+    def _can_resume(self, state, f, size, digest):
+        """
+        Checks that the part of the file covered by the state is unchanged.
+        digest is left holding the hash of that part, ready to be extended with the new bytes.
+        """
+        offset = state['offset']
+        if size < offset:
+            return False
+        self._hash_range(f, 0, offset, digest)
+        if state['digest'] != digest.copy().hexdigest():
+            return False
+
+        # If the last processed row had no line break, new bytes must start a new line
+        if size > offset and not state['ends_with_newline']:
+            f.seek(offset)
+            if f.read(1) not in (b'\n', b'\r'):
+                return False
+        return True
+
+    def invalidate(self):
+        """Deletes the persisted state, forcing the next update() to rebuild from scratch."""
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    def update(self, on_chunk=None):
+        """
+        Brings the aggregates up to date with the file and persists them.
+
+        Args:
+            on_chunk (callable, optional): Called with every cleaned chunk before it is folded in.
+                An exception raised by the callback aborts the update without saving.
+
+        Returns:
+            StreamingAnalyzer: Analyzer over the aggregates of the whole file.
+        """
+        processor = DataProcessor(self.filepath, trace=self.trace)
+        size = os.path.getsize(self.filepath)
+        state = self._load_state()
+
+        with open(self.filepath, 'rb') as f:
+            digest = hashlib.blake2b(digest_size=16)
+            if state is not None and self._can_resume(state, f, size, digest):
+                start = state['offset']
+                aggregates = state['aggregates']
+                self.last_mode = 'incremental' if start < size else 'unchanged'
+            else:
+                digest = hashlib.blake2b(digest_size=16)
+                start = 0
+                aggregates = SalesAggregates()
+                self.last_mode = 'full'
+
+            rows_before = aggregates.rows
+            if start < size:
+                for chunk in processor.iter_chunks(self.chunksize, start=start, end=size):
+                    if on_chunk is not None:
+                        on_chunk(chunk)
+                    with self.trace.stage('aggregate', rows_in=len(chunk)):
+                        aggregates.update(chunk)
+            self.rows_added = aggregates.rows - rows_before
+            # The processed part now ends at size: extend its hash with the bytes parsed in this run
+            self._hash_range(f, start, size, digest)
+
+            if size > 0:
+                f.seek(size - 1)
+                ends_with_newline = f.read(1) in (b'\n', b'\r')
+            else:
+                ends_with_newline = True
+
+            new_state = {
+                'version': STATE_VERSION,
+                'offset': size,
+                'ends_with_newline': ends_with_newline,
+                'digest': digest.hexdigest(),
+                'aggregates': aggregates
+            }
+
+        if self.last_mode != 'unchanged':
+            self._save_state(new_state)
+        return StreamingAnalyzer(aggregates)
+
+
+# --- Script execution ---
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python incremental.py sales_file.csv")
+    else:
+        incremental = IncrementalAnalyzer(sys.argv[1])
+        analyzer = incremental.update()
+        print(f"Mode: {incremental.last_mode} ({incremental.rows_added} new rows)")
+        print(analyzer.get_summary_stats())
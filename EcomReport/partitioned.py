@@ -0,0 +1,188 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Below this many rows, starting the work on other processes costs more than it saves
+PARALLEL_MIN_ROWS = 2_000_000
+
+# Aggregation pool, started on first use and reused by every query
+_pool = None
+_pool_workers = 0
+# Guards the pool between threads (e.g. concurrent requests in server.py)
+_pool_lock = threading.Lock()
+
+
+def _submit_all(workers, fn, tasks):
+    """
+    Submits one call of fn per argument tuple to the shared aggregation pool, (re)starting
+    it if it has fewer workers than requested.
+    Submission happens under the lock, so a pool is only replaced between two batches; its
+    shutdown waits for the tasks already submitted, whose futures stay valid.
+
+    Returns:
+        list: The futures, in the order of tasks.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < workers:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return [_pool.submit(fn, *args) for args in tasks]
+
+
+def _to_shared(array):
+    """Copies an array into a new shared memory block, so workers read it without pickling."""
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+    return block
+
+
+def _bincount_sums(codes, values, n_groups):
+    """Sums values and counts rows per key code; rows with a missing key (code -1) are skipped."""
+    if codes.size and codes.min() < 0:
+        present = codes >= 0
+        codes, values = codes[present], values[present]
+    sums = np.bincount(codes, weights=values, minlength=n_groups)
+    counts = np.bincount(codes, minlength=n_groups)
+    return sums, counts
+
+
+def _attach(blocks, length):
+    """Maps (name, dtype) shared blocks as arrays of the given length. Returns (handles, arrays)."""
+    handles = [shared_memory.SharedMemory(name=name) for name, _ in blocks]
+    arrays = [np.ndarray(length, dtype=dtype, buffer=handle.buf) for handle, (_, dtype) in zip(handles, blocks)]
+    return handles, arrays
+
+
+def _scatter_task(blocks, length, start, end, partitions):
+    """
+    Worker task, phase 1: moves rows [start, end) into the same range of the scratch
+    arrays, grouped by owning partition (code % partitions). Rows with a missing key are dropped.
+
+    Returns:
+        np.ndarray: Number of rows written for each partition, in partition order.
+    """
+    handles, (codes, values, out_codes, out_values) = _attach(blocks, length)
+    try:
+        chunk_codes, chunk_values = codes[start:end], values[start:end]
+        owners = chunk_codes % partitions
+        owners[chunk_codes < 0] = partitions  # Past the last partition, so never read
+        order = np.argsort(owners, kind='stable')
+        out_codes[start:end] = chunk_codes[order]
+        out_values[start:end] = chunk_values[order]
+        counts = np.bincount(owners, minlength=partitions + 1)[:partitions]
+        # Views must be gone before the blocks can be closed
+        del codes, values, out_codes, out_values, chunk_codes, chunk_values
+        return counts
+    finally:
+        for handle in handles:
+            handle.close()
+
+
+def _aggregate_task(blocks, length, segments, partition, partitions, n_groups):
+    """
+    Worker task, phase 2: aggregates every row owned by one partition, i.e. the keys with
+    code % partitions == partition, gathered from the segments written in phase 1.
+
+    Returns:
+        tuple: (sums, counts) for the partition's codes partition, partition + partitions, ...
+    """
+    handles, (out_codes, out_values) = _attach(blocks, length)
+    try:
+        owned = len(range(partition, n_groups, partitions))
+        sums, counts = np.zeros(owned), np.zeros(owned, dtype=np.int64)
+        for start, end in segments:
+            local = out_codes[start:end] // partitions
+            sums += np.bincount(local, weights=out_values[start:end], minlength=owned)
+            counts += np.bincount(local, minlength=owned)
+        del out_codes, out_values
+        return sums, counts
+    finally:
+        for handle in handles:
+            handle.close()
+
+
+def _hash_partitioned_sums(codes, values, n_groups, workers):
+    """
+    Aggregates on worker processes with each key owned by exactly one of them. Phase 1
+    splits the rows by range and groups each range by owning partition (a shuffle in
+    shared memory); phase 2 gives every worker the rows of its own keys, so partial
+    results are disjoint and only n_groups / workers slots are kept per worker.
+    Segments are added in row order, so the result does not depend on scheduling.
+    """
+    shared = [_to_shared(codes), _to_shared(values),
+              _to_shared(np.empty_like(codes)), _to_shared(np.empty_like(values))]
+    blocks = [(block.name, array.dtype) for block, array in zip(shared, (codes, values, codes, values))]
+    length = len(codes)
+    try:
+        bounds = np.linspace(0, length, workers + 1).astype(int)
+        ranges = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+        written = [future.result() for future in _submit_all(
+            workers, _scatter_task, [(blocks, length, start, end, workers) for start, end in ranges])]
+
+        # Segment of each partition inside every range, in range (that is, row) order
+        segments = [[] for _ in range(workers)]
+        for (start, _), counts in zip(ranges, written):
+            offsets = start + np.concatenate(([0], np.cumsum(counts)))
+            for partition in range(workers):
+                if counts[partition]:
+                    segments[partition].append((int(offsets[partition]), int(offsets[partition + 1])))
+
+        partials = [future.result() for future in _submit_all(
+            workers, _aggregate_task,
+            [(blocks[2:], length, segments[partition], partition, workers, n_groups) for partition in range(workers)])]
+    finally:
+        for block in shared:
+            block.close()
+            block.unlink()
+
+    sums, counts = np.zeros(n_groups), np.zeros(n_groups, dtype=np.int64)
+    for partition, (partition_sums, partition_counts) in enumerate(partials):
+        sums[partition::workers] = partition_sums
+        counts[partition::workers] = partition_counts
+    return sums, counts
+
+
+def parallel_group_sum(keys, values, workers=None, min_rows=PARALLEL_MIN_ROWS):
+    """
+    Sums values by key, hash-partitioning the keys across worker processes so that
+    every key is aggregated by exactly one of them (see _hash_partitioned_sums).
+    Keys are dictionary-encoded into integer codes, which are free for categoricals
+    (DataProcessor reads products and categories as categoricals); other keys are
+    encoded in the calling process. Equivalent to
+    values.groupby(keys, observed=True).sum() with a plain (non-categorical) index.
+
+    Args:
+        keys (pd.Series): Group keys, e.g. df['id_produto'].
+        values (pd.Series): Values to sum, e.g. df['valor_total'].
+        workers (int, optional): Number of processes. Defaults to one per core.
+        min_rows (int): Smaller inputs are aggregated in the calling process.
+
+    Returns:
+        pd.Series: Sum per key (float64), sorted like the groupby result.
+    """
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        codes, labels = keys.cat.codes.to_numpy(), keys.cat.categories.astype(object)
+    else:
+        # Hash-based encoding; only the distinct keys are sorted, at the end
+        codes, labels = pd.factorize(keys, sort=False)
+    values_array = np.ascontiguousarray(values.to_numpy(dtype='float64'))
+    codes = np.ascontiguousarray(codes)
+    n_groups, length = len(labels), len(codes)
+    workers = min(workers or os.cpu_count() or 1, max(length // max(min_rows // 2, 1), 1), max(n_groups, 1))
+
+    if workers <= 1 or length < min_rows:
+        sums, counts = _bincount_sums(codes, values_array, n_groups)
+    else:
+        sums, counts = _hash_partitioned_sums(codes, values_array, n_groups, workers)
+
+    observed = counts > 0
+    result = pd.Series(sums[observed], index=pd.Index(np.asarray(labels)[observed], name=keys.name), name=values.name)
+    return result if isinstance(keys.dtype, pd.CategoricalDtype) else result.sort_index()
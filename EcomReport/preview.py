@@ -0,0 +1,158 @@
+import bisect
+import mmap
+import os
+import threading
+
+import numpy as np
+
+# Every INDEX_STRIDE-th line start is recorded, so any line is at most that many lines from a known offset
+INDEX_STRIDE = 1024
+# Bytes scanned per step by the background indexer
+INDEX_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+class CsvPager:
+    """
+    Random access to the lines of a (possibly huge) text file through mmap.
+    Positions are byte offsets of line starts, so the file can be scrolled or jumped
+    anywhere right away, reading only the visible window. A sparse index of line
+    offsets is built on a background thread to provide line numbers and "go to line".
+    """
+    def __init__(self, filepath, stride=INDEX_STRIDE):
+        """
+        Args:
+            filepath (str): Path to the file to page through.
+            stride (int): Number of lines between two recorded offsets of the index.
+        """
+        self.filepath = filepath
+        self.stride = stride
+        self.size = os.path.getsize(filepath)
+        self._file = open(filepath, 'rb')
+        # An empty file cannot be memory-mapped; it simply has no lines
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+
+        # Sparse line index, filled by the background thread: checkpoints[k] is the offset of line k * stride
+        self.checkpoints = [0]
+        self.indexed_bytes = 0
+        self.total_lines = None  # Known once the whole file is indexed
+
+        self._stop = threading.Event()
+        self._indexer = threading.Thread(target=self._build_index, daemon=True)
+        self._indexer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stops the indexer and releases the mapping."""
+        self._stop.set()
+        self._indexer.join()
+        if self._mm is not None:
+            self._mm.close()
+        self._file.close()
+
+    @property
+    def progress(self):
+        """Fraction of the file covered by the line index (0.0 to 1.0)."""
+        return self.indexed_bytes / self.size if self.size else 1.0
+
+    def _build_index(self):
+        """Scans the file block by block, recording the offset of every stride-th line."""
+        lines = 0  # Line breaks seen so far
+        pos = 0
+        while pos < self.size:
+            if self._stop.is_set():
+                return
+            end = min(pos + INDEX_BLOCK_SIZE, self.size)
+            block = np.frombuffer(self._mm[pos:end], dtype=np.uint8)
+            # Every line break starts a new line; keep the starts of lines numbered k * stride
+            starts = np.flatnonzero(block == ord('\n')) + pos + 1
+            first = -(lines + 1) % self.stride
+            self.checkpoints.extend(start for start in starts[first::self.stride].tolist() if start < self.size)
+            lines += len(starts)
+            self.indexed_bytes = pos = end
+
+        # A last line without a line break still counts
+        if self.size and self._mm[self.size - 1:self.size] != b'\n':
+            lines += 1
+        self.total_lines = lines
+
+    def next_line(self, offset):
+        """Returns the offset of the line after the one starting at offset (the file size at the end)."""
+        if offset >= self.size:
+            return self.size
+        newline = self._mm.find(b'\n', offset)
+        return self.size if newline < 0 else newline + 1
+
+    def previous_line(self, offset):
+        """Returns the offset of the line before the one starting at offset (0 at the start)."""
+        if offset <= 0:
+            return 0
+        return self._mm.rfind(b'\n', 0, offset - 1) + 1
+
+    def move(self, offset, lines):
+        """Moves a line-start offset by a number of lines (negative to go back), stopping at the ends."""
+        step = self.next_line if lines > 0 else self.previous_line
+        for _ in range(abs(lines)):
+            moved = step(offset)
+            if moved == offset or moved >= self.size:
+                break
+            offset = moved
+        return offset
+
+    def offset_at_fraction(self, fraction):
+        """Returns the start of the line at a relative position in the file (0.0 to 1.0)."""
+        if not self.size:
+            return 0
+        target = min(max(int(fraction * self.size), 0), self.size - 1)
+        return self._mm.rfind(b'\n', 0, target) + 1
+
+    def offset_of_line(self, line):
+        """
+        Returns the offset of a line (0-based) using the index.
+
+        Returns:
+            int: Offset of the line start, clamped to the last line of the file.
+            None: If the index has not reached that line yet.
+        """
+        line = max(line, 0)
+        if self.total_lines is not None:
+            line = min(line, max(self.total_lines - 1, 0))
+        checkpoint = line // self.stride
+        if checkpoint >= len(self.checkpoints):
+            return None
+        return self.move(self.checkpoints[checkpoint], line % self.stride)
+
+    def line_number(self, offset):
+        """
+        Returns the 0-based number of the line starting at offset.
+
+        Returns:
+            int: The line number.
+            None: If the index has not reached that offset yet.
+        """
+        if self._mm is None:
+            return 0
+        if offset > self.indexed_bytes:
+            return None
+        checkpoint = bisect.bisect_right(self.checkpoints, offset) - 1
+        return checkpoint * self.stride + self._mm[self.checkpoints[checkpoint]:offset].count(b'\n')
+
+    def read_lines(self, offset, count):
+        """
+        Reads a window of lines; nothing outside it is touched.
+
+        Returns:
+            tuple: (text, end) - the decoded lines and the offset right after them.
+        """
+        if self._mm is None:
+            return '', 0
+        end = offset
+        for _ in range(count):
+            if end >= self.size:
+                break
+            end = self.next_line(end)
+        return self._mm[offset:end].decode('utf-8', errors='replace'), end
@@ -1,5 +1,49 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import sqlite3
+
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from pandas.api.types import union_categoricals
+
+from sketches import canonical_integers
+from tracing import NULL_TRACE
+
+# Files larger than this should be analyzed chunk by chunk (iter_chunks) instead of loaded whole
+STREAMING_THRESHOLD_BYTES = 512 * 1024 * 1024
+# Default table of DataProcessor.to_sqlite / SqlAnalyzer, and its indexed columns
+SQLITE_TABLE = 'vendas'
+SQLITE_INDEXED_COLUMNS = ['data_do_pedido', 'id_produto', 'categoria']
+
+class ByteRangeReader(io.RawIOBase):
+    """
+    Read-only binary file view limited to the byte range [start, end), so pandas
+    can parse a slice of a file (e.g. only the rows appended since the last run).
+    """
+    def __init__(self, filepath, start=0, end=None):
+        super().__init__()
+        self._file = open(filepath, 'rb')
+        self._file.seek(start)
+        self._remaining = None if end is None else max(end - start, 0)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = len(buffer) if self._remaining is None else min(len(buffer), self._remaining)
+        data = self._file.read(size)
+        buffer[:len(data)] = data
+        if self._remaining is not None:
+            self._remaining -= len(data)
+        return len(data)
+
+    def close(self):
+        self._file.close()
+        super().close()
+
 
 class DataProcessor:
     """
@@ -12,10 +56,34 @@ class DataProcessor:
         'id_produto': ['produto', 'product', 'id_produto', 'id-produto', 'ID do Produto'],
         'valor_total': ['valor', 'value', 'total_value', 'valor_total', 'total', 'Valor Total']
     }
+    REQUIRED_COLUMNS = ['data_do_pedido', 'id_produto', 'id_pedido', 'valor_total']
+    OPTIONAL_COLUMNS = ['categoria']
+    # Dtypes applied while parsing; 'data_do_pedido' is parsed with DATE_FORMAT
+    COLUMN_DTYPES = {
+        'id_pedido': str,
+        'id_produto': 'category',
+        'categoria': 'category',
+    }
+    MONEY_FORMATS = ('cents', 'float32')
+    DATE_FORMAT = '%Y-%m-%d'
+    # Bytes read for header sniffing (from the start of the file) and for inference (from across it)
+    SAMPLE_BYTES = 64 * 1024
+    SAMPLE_BLOCKS = 16
+    # Lines kept for inference on headerless files
+    SAMPLE_ROWS = 1000
 
-    def __init__(self, filepath):
+    def __init__(self, filepath, trace=NULL_TRACE):
+        """
+        Args:
+            filepath (str): Path to the sales CSV file.
+            trace (PipelineTrace, optional): Records the reading and cleaning stages. Off by default.
+        """
         self.filepath = filepath
+        self.trace = trace
         self.df = None
+        self._has_header = None
+        self._column_map = None
+        self._header = None
 
     def _clean_column_name(self, name):
         """Standardizes a column name for easier comparison."""
@@ -42,34 +110,30 @@ class DataProcessor:
 
     def _is_date_column(self, series):
         """Validates if a column contains dates in expected formats (DD/MM/YYYY, DD-MM-YYYY, YYYY-MM-DD)."""
-        try:
-            # Try parsing with specific formats
-            sample = series.iloc[0:10].dropna().astype(str)
-            for date_format in ['%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d']:
-                parsed = pd.to_datetime(sample, format=date_format, errors='coerce')
-                if parsed.notna().all():
-                    return True
-            return False
-        except (ValueError, TypeError):
+        sample = series.dropna().astype(str)
+        if sample.empty:
             return False
+        for date_format in ['%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d']:
+            parsed = pd.to_datetime(sample, format=date_format, errors='coerce')
+            if parsed.notna().all():
+                return True
+        return False
 
     def _is_numeric_column(self, series):
         """Checks if a column contains numeric values."""
-        try:
-            pd.to_numeric(series.iloc[0:10].dropna(), errors='coerce')
-            return True
-        except (ValueError, TypeError):
-            return False
-    
+        sample = series.dropna()
+        return not sample.empty and pd.to_numeric(sample, errors='coerce').notna().all()
+
     def _is_id_column(self, series):
         """Identifies an ID column (integers or unique strings)."""
-        try:
-            numeric_series = pd.to_numeric(series.iloc[0:10].dropna(), errors='coerce')
-            if numeric_series.notna().all():
-                return all(x == int(x) for x in numeric_series)  # Check for integer values
-            return series.iloc[0:10].nunique() == len(series.iloc[0:10].dropna())
-        except (ValueError, TypeError):
+        sample = series.dropna()
+        if sample.empty:
             return False
+        numeric = pd.to_numeric(sample, errors='coerce')
+        if numeric.notna().all():
+            values = numeric.to_numpy(dtype='float64')
+            return bool((np.isfinite(values) & (values == np.floor(values))).all())  # Integer values only
+        return sample.nunique() == len(sample)
 
     def _infer_column_map_from_data(self, df):
         """
@@ -99,8 +163,7 @@ class DataProcessor:
         # 3. Find the total value column (numeric with decimals)
         for col in remaining_cols:
             if self._is_numeric_column(df[col]):
-                sample = df[col].iloc[0:10].dropna()
-                if any('.' in str(x) for x in sample):
+                if df[col].dropna().astype(str).str.contains('.', regex=False).any():
                     inferred_map[col] = 'valor_total'
                     remaining_cols.remove(col)
                     print(f"Mapped {col} as valor_total")
@@ -113,32 +176,343 @@ class DataProcessor:
 
         return inferred_map
     
-    def process_data(self):
+    def _read_sample(self):
+        """
+        Reads a small byte range from the start of the file, cut at the last
+        complete line, so header sniffing and inference never touch the rest of it.
+
+        Returns:
+            io.StringIO: The sampled lines.
+        """
+        with open(self.filepath, 'rb') as f:
+            raw = f.read(self.SAMPLE_BYTES)
+
+        if len(raw) == self.SAMPLE_BYTES and b'\n' in raw:
+            raw = raw[:raw.rindex(b'\n') + 1]
+        return io.StringIO(raw.decode('utf-8', errors='replace'))
+
+    def _read_spread_sample(self):
+        """
+        Samples lines from across the file for data-based inference: SAMPLE_BLOCKS
+        evenly spaced blocks (SAMPLE_BYTES in total) are read and their complete
+        lines feed a seeded reservoir of at most SAMPLE_ROWS lines, so the result
+        is bounded and reproducible whatever the file size.
+
+        Returns:
+            io.StringIO: The sampled lines.
+        """
+        size = os.path.getsize(self.filepath)
+        block_size = self.SAMPLE_BYTES // self.SAMPLE_BLOCKS
+        if size <= self.SAMPLE_BYTES:
+            starts, block_size = [0], self.SAMPLE_BYTES
+        else:
+            starts = [i * (size - block_size) // (self.SAMPLE_BLOCKS - 1) for i in range(self.SAMPLE_BLOCKS)]
+
+        rng = random.Random(0)
+        reservoir, seen = [], 0
+        with open(self.filepath, 'rb') as f:
+            for start in starts:
+                f.seek(max(start - 1, 0))
+                raw = f.read(block_size + (start > 0))
+                lines = raw.split(b'\n')
+                # Drop the pieces cut by the block edges: the first one unless the block starts a line
+                # (the byte before it is a line break), the last one unless the block reaches the end
+                lines = lines[1:] if start > 0 else lines
+                if start + block_size < size:
+                    lines = lines[:-1]
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    seen += 1
+                    if len(reservoir) < self.SAMPLE_ROWS:
+                        reservoir.append(line)
+                    else:
+                        slot = rng.randrange(seen)
+                        if slot < self.SAMPLE_ROWS:
+                            reservoir[slot] = line
+        return io.StringIO(b'\n'.join(reservoir).decode('utf-8', errors='replace'))
+
+    def _resolve_column_map(self):
+        """
+        Detects whether the file has a header and returns the mapping from the
+        file's columns to the standardized names. Only a byte-range sample is
+        read, and the result is cached so every reader sniffs the file once.
+
+        Returns:
+            tuple: (has_header, column_map)
+        """
+        if self._column_map is None:
+            with self.trace.stage('detect_columns'):
+                temp_df = pd.read_csv(self._read_sample(), nrows=10, skip_blank_lines=True)
+                mapped_columns = self._detect_and_map_columns(temp_df.columns)
+                print(f"Columns found from header: {list(mapped_columns.values())}")
+
+                if len(mapped_columns) >= 2:
+                    self._has_header = True
+                    self._column_map = mapped_columns
+                    self._header = list(temp_df.columns)
+                else:
+                    sample_df = pd.read_csv(self._read_spread_sample(), header=None, skip_blank_lines=True,
+                                            index_col=False, on_bad_lines='skip')
+                    print(f"Raw DataFrame columns: {list(sample_df.columns)}")
+                    self._has_header = False
+                    self._column_map = self._infer_column_map_from_data(sample_df)
+                    self._header = list(sample_df.columns)
+                    print(f"Columns inferred from data: {list(self._column_map.values())}")
+
+        return self._has_header, self._column_map
+
+    def _read_options(self, skip_header=False):
+        """
+        Builds the pd.read_csv arguments for the full read: only the columns the
+        analysis needs, with their dtypes and the date format fixed up front so
+        the file is parsed once and no column needs a second conversion pass.
+
+        Args:
+            skip_header (bool): The data being read does not start with the header
+                row (a byte range from the middle of the file), so pass the column names.
+
+        Returns:
+            dict: Keyword arguments for pd.read_csv.
+        """
+        has_header, column_map = self._resolve_column_map()
+
+        # Columns kept: mapped ones plus any already using a standardized name
+        wanted = set(self.REQUIRED_COLUMNS) | set(self.OPTIONAL_COLUMNS)
+        standard_names = {col: column_map.get(col, col) for col in self._header
+                          if col in column_map or col in wanted}
+        original_names = {standard: col for col, standard in standard_names.items()}
+
+        dtypes = {}
+        for standard, dtype in self.COLUMN_DTYPES.items():
+            if standard in original_names:
+                dtypes[original_names[standard]] = dtype
+
+        options = {
+            'usecols': list(standard_names),
+            'dtype': dtypes,
+            'skip_blank_lines': True,
+        }
+        if 'data_do_pedido' in original_names:
+            options['parse_dates'] = [original_names['data_do_pedido']]
+            options['date_format'] = self.DATE_FORMAT
+        if not has_header:
+            options['header'] = None
+            options['index_col'] = False
+        elif skip_header:
+            options['header'] = None
+            options['names'] = self._header
+        return options
+
+    def _clean_frame(self, df):
+        """
+        Validates, cleans and converts the types of a DataFrame whose columns
+        already use the standardized names. Shared by the in-memory and the
+        chunked paths so both apply exactly the same rules.
+
+        Args:
+            df (pd.DataFrame): DataFrame with standardized column names.
+
+        Returns:
+            pd.DataFrame: The cleaned DataFrame (may be empty).
+
+        Raises:
+            ValueError: If any of the required columns is missing.
+        """
+        if not all(col in df.columns for col in self.REQUIRED_COLUMNS):
+            missing_cols = set(self.REQUIRED_COLUMNS) - set(df.columns)
+            raise ValueError(f"Could not identify all necessary columns. Missing: {missing_cols}")
+
+        # The typed read already parsed these; coerce only values it could not parse
+        with self.trace.stage('coerce_types', rows_in=len(df)):
+            if not pd.api.types.is_datetime64_any_dtype(df['data_do_pedido']):
+                df['data_do_pedido'] = pd.to_datetime(df['data_do_pedido'], format=self.DATE_FORMAT, errors='coerce')
+            if not pd.api.types.is_numeric_dtype(df['valor_total']):
+                df['valor_total'] = pd.to_numeric(df['valor_total'], errors='coerce')
+
+        # Drop rows with missing values, conversion errors (NaT or NaN) and invalid values in a single filter
+        with self.trace.stage('filter_rows', rows_in=len(df)) as stage:
+            complete = df[self.REQUIRED_COLUMNS].notna().all(axis=1)
+            valid = complete & (df['valor_total'] >= 0)
+            df = df[valid]
+            if self.trace.enabled:
+                # Counted only when tracing: rows dropped by the dropna part, then by valor_total >= 0
+                stage.update(rows_out=len(df), dropped_missing=int((~complete).sum()),
+                             dropped_negative=int(complete.sum()) - len(df))
+        return df
+
+    def iter_chunks(self, chunksize=1_000_000, start=0, end=None):
+        """
+        Reads the file in chunks and yields each one already cleaned, so the
+        caller can fold it into partial aggregates without ever holding the
+        whole file in memory.
+
+        Args:
+            chunksize (int): Number of rows per chunk. Defaults to 1,000,000.
+            start (int): Byte offset where reading starts. Must be the start of a line;
+                anything other than 0 is read as data rows, without a header.
+            end (int, optional): Byte offset where reading stops. Defaults to the end of the file.
+
+        Yields:
+            pd.DataFrame: A cleaned chunk with standardized column names.
+        """
+        read_options = self._read_options(skip_header=start > 0)
+        source = self.filepath
+        if start > 0 or end is not None:
+            source = io.BufferedReader(ByteRangeReader(self.filepath, start, end))
+
+        try:
+            with pd.read_csv(source, chunksize=chunksize, **read_options) as reader:
+                for chunk in self.trace.iterate(reader, 'read_csv'):
+                    cleaned = self._clean_frame(chunk.rename(columns=self._column_map))
+                    if not cleaned.empty:
+                        yield cleaned
+        finally:
+            # pandas does not close file objects it did not open
+            if source is not self.filepath:
+                source.close()
+
+    @staticmethod
+    def _sql_rows(chunk):
+        """Converts a cleaned chunk to SQLite rows: dates as seconds since the epoch, missing categories as NULL."""
+        categories = chunk['categoria'] if 'categoria' in chunk.columns else pd.Series(None, index=chunk.index)
+        return zip(chunk['data_do_pedido'].to_numpy('datetime64[s]').astype('int64').tolist(),
+                   chunk['id_produto'].astype(str).tolist(),
+                   chunk['id_pedido'].astype(str).tolist(),
+                   chunk['valor_total'].astype('float64').tolist(),
+                   categories.astype(object).where(categories.notna(), None).tolist())
+
+    def to_sqlite(self, db_path, table=SQLITE_TABLE, append=False, chunksize=1_000_000):
+        """
+        Loads the cleaned data into a SQLite database, chunk by chunk, so files larger
+        than memory can be stored once and then queried by date range with SqlAnalyzer.
+        Dates are stored as seconds since the epoch; 'data_do_pedido', 'id_produto'
+        and 'categoria' are indexed.
+
+        Args:
+            db_path (str): Database file, created if needed.
+            table (str): Table name. Defaults to SQLITE_TABLE.
+            append (bool): Add to the rows already in the table instead of replacing them.
+            chunksize (int): Number of rows per chunk.
+
+        Returns:
+            int: Number of rows written.
+        """
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name '{table}'.")
+        rows = 0
+        with contextlib.closing(sqlite3.connect(db_path)) as conn, conn:
+            # The whole load, including the DROP and CREATE (which sqlite3 would otherwise commit
+            # on their own), is one transaction: a failure rolls back to the previous table
+            conn.execute('BEGIN')
+            if not append:
+                conn.execute(f'DROP TABLE IF EXISTS {table}')
+            conn.execute(f'CREATE TABLE IF NOT EXISTS {table} (data_do_pedido INTEGER NOT NULL, '
+                         'id_produto TEXT NOT NULL, id_pedido TEXT NOT NULL, valor_total REAL NOT NULL, categoria TEXT)')
+            for chunk in self.iter_chunks(chunksize):
+                with self.trace.stage('write_sqlite', rows_in=len(chunk)):
+                    conn.executemany(f'INSERT INTO {table} VALUES (?, ?, ?, ?, ?)', self._sql_rows(chunk))
+                rows += len(chunk)
+            # Indexes are built after the rows, which is faster than maintaining them on every insert
+            for column in SQLITE_INDEXED_COLUMNS:
+                conn.execute(f'CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})')
+            # Statistics let the planner pick between an index range and a full scan
+            conn.execute('ANALYZE')
+        return rows
+
+    def _compact_frame(self, df, money='cents'):
+        """
+        Shrinks a cleaned DataFrame: only the analysis columns, order ids as integers if
+        all of them are canonical integers (categoricals otherwise), products and
+        categories as categoricals and money as integer cents ('valor_total_cents') or
+        float32 ('valor_total').
+
+        Args:
+            df (pd.DataFrame): Cleaned DataFrame with standardized column names.
+            money (str): 'cents' (exact, int64) or 'float32' (half the size of float64).
+
+        Returns:
+            pd.DataFrame: The compact DataFrame, accepted as is by DataAnalyzer.
+        """
+        if money not in self.MONEY_FORMATS:
+            raise ValueError(f"Invalid money format: {money}. Choose from {', '.join(self.MONEY_FORMATS)}.")
+
+        columns = [col for col in self.REQUIRED_COLUMNS + self.OPTIONAL_COLUMNS if col in df.columns]
+        compact = df[columns].copy()
+
+        # Order ids become the smallest integer type only if every one is a canonical integer;
+        # otherwise '0012' and '12' would be merged into one order, so they stay categoricals
+        ids = compact['id_pedido']
+        integers = ids.to_numpy() if pd.api.types.is_integer_dtype(ids) else canonical_integers(ids.astype(str))
+        if integers is not None:
+            compact['id_pedido'] = pd.to_numeric(integers, downcast='integer')
+        else:
+            compact['id_pedido'] = ids.astype('category')
+
+        for col in ('id_pedido', 'id_produto', 'categoria'):
+            if col in compact.columns and isinstance(compact[col].dtype, pd.CategoricalDtype):
+                compact[col] = compact[col].cat.remove_unused_categories()
+
+        if money == 'cents':
+            cents = np.round(compact['valor_total'].to_numpy(dtype='float64') * 100).astype('int64')
+            compact.insert(compact.columns.get_loc('valor_total'), 'valor_total_cents', cents)
+            compact = compact.drop(columns='valor_total')
+        else:
+            compact['valor_total'] = compact['valor_total'].astype('float32')
+        return compact
+
+    def _read_in_chunks(self, read_options, on_chunk, chunksize):
+        """
+        Reads the whole file chunksize rows at a time, calling on_chunk with each raw chunk.
+
+        Returns:
+            tuple: (DataFrame, None), or (None, exception) if on_chunk raised one.
+        """
+        chunks = []
+        with pd.read_csv(self.filepath, chunksize=chunksize, **read_options) as reader:
+            for chunk in reader:
+                try:
+                    on_chunk(chunk)
+                except Exception as e:
+                    return None, e
+                chunks.append(chunk)
+
+        df = pd.concat(chunks, ignore_index=True)
+        # Each chunk parsed its categorical columns with its own categories, which
+        # pd.concat turns back into object columns, so those are merged (sorted, as read_csv does)
+        for col, dtype in chunks[0].dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype) and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = union_categoricals([chunk[col] for chunk in chunks], sort_categories=True)
+        return df, None
+
+    def process_data(self, compact=False, money='cents', on_chunk=None, chunksize=1_000_000):
         """
         Processes the sales data with logic for header detection and inference.
+        The file is sniffed from a small sample and then read once, already typed.
+
+        Args:
+            compact (bool): Return the compact representation (see _compact_frame),
+                several times smaller in memory. Defaults to False.
+            money (str): Storage of valor_total in compact mode: 'cents' or 'float32'.
+            on_chunk (callable, optional): Called with each raw chunk as the file is read
+                chunksize rows at a time, e.g. to report progress or to cancel. Anything
+                it raises stops the read and is propagated to the caller.
+            chunksize (int): Number of rows per chunk when on_chunk is given.
 
         Returns:
             pd.DataFrame: The cleaned and processed DataFrame.
             None: If a fatal error occurs during processing.
         """
+        interrupted = None
         try:
-            # Try to read the file assuming it has a header
-            temp_df = pd.read_csv(self.filepath, nrows=10, skip_blank_lines=True)
-            mapped_columns = self._detect_and_map_columns(temp_df.columns)
-            print(f"Columns found from header: {list(mapped_columns.values())}")
-
-            if len(mapped_columns) >= 2:
-                self.df = pd.read_csv(self.filepath, skip_blank_lines=True)
-                self.df = self.df.rename(columns=mapped_columns)
-            else:
-                # Read without header, ensuring all columns are included
-                self.df = pd.read_csv(self.filepath, header=None, skip_blank_lines=True, index_col=False)
-                print(f"Raw DataFrame columns: {list(self.df.columns)}")
-                mapped_columns_from_data = self._infer_column_map_from_data(self.df)
-                print(f"Columns inferred from data: {list(mapped_columns_from_data.values())}")
-                
-                # Rename columns using their indices
-                self.df.columns = [mapped_columns_from_data.get(i, f'col_{i}') for i in range(len(self.df.columns))]
+            read_options = self._read_options()
+            with self.trace.stage('read_csv') as stage:
+                if on_chunk is None:
+                    self.df = pd.read_csv(self.filepath, **read_options)
+                else:
+                    self.df, interrupted = self._read_in_chunks(read_options, on_chunk, chunksize)
+                if interrupted is None:
+                    stage.update(rows_out=len(self.df))
 
         except FileNotFoundError:
             print(f"Error: File not found at {self.filepath}")
@@ -146,37 +520,90 @@ class DataProcessor:
         except Exception as e:
             print(f"An error occurred while loading the file: {e}")
             return None
+        # Raised out here so it is not reported as a read error
+        if interrupted is not None:
+            raise interrupted
+        self.df = self.df.rename(columns=self._column_map)
 
         try:
             # Validate if all essential columns exist
-            required_columns = ['data_do_pedido', 'id_produto', 'id_pedido', 'valor_total']
-            found_in_df = [col for col in required_columns if col in self.df.columns]
+            found_in_df = [col for col in self.REQUIRED_COLUMNS if col in self.df.columns]
             print(f"Columns found in the final DataFrame: {found_in_df}")
-            print(f"Required columns: {required_columns}")
-
-            if not all(col in self.df.columns for col in required_columns):
-                missing_cols = set(required_columns) - set(self.df.columns)
-                raise ValueError(f"Could not identify all necessary columns. Missing: {missing_cols}")
+            print(f"Required columns: {self.REQUIRED_COLUMNS}")
 
-            # Drop rows with missing values
-            self.df.dropna(subset=required_columns, inplace=True)
+            self.df = self._clean_frame(self.df)
             if self.df.empty:
                 raise ValueError("After cleaning, the DataFrame is empty.")
-
-            # Convert data types
-            self.df['data_do_pedido'] = pd.to_datetime(self.df['data_do_pedido'], format='%Y-%m-%d', errors='coerce')
-            self.df['valor_total'] = pd.to_numeric(self.df['valor_total'], errors='coerce')
-            self.df['id_pedido'] = self.df['id_pedido'].astype(str)
-            self.df['id_produto'] = self.df['id_produto'].astype(str)
-
-            # Drop rows with conversion errors (NaT or NaN)
-            self.df.dropna(subset=['data_do_pedido', 'valor_total'], inplace=True)
+            if compact:
+                with self.trace.stage('compact', rows_in=len(self.df)):
+                    self.df = self._compact_frame(self.df, money)
 
         except (KeyError, ValueError) as e:
             print(f"Data type conversion error. Check the file format: {e}")
             return None
-
-        # Filter out invalid values
-        self.df = self.df[self.df['valor_total'] >= 0]
         
-        return self.df
\ No newline at end of file
+        return self.df
+
+
+def memory_footprint(df):
+    """
+    Measures the memory used by each column of a DataFrame (strings included).
+
+    Returns:
+        pd.DataFrame: dtype and bytes per column, plus a 'total' row.
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    footprint = pd.DataFrame({'dtype': df.dtypes.astype(str), 'bytes': usage})
+    footprint.loc['total'] = ['', int(usage.sum())]
+    return footprint
+
+
+def footprint_report(filepath, money='cents'):
+    """
+    Compares the memory footprint of the regular and the compact representation of a file.
+
+    Returns:
+        str: A per-column table and the savings.
+    """
+    regular = DataProcessor(filepath).process_data()
+    compact = DataProcessor(filepath).process_data(compact=True, money=money)
+    if regular is None or compact is None:
+        raise ValueError("Error processing data. Check the input file.")
+
+    before, after = memory_footprint(regular), memory_footprint(compact)
+    lines = [f"{'column':<20} {'regular':>28} {'compact':>28}"]
+    rows = list(dict.fromkeys(list(before.index[:-1]) + list(after.index[:-1]))) + ['total']
+    for col in rows:
+        cells = []
+        for footprint in (before, after):
+            if col in footprint.index:
+                dtype, size = footprint.loc[col, 'dtype'], footprint.loc[col, 'bytes']
+                cells.append(f"{size / 1024 ** 2:>9.2f} MB {dtype:>15}")
+            else:
+                cells.append(f"{'-':>28}")
+        lines.append(f"{col:<20} {cells[0]} {cells[1]}")
+    saved = 1 - after.loc['total', 'bytes'] / before.loc['total', 'bytes']
+    lines.append(f"Compact mode saves {saved:.0%} ({before.loc['total', 'bytes'] / after.loc['total', 'bytes']:.1f}x smaller).")
+    return "\n".join(lines)
+
+
+# --- Script execution: memory footprint report ---
+def main():
+    parser = argparse.ArgumentParser(description="Show the memory footprint of a sales file, or load it into SQLite.")
+    parser.add_argument('file', help="Sales CSV file.")
+    parser.add_argument('money', nargs='?', choices=DataProcessor.MONEY_FORMATS, default='cents',
+                        help="Money representation of the compact footprint. Defaults to cents.")
+    parser.add_argument('--sqlite', metavar='DB', default=None,
+                        help="Load the cleaned data into this SQLite database instead (see SqlAnalyzer).")
+    parser.add_argument('--append', action='store_true', help="Add to the rows already in the database.")
+    args = parser.parse_args()
+
+    if args.sqlite:
+        rows = DataProcessor(args.file).to_sqlite(args.sqlite, append=args.append)
+        print(f"{rows:,} rows written to {args.sqlite}")
+    else:
+        print(footprint_report(args.file, args.money))
+
+
+if __name__ == "__main__":
+    main()
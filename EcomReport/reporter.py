@@ -1,137 +1,326 @@
+import contextlib
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import matplotlib.style
+from matplotlib.artist import setp
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
 import pandas as pd
-import matplotlib.pyplot as plt
 from PIL import Image, ImageDraw, ImageFont
-import os
+
+from tracing import NULL_TRACE, traced
+
+CHART_STYLE = 'seaborn-v0_8-whitegrid'
+REPORT_TITLE = "E-commerce Sales Report"
+# A report has at most four charts, so more processes than that would sit idle
+RENDER_WORKERS = min(4, os.cpu_count() or 1)
+# Part of every chart cache key; bump when _draw_chart draws differently, so stale charts are not reused
+CHART_CACHE_VERSION = 2
+
+# Chart rendering pool, started on first use and reused by every report
+_render_pool = None
+
+
+def _init_render_worker():
+    """Applies the chart style once per worker process instead of once per chart."""
+    matplotlib.style.use(CHART_STYLE)
+
+
+def _get_render_pool():
+    """
+    Returns the shared chart rendering pool, starting it if needed.
+    Workers are spawned rather than forked, so a pool started from the GUI's
+    background thread never inherits a copy of the Tk state.
+    """
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS,
+                                           mp_context=multiprocessing.get_context('spawn'),
+                                           initializer=_init_render_worker)
+    return _render_pool
+
+
+def _draw_chart(df, x_col, y_col, title, name, kind='bar'):
+    """
+    Builds the matplotlib figure of one chart with the object-oriented Figure/Agg API.
+    Touches no pyplot global state, so it is safe to run in any process or thread;
+    the chart style comes from the rcParams active in the calling process.
+
+    Args:
+        df (pd.DataFrame): DataFrame containing the data to plot.
+        x_col (str): Column name for the x-axis.
+        y_col (str): Column name for the y-axis.
+        title (str): Chart title.
+        name (str): Identifier of the chart.
+        kind (str): Type of chart ('bar', 'line', or 'donut'). Defaults to 'bar'.
+
+    Returns:
+        matplotlib.figure.Figure: The chart's figure, not yet rasterized.
+
+    Raises:
+        ValueError: If required columns are missing or invalid chart kind is specified.
+    """
+    # Validate input columns
+    if x_col not in df.columns or y_col not in df.columns:
+        raise ValueError(f"Missing required columns: {x_col}, {y_col}")
+
+    figure = Figure(figsize=(8, 5))
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+
+    # Define a consistent color palette
+    colors = ['#4e79a7', '#f28e2b', '#e15759', '#76b7b2', '#59a14f']
+
+    if kind == 'bar':
+        ax.bar(df[x_col], df[y_col], color=colors[0])
+        setp(ax.get_xticklabels(), rotation=45, ha='right')
+    elif kind == 'line':
+        ax.plot(df[x_col], df[y_col], marker='o', linestyle='-', color=colors[1])
+    elif kind == 'donut':
+        ax.pie(df[y_col], labels=df[x_col], autopct='%1.1f%%', colors=colors,
+               wedgeprops=dict(width=0.3), startangle=90)
+        ax.axis('equal')  # Ensure circular shape
+    else:
+        raise ValueError(f"Invalid chart kind: {kind}. Choose from 'bar', 'line', 'donut'.")
+
+    # Set chart title and labels
+    ax.set_title(title, fontsize=16)
+    if kind != 'donut':  # Donut chart labels are on the slices
+        ax.set_xlabel(x_col.replace('_', ' ').title())
+        ax.set_ylabel(y_col.replace('_', ' ').title())
+
+    figure.tight_layout()
+    return figure
+
+
+def _render_chart(**spec):
+    """
+    Renders one chart (see _draw_chart for the arguments) to an in-memory image.
+    The figure is returned too, so the PDF report reuses it instead of plotting again.
+
+    Returns:
+        tuple: (PIL.Image.Image, matplotlib.figure.Figure) - the rendered chart and its figure.
+    """
+    figure = _draw_chart(**spec)
+    canvas = figure.canvas
+    # Read the pixels straight from the Agg canvas instead of going through a PNG file
+    canvas.draw()
+    chart = Image.frombuffer('RGBA', canvas.get_width_height(), canvas.buffer_rgba()).convert('RGB')
+    return chart, figure
+
+
+def _chart_key(spec):
+    """
+    Hashes what a chart is drawn from: the content of its DataFrame (values, index,
+    column names and dtypes), its parameters, the style and the renderer version.
+    """
+    df = spec['df']
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    parameters = sorted((name, value) for name, value in spec.items() if name != 'df')
+    identity = (list(df.columns), [str(dtype) for dtype in df.dtypes], parameters,
+                CHART_STYLE, matplotlib.__version__, CHART_CACHE_VERSION)
+    digest.update(repr(identity).encode('utf-8'))
+    return digest.hexdigest()
+
 
 class SalesReporter:
     """
     Generates sales charts and compiles a visual report into a single image.
     Responsible for data presentation, not analysis.
     """
-    def __init__(self, data_analyzer_results):
+    def __init__(self, data_analyzer_results, trace=NULL_TRACE, chart_cache=None):
         """
         Initializes the SalesReporter with analysis results.
 
         Args:
             data_analyzer_results (dict): Dictionary containing analysis results from DataAnalyzer.
+            trace (PipelineTrace, optional): Records the rendering and composition stages. Off by default.
+            chart_cache (ChartCache, optional): Reuses charts whose data and parameters did not change
+                since they were last rendered. Off by default.
         """
         self.results = data_analyzer_results
-        self.temp_charts = []
+        self.trace = trace
+        self.chart_cache = chart_cache
+        self.reused_charts = 0  # Charts of the last generate_charts() taken from the cache
+        self.charts = []  # Rendered charts as in-memory PIL images, in report order
+        self.figures = []  # The matching matplotlib figures, for the vector PDF (None for cached charts)
+        self.chart_specs = []  # What each chart is drawn from, to redraw the figures of cached charts
 
-    def _create_chart(self, df, x_col, y_col, title, filename, kind='bar'):
+    def _chart_specs(self):
         """
-        Private method to generate and save a chart as a temporary image.
+        Lists the charts of the report, skipping those whose data is missing.
 
-        Args:
-            df (pd.DataFrame): DataFrame containing the data to plot.
-            x_col (str): Column name for the x-axis.
-            y_col (str): Column name for the y-axis.
-            title (str): Chart title.
-            filename (str): File path to save the chart.
-            kind (str): Type of chart ('bar', 'line', or 'donut'). Defaults to 'bar'.
-
-        Raises:
-            ValueError: If required columns are missing or invalid chart kind is specified.
+        Returns:
+            list: Keyword arguments for _render_chart, in report order.
         """
-        # Validate input columns
-        if x_col not in df.columns or y_col not in df.columns:
-            raise ValueError(f"Missing required columns: {x_col}, {y_col}")
-
-        # Set plot style and figure size
-        plt.style.use('seaborn-v0_8-whitegrid')
-        plt.figure(figsize=(8, 5))
+        specs = []
 
-        # Define a consistent color palette
-        colors = ['#4e79a7', '#f28e2b', '#e15759', '#76b7b2', '#59a14f']
-        
-        if kind == 'bar':
-            plt.bar(df[x_col], df[y_col], color=colors[0])
-            plt.xticks(rotation=45, ha='right')
-        elif kind == 'line':
-            plt.plot(df[x_col], df[y_col], marker='o', linestyle='-', color=colors[1])
-        elif kind == 'donut':
-            plt.pie(df[y_col], labels=df[x_col], autopct='%1.1f%%', colors=colors, 
-                    wedgeprops=dict(width=0.3), startangle=90)
-            plt.axis('equal')  # Ensure circular shape
-        else:
-            raise ValueError(f"Invalid chart kind: {kind}. Choose from 'bar', 'line', 'donut'.")
-
-        # Set chart title and labels
-        plt.title(title, fontsize=16)
-        if kind != 'donut':  # Donut chart labels are on the slices
-            plt.xlabel(x_col.replace('_', ' ').title())
-            plt.ylabel(y_col.replace('_', ' ').title())
-        
-        plt.tight_layout()
-        plt.savefig(filename)
-        plt.close()
-        self.temp_charts.append(filename)
-
-    def generate_charts(self):
-        """
-        Orchestrates the creation of different charts for the report.
-        """
         # Chart 1: Sales by Product (Bar)
         sales_by_product_df = self.results.get('sales_by_product')
         if sales_by_product_df is not None and not sales_by_product_df.empty:
-            self._create_chart(
+            specs.append(dict(
                 df=sales_by_product_df,
                 x_col='id_produto',
                 y_col='valor_total',
                 title='Top 5 Best-Selling Products',
-                filename='top_products_chart.png',
+                name='top_products_chart',
                 kind='bar'
-            )
+            ))
 
         # Chart 2: Sales Over Time (Line)
         sales_by_period_df = self.results.get('sales_by_period')
         if sales_by_period_df is not None and not sales_by_period_df.empty:
-            self._create_chart(
+            specs.append(dict(
                 df=sales_by_period_df,
                 x_col='data_do_pedido',
                 y_col='valor_total',
                 title='Revenue by Period',
-                filename='sales_over_time_chart.png',
+                name='sales_over_time_chart',
                 kind='line'
-            )
+            ))
 
         # Chart 3: Sales Distribution by Product (Donut)
         if sales_by_product_df is not None and not sales_by_product_df.empty:
-            self._create_chart(
+            specs.append(dict(
                 df=sales_by_product_df,
                 x_col='id_produto',
                 y_col='valor_total',
                 title='Sales Distribution by Product',
-                filename='donut_chart.png',
+                name='donut_chart',
                 kind='donut'
-            )
+            ))
 
         # Chart 4: Sales Distribution by Category (Donut)
         sales_by_category_df = self.results.get('sales_by_category')
         if sales_by_category_df is not None and not sales_by_category_df.empty:
-            self._create_chart(
+            specs.append(dict(
                 df=sales_by_category_df,
                 x_col='categoria',
                 y_col='valor_total',
                 title='Sales Distribution by Category',
-                filename='category_donut_chart.png',
+                name='category_donut_chart',
                 kind='donut'
-            )
+            ))
+
+        return specs
+
+    def _render(self, specs, parallel):
+        """
+        Renders charts, yielding (chart, figure) pairs in the order of the specs.
+        In parallel mode every chart is submitted to the pool up front.
+        """
+        if parallel and RENDER_WORKERS > 1 and len(specs) > 1:
+            pool = _get_render_pool()
+            futures = [pool.submit(_render_chart, **spec) for spec in specs]
+            try:
+                for future in futures:
+                    yield future.result()
+            finally:
+                # No-op for finished charts; drops the queued ones if we stopped early
+                for future in futures:
+                    future.cancel()
+        else:
+            for spec in specs:
+                with matplotlib.style.context(CHART_STYLE):
+                    rendered = _render_chart(**spec)
+                yield rendered
+
+    @traced('render_charts')
+    def generate_charts(self, on_chart=None, parallel=True):
+        """
+        Orchestrates the creation of different charts for the report.
+        Charts are rendered concurrently in the shared process pool and delivered in
+        report order, so the result is the same as rendering them one by one. With a
+        chart cache, only the charts whose data or parameters changed are rendered.
+
+        Args:
+            on_chart (callable, optional): Called with each chart (a PIL image) as soon as it is
+                rendered. An exception raised by the callback stops the remaining charts.
+            parallel (bool): Render in the process pool. Callers that already run one report
+                per process (e.g. batch mode) should pass False. Defaults to True.
+        """
+        specs = self._chart_specs()
+        keys = [_chart_key(spec) for spec in specs] if self.chart_cache is not None else [None] * len(specs)
+        cached = [self.chart_cache.load(key) if key is not None else None for key in keys]
+        self.reused_charts = sum(chart is not None for chart in cached)
+
+        missing = [spec for spec, chart in zip(specs, cached) if chart is None]
+        with contextlib.closing(self._render(missing, parallel)) as rendered:
+            for spec, key, chart in zip(specs, keys, cached):
+                if chart is None:
+                    chart = next(rendered)
+                    if key is not None:
+                        self.chart_cache.store(key, chart[0])
+                    image, figure = chart
+                else:
+                    # The cache holds only the image; the PDF redraws the figure from the spec
+                    image, figure = chart, None
+                self.charts.append(image)
+                self.figures.append(figure)
+                self.chart_specs.append(spec)
+                if on_chart is not None:
+                    on_chart(image)
+
+    def _extra_summary_lines(self):
+        """
+        Formats the optional summary lines: order-value quantiles and, for
+        approximate analyses, the error bounds of the estimated metrics.
+
+        Returns:
+            list: Lines of text (empty when the results have neither).
+        """
+        lines = []
+        quantiles = self.results.get('order_value_quantiles')
+        if quantiles:
+            lines.append("Order Value " + ", ".join(f"P{q * 100:g}: R$ {value:,.2f}" for q, value in quantiles.items()))
+
+        error_bounds = self.results.get('error_bounds')
+        if error_bounds:
+            lines.append(f"Approximate: orders ±{error_bounds['total_orders_relative_error']:.1%}, "
+                         f"product totals +R$ {error_bounds['top_products_max_error']:,.2f} max, "
+                         f"quantile rank target ±{error_bounds['quantile_rank_target']:.1%}")
+        return lines
 
-    def compile_report(self):
+    def _summary_text(self):
+        """Formats the summary statistics block shared by the image and the PDF reports."""
+        summary = self.results.get('summary_stats', {})
+        lines = [f"Total Revenue: R$ {summary.get('total_revenue', 0):,.2f}",
+                 f"Total Orders: {int(summary.get('total_orders', 0))}",
+                 f"Average Order Value: R$ {summary.get('average_order_value', 0):,.2f}"]
+        return "\n".join(lines + self._extra_summary_lines())
+
+    def discard_charts(self):
+        """Drops the rendered charts, e.g. when report generation is canceled."""
+        self.charts = []
+        self.figures = []
+        self.chart_specs = []
+
+    @traced('compose_report')
+    def compile_report(self, report_path):
         """
         Compiles all charts and text data into a single report image.
 
+        Args:
+            report_path (str): Where to save the report. The file belongs to the caller,
+                which decides where it lives and when it is deleted.
+
         Returns:
             str: Path to the saved report image.
         """
-        report_path = 'sales_report.png'
         
         # Calculate report dimensions to fit the right pane (70% of window width)
         report_width = 700  # Approximately 70% of 1000px, adjusted for margins
-        chart_heights = [Image.open(path).height for path in self.temp_charts]
-        total_chart_height = sum(chart_heights) + 50 * (len(self.temp_charts) - 1)  # Space between charts
-        report_height = total_chart_height + 250  # Space for title and summary
+        chart_heights = [chart.height for chart in self.charts]
+        total_chart_height = sum(chart_heights) + 50 * (len(self.charts) - 1)  # Space between charts
+        extra_lines = self._extra_summary_lines()
+        summary_height = 30 * len(extra_lines)  # Room for the optional quantile / error lines
+        report_height = total_chart_height + 250 + summary_height  # Space for title and summary
         
         # Create a blank image for the final report
         report_image = Image.new('RGB', (report_width, report_height), 'white')
@@ -146,25 +335,45 @@ class SalesReporter:
             font_text = ImageFont.load_default()
 
         # Add report title
-        draw.text((30, 30), "E-commerce Sales Report", font=font_title, fill='black')
+        draw.text((30, 30), REPORT_TITLE, font=font_title, fill='black')
 
         # Add summary statistics
-        summary = self.results.get('summary_stats', {})
-        text_summary = (f"Total Revenue: R$ {summary.get('total_revenue', 0):,.2f}\n"
-                        f"Total Orders: {int(summary.get('total_orders', 0))}\n"
-                        f"Average Order Value: R$ {summary.get('average_order_value', 0):,.2f}")
-        draw.text((30, 100), text_summary, font=font_text, fill='black')
+        draw.text((30, 100), self._summary_text(), font=font_text, fill='black')
 
         # Add charts to the report
-        y_offset = 200
-        for img_path in self.temp_charts:
-            chart = Image.open(img_path)
-            # Resize chart to fit report width
+        y_offset = 200 + summary_height
+        for chart in self.charts:
+            # Resize a copy of the chart to fit report width
+            chart = chart.copy()
             chart.thumbnail((report_width - 60, chart.height), Image.Resampling.LANCZOS)
             report_image.paste(chart, (30, y_offset))
             y_offset += chart.height + 50
-            chart.close()
-            os.remove(img_path)  # Remove temporary file
 
         report_image.save(report_path)
-        return report_path
\ No newline at end of file
+        return report_path
+
+    @traced('write_pdf')
+    def save_pdf(self, pdf_path):
+        """
+        Writes the report as a multi-page vector PDF: a summary page followed by one
+        page per chart. The charts are the figures already drawn for the image report
+        (charts taken from the cache are drawn again, without rasterizing them),
+        and the text is embedded as real (selectable) text.
+
+        Args:
+            pdf_path (str): Where to save the PDF.
+
+        Returns:
+            str: Path to the saved PDF.
+        """
+        summary_page = Figure(figsize=(8, 5))
+        summary_page.text(0.06, 0.9, REPORT_TITLE, fontsize=22, va='top')
+        summary_page.text(0.06, 0.72, self._summary_text(), fontsize=13, va='top', linespacing=1.8)
+
+        # TrueType fonts keep the text searchable; no creation date keeps the output deterministic
+        with matplotlib.style.context(CHART_STYLE), matplotlib.rc_context({'pdf.fonttype': 42}):
+            with PdfPages(pdf_path, metadata={'Title': REPORT_TITLE, 'CreationDate': None}) as pdf:
+                pdf.savefig(summary_page)
+                for figure, spec in zip(self.figures, self.chart_specs):
+                    pdf.savefig(figure if figure is not None else _draw_chart(**spec))
+        return pdf_path
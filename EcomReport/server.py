@@ -0,0 +1,294 @@
+import argparse
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+# Import classes from our modules
+from processor import DataProcessor, STREAMING_THRESHOLD_BYTES
+from analyzer import DataAnalyzer
+from incremental import IncrementalAnalyzer
+from cache import ProcessedDataCache
+
+DEFAULT_PORT = 8765
+# Encoded responses kept per loaded dataset
+RESPONSE_CACHE_SIZE = 256
+# Seconds between two checks of the file for changes
+POLL_INTERVAL = 2.0
+# Query endpoints and the parameters each one accepts
+ENDPOINTS = {
+    'summary': (),
+    'products': ('n',),
+    'period': ('period',),
+    'orders': ('period',),
+    'category': (),
+}
+
+
+def _json_default(value):
+    """Converts the numpy and pandas scalars found in analysis results to JSON types."""
+    if isinstance(value, pd.Timestamp):
+        return value.date().isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _records(df):
+    """Turns a result DataFrame (with its index, if meaningful) into a list of JSON-ready rows."""
+    if not isinstance(df.index, pd.RangeIndex):
+        df = df.reset_index()
+    df = df.rename(columns=str)
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+class _Dataset:
+    """One loaded version of the file: the analyzer and the responses already computed from it."""
+    def __init__(self, analyzer, signature, load_seconds):
+        self.analyzer = analyzer
+        self.signature = signature
+        self.load_seconds = load_seconds
+        self.loaded_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self._responses = OrderedDict()  # Query key -> encoded JSON body, least recently used first
+        self._lock = threading.Lock()
+
+    def cached(self, key):
+        """Returns the encoded response of a query, or None if it was not computed yet."""
+        with self._lock:
+            body = self._responses.get(key)
+            if body is not None:
+                self._responses.move_to_end(key)
+            return body
+
+    def store(self, key, body, max_entries):
+        """Keeps an encoded response, evicting the least recently used ones beyond max_entries."""
+        with self._lock:
+            self._responses[key] = body
+            while len(self._responses) > max_entries:
+                self._responses.popitem(last=False)
+
+
+class SalesQueryService:
+    """
+    Keeps a processed sales file loaded and answers analysis queries on it.
+    The file is loaded once (through the processed data cache, or incrementally for
+    large files); responses are cached per loaded version. When the file changes it
+    is reloaded in the background and swapped in atomically: requests already running
+    finish on the version they started with, new ones see the new version.
+    """
+    def __init__(self, filepath, compact=False, cache_size=RESPONSE_CACHE_SIZE, poll_interval=POLL_INTERVAL):
+        """
+        Args:
+            filepath (str): Path to the sales CSV file.
+            compact (bool): Keep the processed data in the compact representation (less memory).
+            cache_size (int): Maximum number of cached responses per loaded version.
+            poll_interval (float): Seconds between two checks of the file for changes.
+        """
+        self.filepath = filepath
+        self.compact = compact
+        self.cache_size = cache_size
+        self.poll_interval = poll_interval
+        self.cache = ProcessedDataCache()
+        self._incremental = None
+        self._stop = threading.Event()
+        self._watcher = None
+        self._failed_signature = None
+        self.dataset = self._load()
+
+    def _signature(self):
+        """Identifies the current version of the file."""
+        stat = os.stat(self.filepath)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load(self):
+        """Processes the file and returns a new dataset; raises ValueError if the file cannot be processed."""
+        start = time.perf_counter()
+        signature = self._signature()
+        if signature[0] > STREAMING_THRESHOLD_BYTES:
+            # Large files: only the rows appended since the last load are parsed
+            if self._incremental is None:
+                self._incremental = IncrementalAnalyzer(self.filepath)
+            analyzer = self._incremental.update()
+        else:
+            variant = 'compact' if self.compact else ''
+            processed_df = self.cache.load(self.filepath, variant)
+            if processed_df is None:
+                processed_df = DataProcessor(self.filepath).process_data(compact=self.compact)
+                if processed_df is None:
+                    raise ValueError(f"Error processing {self.filepath}. Check the input file.")
+                self.cache.store(self.filepath, processed_df, variant)
+            analyzer = DataAnalyzer(processed_df, workers=None)
+        return _Dataset(analyzer, signature, time.perf_counter() - start)
+
+    def reload_if_changed(self):
+        """
+        Reloads the file if it changed since the current version was loaded.
+        On failure (e.g. the file is being rewritten) the current version keeps being served.
+
+        Returns:
+            bool: True if a new version was swapped in.
+        """
+        try:
+            signature = self._signature()
+        except OSError as e:
+            # The file is missing for a moment (e.g. being replaced); checked again on the next poll
+            print(f"Cannot check {self.filepath}, still serving the previous version: {e}")
+            return False
+        if signature in (self.dataset.signature, self._failed_signature):
+            return False
+        try:
+            dataset = self._load()
+        except (OSError, ValueError) as e:
+            # Not retried until the file changes again
+            self._failed_signature = signature
+            print(f"Reload failed, still serving the previous version: {e}")
+            return False
+        self.dataset = dataset  # Single assignment: in-flight requests keep their own reference
+        print(f"Reloaded {self.filepath} in {dataset.load_seconds:.2f}s")
+        return True
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                # An unexpected error must not stop the watcher: later changes are still picked up
+                print(f"Error while checking {self.filepath} for changes: {e}")
+
+    def start_watching(self):
+        """Starts checking the file for changes on a background thread."""
+        self._watcher = threading.Thread(target=self._watch, daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+
+    def _answer(self, analyzer, endpoint, params):
+        """Runs one query (a known endpoint, with known parameters) on an analyzer and returns its JSON-ready result."""
+        if endpoint == 'summary':
+            return analyzer.get_summary_stats()
+        if endpoint == 'products':
+            return _records(analyzer.get_sales_by_product(int(params.get('n', 5))))
+        if endpoint == 'period':
+            return _records(analyzer.get_sales_by_period(params.get('period', 'M')))
+        if endpoint == 'orders':
+            if not hasattr(analyzer, 'get_orders_by_period'):
+                raise ValueError("Orders per period are not available for large (streamed) files.")
+            return _records(analyzer.get_orders_by_period(params.get('period', 'M')))
+        return _records(analyzer.get_sales_by_category())
+
+    def query(self, endpoint, params):
+        """
+        Answers a query, from the response cache when possible.
+
+        Args:
+            endpoint (str): 'summary', 'products', 'period', 'orders', 'category' or 'status'.
+            params (dict): Query parameters, e.g. {'n': '10'} or {'period': 'W'}.
+
+        Returns:
+            tuple: (HTTP status, encoded JSON body, whether it came from the cache).
+        """
+        dataset = self.dataset  # The version this request is answered from, even if a reload happens meanwhile
+        if endpoint == 'status':
+            status = {'file': self.filepath, 'loaded_at': dataset.loaded_at,
+                      'load_seconds': round(dataset.load_seconds, 3), 'size_bytes': dataset.signature[0]}
+            return 200, json.dumps(status).encode('utf-8'), False
+
+        if endpoint not in ENDPOINTS:
+            return 404, json.dumps({'error': f"Unknown query '{endpoint}'."}).encode('utf-8'), False
+        unknown = sorted(set(params) - set(ENDPOINTS[endpoint]))
+        if unknown:
+            # The endpoint exists, so this is a bad request rather than a missing resource
+            error = f"Unknown parameter(s) for '{endpoint}': {', '.join(unknown)}."
+            return 400, json.dumps({'error': error}).encode('utf-8'), False
+
+        key = (endpoint, tuple(sorted(params.items())))
+        body = dataset.cached(key)
+        if body is not None:
+            return 200, body, True
+        try:
+            result = self._answer(dataset.analyzer, endpoint, params)
+        except ValueError as e:
+            return 400, json.dumps({'error': str(e)}).encode('utf-8'), False
+        except Exception as e:
+            # A bug in the analysis, not a bad request: reported as a server error
+            print(f"Error answering '{endpoint}' {params}: {e!r}")
+            return 500, json.dumps({'error': "Internal error."}).encode('utf-8'), False
+        body = json.dumps(result, default=_json_default).encode('utf-8')
+        dataset.store(key, body, self.cache_size)
+        return 200, body, False
+
+
+class _QueryHandler(BaseHTTPRequestHandler):
+    """Maps GET /<endpoint>?<params> to SalesQueryService.query."""
+    service = None  # Set by serve()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            status, body, cached = self.service.query(url.path.strip('/') or 'status', params)
+        except Exception as e:
+            print(f"Error handling {self.path}: {e!r}")
+            status, body, cached = 500, json.dumps({'error': "Internal error."}).encode('utf-8'), False
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Cache', 'hit' if cached else 'miss')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep the console for load and reload messages
+
+
+def serve(filepath, host='127.0.0.1', port=DEFAULT_PORT, compact=False, poll_interval=POLL_INTERVAL):
+    """
+    Loads a sales file and serves queries on it until interrupted.
+
+    Args:
+        filepath (str): Path to the sales CSV file.
+        host (str): Interface to listen on. Defaults to local connections only.
+        port (int): TCP port.
+        compact (bool): Keep the processed data in the compact representation.
+        poll_interval (float): Seconds between two checks of the file for changes.
+    """
+    service = SalesQueryService(filepath, compact=compact, poll_interval=poll_interval)
+    print(f"Loaded {filepath} in {service.dataset.load_seconds:.2f}s")
+    handler = type('QueryHandler', (_QueryHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    service.start_watching()
+    print(f"Serving on http://{host}:{server.server_address[1]}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop_watching()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve sales analysis queries on a CSV file over a local HTTP/JSON API.")
+    parser.add_argument('file', help="Sales CSV file to load.")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to listen on. Defaults to 127.0.0.1.")
+    parser.add_argument('-p', '--port', type=int, default=DEFAULT_PORT, help=f"Port. Defaults to {DEFAULT_PORT}.")
+    parser.add_argument('--compact', action='store_true', help="Keep the processed data compact to use less memory.")
+    parser.add_argument('--poll', type=float, default=POLL_INTERVAL,
+                        help=f"Seconds between checks of the file for changes. Defaults to {POLL_INTERVAL}.")
+    args = parser.parse_args()
+    serve(args.file, args.host, args.port, args.compact, args.poll)
+
+
+# Service entry point
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def _hash64(values):
+    """Hashes any 1-D collection of values to uint64, consistently across chunks and processes."""
+    return pd.util.hash_pandas_object(pd.Series(values), index=False).to_numpy()
+
+
+def _bit_length(values):
+    """Vectorized int.bit_length() for a uint64 array."""
+    values = values.copy()
+    lengths = np.zeros(values.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = values >= (np.uint64(1) << np.uint64(shift))
+        lengths[mask] += shift
+        values[mask] >>= np.uint64(shift)
+    lengths += (values > 0).astype(np.uint8)
+    return lengths
+
+
+# 10^1 .. 10^18, to count the digits of int64 values
+_POWERS_OF_TEN = 10 ** np.arange(1, 19, dtype=np.int64)
+
+
+def canonical_integers(text):
+    """
+    Converts a Series of strings to int64 only if every value is a canonical integer:
+    exactly the digits (and sign) of the number, so '012', '+12' and ' 12' are not '12'.
+
+    Returns:
+        np.ndarray: The int64 values, or None if any value is not canonical.
+    """
+    integers = pd.to_numeric(text, errors='coerce')
+    if integers.dtype != np.int64:
+        return None
+    integers = integers.to_numpy()
+    digits = np.searchsorted(_POWERS_OF_TEN, np.abs(integers), side='right') + 1
+    if (text.str.len().to_numpy() == digits + (integers < 0)).all():
+        return integers
+    return None
+
+
+def _sorted_unique(values):
+    """np.unique by sorting, which is several times faster than its hash-based path for these arrays."""
+    values = np.sort(values)
+    if len(values) > 1:
+        values = values[np.concatenate(([True], values[1:] != values[:-1]))]
+    return values
+
+
+class DistinctSet:
+    """
+    Exact distinct counter kept as one sorted, de-duplicated numpy array: 8 bytes per
+    value when every value is a canonical integer string (e.g. '1001', not '01001'),
+    otherwise the UTF-8 length of the longest value, instead of the 60-100 bytes of a
+    Python string in a set. Memory still grows with the number of distinct values;
+    HyperLogLog keeps it fixed, at the cost of a small error. Sets are mergeable.
+    """
+    # New values are buffered and merged into the array in batches of at least this size
+    MIN_BATCH = 1 << 20
+
+    def __init__(self):
+        self._values = np.array([], dtype=np.int64)
+        self._pending = []
+        self._pending_size = 0
+
+    @staticmethod
+    def _encode(values):
+        """Returns the sorted distinct non-null values as int64 if they are all canonical integers, else as bytes."""
+        text = pd.Series(values).dropna().astype(str)
+        if len(text) == 0:
+            return np.array([], dtype=np.int64)
+        integers = canonical_integers(text)
+        if integers is not None:
+            return _sorted_unique(integers)
+        return _sorted_unique(text.str.encode('utf-8').to_numpy().astype(bytes))
+
+    @staticmethod
+    def _combine(arrays):
+        """Merges sorted distinct arrays; integers are turned back into their (canonical) text if any array is text."""
+        if all(array.dtype == np.int64 for array in arrays):
+            return _sorted_unique(np.concatenate(arrays))
+        arrays = [np.char.encode(array.astype(str), 'utf-8') if array.dtype == np.int64 else array
+                  for array in arrays if len(array)]
+        width = max(array.dtype.itemsize for array in arrays)
+        return _sorted_unique(np.concatenate([array.astype(f'S{width}') for array in arrays]))
+
+    def _flush(self):
+        if self._pending:
+            self._values = self._combine([self._values, *self._pending])
+            self._pending = []
+            self._pending_size = 0
+
+    def _add(self, array):
+        self._pending.append(array)
+        self._pending_size += len(array)
+        # Merging only once the buffer is as large as the array keeps the total copying O(n log n)
+        if self._pending_size >= max(len(self._values), self.MIN_BATCH):
+            self._flush()
+
+    def update(self, values):
+        """Adds a batch of values (missing values are ignored)."""
+        if len(values):
+            self._add(self._encode(values))
+
+    def merge(self, other: 'DistinctSet') -> 'DistinctSet':
+        """Merges another set into this one."""
+        other._flush()
+        self._add(other._values)
+        return self
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the values, in bytes."""
+        return self._values.nbytes + sum(array.nbytes for array in self._pending)
+
+    def count(self) -> int:
+        """Returns the exact number of distinct values."""
+        self._flush()
+        return len(self._values)
+
+
+class HyperLogLog:
+    """
+    Approximate distinct counter (HyperLogLog) with a fixed memory of 2^p one-byte registers.
+    Sketches built with the same precision can be merged, e.g. across chunks or processes.
+    """
+    def __init__(self, relative_error: float = 0.01):
+        """
+        Args:
+            relative_error (float): Target standard error of the count (1.04 / sqrt(2^p)).
+        """
+        if not 0 < relative_error < 1:
+            raise ValueError("relative_error must be between 0 and 1.")
+        self.p = min(max(math.ceil(math.log2((1.04 / relative_error) ** 2)), 4), 18)
+        self.m = 1 << self.p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        """Standard error of the estimate."""
+        return 1.04 / math.sqrt(self.m)
+
+    def update(self, values):
+        """Adds a batch of values to the sketch."""
+        if len(values) == 0:
+            return
+        hashes = _hash64(values)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        remainder = hashes << np.uint64(self.p)
+        # Rank = position of the first 1-bit in the remaining 64 - p bits
+        rank = np.minimum(64 - _bit_length(remainder).astype(np.int64) + 1, 64 - self.p + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """Merges another sketch of the same precision into this one."""
+        if other.p != self.p:
+            raise ValueError("Only HyperLogLog sketches with the same precision can be merged.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        """Returns the estimated number of distinct values."""
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m ** 2 / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Small range correction (linear counting)
+        if estimate <= 2.5 * self.m and zeros > 0:
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+
+class SpaceSaving:
+    """
+    Weighted Space-Saving summary of the heaviest keys (e.g. top products by revenue).
+    Keeps at most `capacity` counters; every reported total is an upper bound that
+    overestimates the true one by at most `max_error`. Summaries are mergeable.
+    """
+    def __init__(self, relative_error: float = 0.01):
+        """
+        Args:
+            relative_error (float): Maximum overestimation as a fraction of the total weight.
+        """
+        if not 0 < relative_error < 1:
+            raise ValueError("relative_error must be between 0 and 1.")
+        self.capacity = math.ceil(1 / relative_error)
+        self.counters = pd.DataFrame({'count': pd.Series(dtype='float64'), 'error': pd.Series(dtype='float64')})
+        # Largest total that was dropped: an upper bound for any key not in the summary
+        self.floor = 0.0
+        self.total_weight = 0.0
+
+    @property
+    def max_error(self) -> float:
+        """Maximum overestimation of any reported total."""
+        return float(self.counters['error'].max()) if not self.counters.empty else 0.0
+
+    def _combine(self, counters, floor):
+        """Merges another set of counters (with its own floor) and truncates to capacity."""
+        joined = self.counters.join(counters, how='outer', lsuffix='_a', rsuffix='_b')
+        combined = pd.DataFrame({
+            'count': joined['count_a'].fillna(self.floor) + joined['count_b'].fillna(floor),
+            'error': joined['error_a'].fillna(self.floor) + joined['error_b'].fillna(floor)
+        })
+        if len(combined) > self.capacity:
+            combined = combined.sort_values('count', ascending=False, kind='mergesort')
+            self.floor = float(combined['count'].iloc[self.capacity])
+            combined = combined.iloc[:self.capacity]
+        self.counters = combined
+
+    def update(self, keys, weights):
+        """
+        Adds a batch of (key, weight) pairs. The batch is aggregated exactly first and
+        then merged, so the cost depends on the distinct keys of the batch, not its rows.
+        """
+        if len(keys) == 0:
+            return
+        batch = pd.Series(np.asarray(weights, dtype='float64')).groupby(np.asarray(keys)).sum()
+        self.total_weight += float(batch.sum())
+        self._combine(pd.DataFrame({'count': batch, 'error': 0.0}), 0.0)
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """Merges another summary into this one."""
+        self.capacity = max(self.capacity, other.capacity)
+        self.total_weight += other.total_weight
+        self._combine(other.counters, other.floor)
+        return self
+
+    def top(self, n: int) -> pd.Series:
+        """Returns the estimated totals of the n heaviest keys, sorted by key on ties."""
+        return self.counters['count'].sort_index().nlargest(n)
+
+
+class TDigest:
+    """
+    Mergeable t-digest for approximate quantiles (e.g. order-value percentiles).
+    Values are grouped into centroids whose size shrinks towards the tails, so extreme
+    quantiles stay accurate. Rank error is roughly `relative_error`.
+    """
+    def __init__(self, relative_error: float = 0.01):
+        """
+        Args:
+            relative_error (float): Target rank error; sets the compression (number of centroids).
+        """
+        if not 0 < relative_error < 1:
+            raise ValueError("relative_error must be between 0 and 1.")
+        self.relative_error = relative_error
+        self.compression = max(100, math.ceil(5 / relative_error))
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _compress(self, means, weights):
+        """Groups sorted points into centroids using the arcsine scale function."""
+        order = np.argsort(means, kind='mergesort')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q_left = (np.cumsum(weights) - weights) / total
+        k = self.compression / (2 * math.pi) * np.arcsin(2 * q_left - 1)
+        cluster = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, cluster[1:] != cluster[:-1]])
+        cluster_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / cluster_weights
+        self.weights = cluster_weights
+
+    def update(self, values):
+        """Adds a batch of values to the digest."""
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, np.ones(values.size)]))
+
+    def merge(self, other: 'TDigest') -> 'TDigest':
+        """Merges another digest into this one."""
+        if other.weights.size == 0:
+            return self
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Returns the estimated q-quantile (0 <= q <= 1), or NaN for an empty digest."""
+        if self.weights.size == 0:
+            return math.nan
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [total]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * total, positions, values))
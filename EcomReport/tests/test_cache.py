@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import ProcessedDataCache
+from processor import DataProcessor
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test csv files', 'vendas.csv')
+
+
+class ProcessedDataCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ProcessedDataCache(os.path.join(self.tmp.name, 'cache'))
+        self.path = os.path.join(self.tmp.name, 'sales.csv')
+        with open(SAMPLE_CSV, 'rb') as source, open(self.path, 'wb') as f:
+            f.write(source.read())
+        self.df = DataProcessor(self.path).process_data()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hit_after_store(self):
+        self.assertIsNone(self.cache.load(self.path))
+        self.cache.store(self.path, self.df)
+        pd.testing.assert_frame_equal(self.cache.load(self.path), self.df)
+        # A new instance reads the persisted index
+        reopened = ProcessedDataCache(self.cache.cache_dir)
+        pd.testing.assert_frame_equal(reopened.load(self.path), self.df)
+        self.assertEqual([name for name in os.listdir(self.cache.cache_dir) if name.endswith('.tmp')], [])
+
+    def test_same_size_edit_invalidates(self):
+        self.cache.store(self.path, self.df)
+        stat = os.stat(self.path)
+        with open(self.path, 'r+b') as f:
+            data = f.read()
+            f.seek(len(data) // 2)
+            f.write(b'9' if data[len(data) // 2:len(data) // 2 + 1] != b'9' else b'8')
+        # Same size and modification time: only the content hash can tell
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertIsNone(self.cache.load(self.path))
+
+    def test_invalidate_source(self):
+        self.cache.store(self.path, self.df)
+        self.cache.invalidate(self.path)
+        self.assertIsNone(self.cache.load(self.path))
+        self.assertEqual(self.cache.total_size(), 0)
+
+    def test_eviction_keeps_cache_under_limit(self):
+        self.cache.store(self.path, self.df)
+        small = ProcessedDataCache(self.cache.cache_dir, max_bytes=self.cache.total_size() - 1)
+        small.store(self.path, self.df, variant='other')
+        self.assertLessEqual(small.total_size(), small.max_bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import DataAnalyzer
+from incremental import IncrementalAnalyzer
+from processor import DataProcessor
+
+HEADER = 'data_do_pedido,id_produto,id_pedido,valor_total\n'
+
+
+def _rows(start, count, value='10.00'):
+    return ''.join(f'2024-01-{i % 28 + 1:02d},Produto {i % 5},{i},{value}\n' for i in range(start, start + count))
+
+
+class IncrementalAnalyzerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'sales.csv')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(HEADER + _rows(0, 5000))
+        self.incremental = IncrementalAnalyzer(self.path, state_dir=os.path.join(self.tmp.name, 'state'),
+                                               chunksize=1000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _expected(self):
+        return DataAnalyzer(DataProcessor(self.path).process_data()).get_summary_stats()
+
+    def test_append_parses_only_new_rows(self):
+        self.incremental.update()
+        self.assertEqual(self.incremental.last_mode, 'full')
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(_rows(5000, 300))
+
+        stats = self.incremental.update().get_summary_stats()
+        self.assertEqual(self.incremental.last_mode, 'incremental')
+        self.assertEqual(self.incremental.rows_added, 300)
+        self.assertEqual(stats, self._expected())
+
+        self.incremental.update()
+        self.assertEqual(self.incremental.last_mode, 'unchanged')
+
+    def test_same_length_edit_in_the_middle_forces_rebuild(self):
+        self.incremental.update()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        middle = text.index('\n', len(text) * 11 // 20) + 1
+        line_end = text.index('\n', middle)
+        edited = text[middle:line_end].replace('10.00', '99.00')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(text[:middle] + edited + text[line_end:])
+        self.assertEqual(os.path.getsize(self.path), len(text))
+
+        stats = self.incremental.update().get_summary_stats()
+        self.assertEqual(self.incremental.last_mode, 'full')
+        self.assertEqual(stats['total_revenue'], 5000 * 10.0 + 89.0)
+        self.assertEqual(stats, self._expected())
+
+
+if __name__ == '__main__':
+    unittest.main()
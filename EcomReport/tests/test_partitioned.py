@@ -0,0 +1,44 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from partitioned import parallel_group_sum
+
+
+def _expected(keys, values):
+    expected = values.groupby(keys, observed=True).sum().astype('float64')
+    expected.index = pd.Index(np.asarray(expected.index), name=keys.name)
+    return expected
+
+
+class ParallelGroupSumTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        rows = 20_000
+        keys = pd.Series([f'Produto {i}' for i in rng.integers(0, 300, rows)], name='id_produto')
+        keys[rng.random(rows) < 0.01] = None
+        self.keys = keys
+        # Integer cents: sums are exact, so any partitioning must match groupby exactly
+        self.values = pd.Series(rng.integers(0, 100_000, rows), name='valor_total')
+
+    def test_matches_groupby_sum(self):
+        for keys in (self.keys, self.keys.astype('category')):
+            expected = _expected(keys, self.values)
+            for workers in (1, 2, 3):
+                with self.subTest(dtype=str(keys.dtype), workers=workers):
+                    result = parallel_group_sum(keys, self.values, workers=workers, min_rows=1000)
+                    pd.testing.assert_series_equal(result, expected, check_index_type=False)
+
+    def test_more_workers_than_keys(self):
+        keys = self.keys.where(self.keys.isna(), self.keys.str.len() % 2).astype(object)
+        result = parallel_group_sum(keys, self.values, workers=4, min_rows=1000)
+        pd.testing.assert_series_equal(result, _expected(keys, self.values), check_index_type=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
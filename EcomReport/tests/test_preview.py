@@ -0,0 +1,44 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preview import CsvPager
+
+
+class CsvPagerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _pager(self, text):
+        path = os.path.join(self.tmp.name, 'sales.csv')
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        pager = CsvPager(path, stride=4)
+        self.addCleanup(pager.close)
+        pager._indexer.join()
+        return pager
+
+    def test_empty_file(self):
+        pager = self._pager('')
+        self.assertEqual(pager.line_number(0), 0)
+        self.assertEqual(pager.offset_of_line(10), 0)
+        self.assertEqual(pager.read_lines(0, 100), ('', 0))
+        self.assertEqual(pager.total_lines, 0)
+
+    def test_line_numbers_and_offsets(self):
+        lines = [f'line {i}\n' for i in range(10)]
+        pager = self._pager(''.join(lines))
+        offset = pager.offset_of_line(6)
+        self.assertEqual(pager.line_number(offset), 6)
+        self.assertEqual(pager.read_lines(offset, 2)[0], lines[6] + lines[7])
+        self.assertEqual(pager.total_lines, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processor import DataProcessor
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test csv files', 'test1.csv')
+
+
+class Stop(Exception):
+    pass
+
+
+class ProcessDataTest(unittest.TestCase):
+    def test_chunked_read_matches_single_read(self):
+        expected = DataProcessor(SAMPLE_CSV).process_data()
+        seen = []
+        chunked = DataProcessor(SAMPLE_CSV).process_data(on_chunk=seen.append, chunksize=2)
+        self.assertGreater(len(seen), 1)
+        pd.testing.assert_frame_equal(chunked, expected)
+
+    def test_on_chunk_exception_stops_the_read(self):
+        calls = []
+
+        def on_chunk(chunk):
+            calls.append(len(chunk))
+            raise Stop()
+
+        with self.assertRaises(Stop):
+            DataProcessor(SAMPLE_CSV).process_data(on_chunk=on_chunk, chunksize=2)
+        self.assertEqual(len(calls), 1)
+
+
+class CompactFrameTest(unittest.TestCase):
+    def _compact(self, ids):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sales.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('data_do_pedido,id_produto,id_pedido,valor_total\n')
+                for i, order_id in enumerate(ids):
+                    f.write(f'2024-01-0{i + 1},Produto A,{order_id},10.0\n')
+            return DataProcessor(path).process_data(compact=True)
+
+    def test_canonical_integer_ids_become_integers(self):
+        df = self._compact(['12', '7', '-3'])
+        self.assertTrue(pd.api.types.is_integer_dtype(df['id_pedido']))
+        self.assertEqual(df['id_pedido'].tolist(), [12, 7, -3])
+
+    def test_leading_zeros_keep_ids_apart(self):
+        df = self._compact(['0012', '12', '7'])
+        self.assertIsInstance(df['id_pedido'].dtype, pd.CategoricalDtype)
+        self.assertEqual(df['id_pedido'].nunique(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import re
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import DataAnalyzer
+from cache import ChartCache
+from processor import DataProcessor
+from reporter import SalesReporter
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test csv files', 'vendas.csv')
+
+
+class ChartCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        analyzer = DataAnalyzer(DataProcessor(SAMPLE_CSV).process_data(), workers=1)
+        cls.results = {
+            'summary_stats': analyzer.get_summary_stats(),
+            'sales_by_product': analyzer.get_sales_by_product(),
+            'sales_by_period': analyzer.get_sales_by_period(),
+            'sales_by_category': analyzer.get_sales_by_category()
+        }
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ChartCache(os.path.join(self.tmp.name, 'charts'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _reporter(self):
+        reporter = SalesReporter(self.results, chart_cache=self.cache)
+        reporter.generate_charts(parallel=False)
+        return reporter
+
+    def test_cached_charts_are_reused_as_png(self):
+        first = self._reporter()
+        self.assertEqual(first.reused_charts, 0)
+        entries = [name for name in os.listdir(self.cache.cache_dir) if name != ChartCache.INDEX_NAME]
+        self.assertEqual(len(entries), len(first.charts))
+        self.assertTrue(all(name.endswith('.png') for name in entries))
+
+        second = self._reporter()
+        self.assertEqual(second.reused_charts, len(first.charts))
+        self.assertEqual([chart.tobytes() for chart in second.charts], [chart.tobytes() for chart in first.charts])
+
+    def test_pdf_redraws_cached_figures(self):
+        self._reporter()
+        reporter = self._reporter()
+        self.assertTrue(all(figure is None for figure in reporter.figures))
+        pdf_path = reporter.save_pdf(os.path.join(self.tmp.name, 'report.pdf'))
+        with open(pdf_path, 'rb') as f:
+            pdf = f.read()
+        # Summary page plus one page per chart
+        self.assertEqual(int(re.search(rb'/Count (\d+)', pdf).group(1)), len(reporter.charts) + 1)
+
+
+    def test_compile_report_writes_only_the_given_path(self):
+        reporter = self._reporter()
+        before = set(os.listdir(tempfile.gettempdir()))
+        report_path = os.path.join(self.tmp.name, 'report.png')
+        self.assertEqual(reporter.compile_report(report_path), report_path)
+        self.assertTrue(os.path.getsize(report_path) > 0)
+        self.assertEqual(set(os.listdir(tempfile.gettempdir())) - before, set())
+
+
+if __name__ == '__main__':
+    unittest.main()
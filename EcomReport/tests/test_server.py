@@ -0,0 +1,42 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+from cache import ProcessedDataCache
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test csv files', 'vendas.csv')
+
+
+class QueryStatusTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        with mock.patch.object(server, 'ProcessedDataCache', lambda: ProcessedDataCache(cls.tmp.name)):
+            cls.service = server.SalesQueryService(SAMPLE_CSV)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def _status(self, endpoint, params=None):
+        status, body, _ = self.service.query(endpoint, params or {})
+        json.loads(body)
+        return status
+
+    def test_statuses(self):
+        self.assertEqual(self._status('summary'), 200)
+        self.assertEqual(self._status('products', {'n': '3'}), 200)
+        self.assertEqual(self._status('nope'), 404)
+        self.assertEqual(self._status('summary', {'n': '3'}), 400)
+        self.assertEqual(self._status('period', {'period': 'X'}), 400)
+        self.assertEqual(self._status('products', {'n': 'abc'}), 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sketches import DistinctSet, HyperLogLog, SpaceSaving, TDigest
+
+
+class SketchErrorTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def test_hyperloglog_within_three_standard_errors(self):
+        values = [f'order-{i}' for i in range(200_000)]
+        first, second = HyperLogLog(0.01), HyperLogLog(0.01)
+        first.update(values[:120_000])
+        second.update(values[80_000:])
+        estimate = first.merge(second).count()
+        self.assertLessEqual(abs(estimate - len(values)) / len(values), 3 * first.relative_error)
+
+    def test_space_saving_overestimates_by_at_most_max_error(self):
+        keys = self.rng.zipf(1.5, 100_000) % 2000
+        weights = self.rng.uniform(1, 100, len(keys))
+        summary = SpaceSaving(0.01)
+        for start in range(0, len(keys), 10_000):
+            summary.update(keys[start:start + 10_000], weights[start:start + 10_000])
+        exact = pd.Series(weights).groupby(keys).sum()
+        top = summary.top(5)
+        self.assertEqual(list(top.index), list(exact.nlargest(5).index))
+        for key, estimate in top.items():
+            self.assertGreaterEqual(estimate, exact[key] - 1e-6)
+            self.assertLessEqual(estimate - exact[key], summary.max_error + 1e-6)
+
+    def test_tdigest_rank_error_near_target(self):
+        values = self.rng.lognormal(5, 1, 200_000)
+        digests = [TDigest(0.01) for _ in range(4)]
+        for digest, part in zip(digests, np.array_split(values, 4)):
+            for start in range(0, len(part), 10_000):
+                digest.update(part[start:start + 10_000])
+        digest = digests[0]
+        for other in digests[1:]:
+            digest.merge(other)
+        ordered = np.sort(values)
+        for q in (0.5, 0.9, 0.99):
+            rank = np.searchsorted(ordered, digest.quantile(q)) / len(values)
+            self.assertLessEqual(abs(rank - q), digest.relative_error)
+
+    def test_distinct_set_is_exact(self):
+        first, second = DistinctSet(), DistinctSet()
+        first.update(pd.Series(['1', '2', '3', '0012']))
+        second.update(pd.Series(['3', '12', None]))
+        self.assertEqual(first.merge(second).count(), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import DataAnalyzer, SqlAnalyzer
+from processor import DataProcessor, SQLITE_TABLE
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test csv files', 'test1.csv')
+
+
+def _count(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f'SELECT COUNT(*) FROM {SQLITE_TABLE}').fetchone()[0]
+
+
+class ToSqliteTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'sales.db')
+        self.rows = DataProcessor(SAMPLE_CSV).to_sqlite(self.db_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _failing_processor(self):
+        """A processor whose load fails after the first chunk has been inserted."""
+        processor = DataProcessor(SAMPLE_CSV)
+        chunks = processor.iter_chunks
+
+        def iter_chunks(chunksize=1_000_000, start=0, end=None):
+            yield next(chunks(chunksize, start, end))
+            raise OSError("disk went away")
+        processor.iter_chunks = iter_chunks
+        return processor
+
+    def test_replace_failure_keeps_previous_table(self):
+        self.assertGreater(self.rows, 0)
+        with self.assertRaises(OSError):
+            self._failing_processor().to_sqlite(self.db_path)
+        self.assertEqual(_count(self.db_path), self.rows)
+
+    def test_append_failure_adds_no_rows(self):
+        with self.assertRaises(OSError):
+            self._failing_processor().to_sqlite(self.db_path, append=True)
+        self.assertEqual(_count(self.db_path), self.rows)
+
+    def test_replace_succeeds(self):
+        self.assertEqual(DataProcessor(SAMPLE_CSV).to_sqlite(self.db_path), self.rows)
+        self.assertEqual(_count(self.db_path), self.rows)
+
+
+class SqlAnalyzerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.tmp.name, 'sales.db')
+        DataProcessor(SAMPLE_CSV).to_sqlite(db_path)
+        self.sql = SqlAnalyzer(db_path)
+        self.frame = DataAnalyzer(DataProcessor(SAMPLE_CSV).process_data())
+
+    def tearDown(self):
+        self.sql.close()
+        self.tmp.cleanup()
+
+    def test_summary_matches_dataframe(self):
+        stats = self.sql.get_summary_stats()
+        self.assertIsInstance(stats['total_orders'], int)
+        self.assertEqual(stats, self.frame.get_summary_stats())
+
+    def test_quantiles_match_dataframe(self):
+        quantiles = (0, 0.1, 0.5, 0.9, 0.99, 1)
+        expected = self.frame.get_order_value_quantiles(quantiles)
+        for q, value in self.sql.get_order_value_quantiles(quantiles).items():
+            self.assertAlmostEqual(value, expected[q])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import DataAnalyzer, SalesAggregates, StreamingAnalyzer
+from processor import DataProcessor
+
+
+class StreamingAnalyzerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, 'sales.csv')
+        rng = np.random.default_rng(0)
+        rows = 5000
+        df = pd.DataFrame({
+            'data_do_pedido': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 400, rows), unit='D'),
+            'id_produto': [f'Produto {i}' for i in rng.integers(0, 40, rows)],
+            'id_pedido': rng.integers(0, 3000, rows),
+            'valor_total': np.round(rng.uniform(1, 500, rows), 2),
+            'categoria': [f'Categoria {i}' for i in rng.integers(0, 6, rows)],
+        })
+        # A few rows the cleaning must drop on both paths
+        df.loc[::97, 'valor_total'] = -1
+        df.to_csv(cls.path, index=False, date_format='%Y-%m-%d')
+        cls.memory = DataAnalyzer(DataProcessor(cls.path).process_data())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def _chunks(self):
+        return DataProcessor(self.path).iter_chunks(chunksize=700)
+
+    def _assert_same(self, streaming):
+        self.assertEqual(streaming.get_summary_stats()['total_orders'], self.memory.get_summary_stats()['total_orders'])
+        for name in ('total_revenue', 'average_order_value'):
+            self.assertAlmostEqual(streaming.get_summary_stats()[name], self.memory.get_summary_stats()[name], places=6)
+        for method, args in (('get_sales_by_product', (5,)), ('get_sales_by_period', ('M',)),
+                             ('get_sales_by_period', ('W',)), ('get_sales_by_category', ())):
+            with self.subTest(method=method, args=args):
+                pd.testing.assert_frame_equal(getattr(streaming, method)(*args).reset_index(drop=True),
+                                              getattr(self.memory, method)(*args).reset_index(drop=True),
+                                              check_dtype=False)
+
+    def test_chunked_aggregates_match_in_memory(self):
+        self._assert_same(StreamingAnalyzer.from_chunks(self._chunks()))
+
+    def test_merged_partials_match_in_memory(self):
+        partials = [SalesAggregates(), SalesAggregates()]
+        for i, chunk in enumerate(self._chunks()):
+            partials[i % 2].update(chunk)
+        self._assert_same(StreamingAnalyzer(partials[0].merge(partials[1])))
+
+
+if __name__ == '__main__':
+    unittest.main()
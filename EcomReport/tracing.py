@@ -0,0 +1,162 @@
+import functools
+import json
+import os
+import time
+
+# psutil is optional; without it the memory deltas come from /proc (Linux) or are left out
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def _current_rss():
+    """Returns the resident set size of this process in bytes, or None if unavailable."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class _StageTimer:
+    """Context manager that measures one run of a stage and folds it into the trace."""
+    def __init__(self, trace, name, rows_in):
+        self._trace = trace
+        self._name = name
+        self.counts = {} if rows_in is None else {'rows_in': rows_in}
+
+    def update(self, **counts):
+        """Records counts of this run, e.g. rows_out=len(df) or dropped_missing=3."""
+        self.counts.update(counts)
+
+    def __enter__(self):
+        self._rss = _current_rss()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._start
+        rss = _current_rss()
+        memory_delta = rss - self._rss if rss is not None and self._rss is not None else None
+        self._trace._record(self._name, seconds, memory_delta, self.counts)
+        return False
+
+
+class PipelineTrace:
+    """
+    Structured per-stage trace of the processor -> analyzer -> reporter pipeline.
+    A stage run several times (e.g. once per chunk) is folded into a single entry:
+    durations, row counts and memory deltas are summed and `calls` counts the runs.
+    Stages may nest (reading chunks happens inside aggregation), so their times
+    are not meant to be added up.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.stages = {}  # Stage name -> aggregated measurements, in order of first run
+
+    def stage(self, name, rows_in=None):
+        """
+        Measures a block of code as a pipeline stage.
+
+        Args:
+            name (str): Stage name, e.g. 'read_csv' or 'render_charts'.
+            rows_in (int, optional): Rows entering the stage.
+
+        Returns:
+            Context manager whose value accepts .update(rows_out=..., ...) for extra counts.
+        """
+        return _StageTimer(self, name, rows_in)
+
+    def iterate(self, iterable, name):
+        """Yields the items of an iterable, measuring each step (e.g. reading a chunk) as a stage run."""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name) as stage:
+                item = next(iterator, StopIteration)
+                if item is not StopIteration:
+                    stage.update(rows_out=len(item))
+            if item is StopIteration:
+                return
+            yield item
+
+    def _record(self, name, seconds, memory_delta, counts):
+        """Folds one run of a stage into its entry."""
+        entry = self.stages.setdefault(name, {'stage': name, 'calls': 0, 'seconds': 0.0, 'memory_delta_bytes': None})
+        entry['calls'] += 1
+        entry['seconds'] += seconds
+        if memory_delta is not None:
+            entry['memory_delta_bytes'] = (entry['memory_delta_bytes'] or 0) + memory_delta
+        for key, value in counts.items():
+            entry[key] = entry.get(key, 0) + value
+
+    def to_dict(self):
+        """Returns the trace as plain data, ready for json.dump."""
+        return {'stages': [dict(entry, seconds=round(entry['seconds'], 6)) for entry in self.stages.values()]}
+
+    def save_json(self, path):
+        """Writes the trace to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    def summary(self):
+        """Formats the trace as a single line, short enough for a status bar."""
+        parts = []
+        for entry in self.stages.values():
+            text = f"{entry['stage']} {entry['seconds']:.2f}s"
+            dropped = [f"-{entry[key]:,} {label}" for key, label in
+                       (('dropped_missing', 'missing'), ('dropped_negative', 'negative')) if entry.get(key)]
+            if dropped:
+                text += f" ({', '.join(dropped)})"
+            parts.append(text)
+        return " | ".join(parts)
+
+
+class _NullStage:
+    """Stage context that measures nothing."""
+    def update(self, **counts):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullTrace:
+    """
+    Disabled trace with the PipelineTrace interface. Every call is a no-op on shared
+    objects, so instrumented code costs next to nothing when tracing is off.
+    """
+    enabled = False
+    _stage = _NullStage()
+
+    def stage(self, name, rows_in=None):
+        return self._stage
+
+    def iterate(self, iterable, name):
+        return iterable
+
+
+NULL_TRACE = NullTrace()
+
+
+def traced(name):
+    """
+    Decorator measuring a method as a pipeline stage of the instance's `trace`.
+    With tracing off it only adds one attribute check per call.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not self.trace.enabled:
+                return method(self, *args, **kwargs)
+            with self.trace.stage(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,52 +1,186 @@
+import argparse
+import io
+import os
 import pandas as pd
-import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 
-def remove_nulls_with_progress(input_file):
+# Tamanho aproximado (em bytes) de cada intervalo do arquivo limpo por um processo no modo paralelo
+RANGE_BYTES = 32 * 1024 * 1024
+
+def _clean_chunk(chunk):
+    """
+    Remove as linhas com valores nulos de um pedaço do arquivo.
+
+    Returns:
+        tuple: (pedaço limpo, nulos por coluna no pedaço original)
+    """
+    return chunk.dropna(), chunk.isna().sum()
+
+def _summary(output_file, total_rows, removed_rows, null_counts):
+    """Exibe o resultado da limpeza e o devolve como dicionário."""
+    print(f"\nConcluído!")
+    print(f"Arquivo limpo salvo como: {output_file}")
+    print(f"Linhas removidas: {removed_rows} de {total_rows}")
+    if null_counts is not None and null_counts.any():
+        print("Valores nulos por coluna:")
+        for column, count in null_counts[null_counts > 0].items():
+            print(f"  {column}: {count}")
+
+    return {
+        'output_file': output_file,
+        'total_rows': total_rows,
+        'removed_rows': removed_rows,
+        'null_counts': {} if null_counts is None else null_counts.astype(int).to_dict()
+    }
+
+def remove_nulls_with_progress(input_file, chunk_size=100_000):
     """
     Lê um arquivo CSV, remove todas as linhas com valores nulos e salva o resultado.
-    Exibe uma barra de progresso durante a leitura do arquivo.
+    O arquivo é processado em fluxo: cada pedaço (chunk) é lido, limpo, gravado na
+    saída e descartado, então o uso de memória fica constante para qualquer tamanho
+    de arquivo. Exibe uma barra de progresso em bytes lidos.
 
     Args:
         input_file (str): O caminho do arquivo CSV de entrada.
+        chunk_size (int): Número de linhas por pedaço. Padrão: 100.000.
+
+    Returns:
+        dict: Resumo da limpeza (arquivo de saída, linhas lidas, linhas removidas e
+            nulos por coluna), ou None em caso de erro.
     """
     try:
         print("Iniciando a limpeza do seu CSV...")
-        
-        # Lê o arquivo em pedaços (chunks) para processar arquivos grandes
-        # A barra de progresso será exibida durante a leitura
-        chunk_size = 1000
-        total_rows = sum(1 for line in open(input_file)) - 1 # Conta o total de linhas, ignorando o cabeçalho
-        
-        chunks = []
-        with tqdm(total=total_rows, desc="Lendo CSV") as pbar:
-            for chunk in pd.read_csv(input_file, chunksize=chunk_size):
-                chunks.append(chunk)
-                pbar.update(len(chunk))
-        
-        # Concatena os pedaços em um único DataFrame
-        df = pd.concat(chunks, ignore_index=True)
-        
-        # Armazena o número original de linhas
-        original_rows = len(df)
-        
-        # Remove todas as linhas com valores nulos
-        print("\nProcessando dados...")
-        df_cleaned = df.dropna()
-        
-        # Calcula o número de linhas removidas
-        removed_rows = original_rows - len(df_cleaned)
-        
+
         # Cria o nome do novo arquivo de saída
         output_file = input_file.replace('.csv', '_null_removed.csv')
-        
-        # Salva o DataFrame limpo em um novo arquivo CSV
-        df_cleaned.to_csv(output_file, index=False)
-        
-        print(f"\nConcluído!")
-        print(f"Arquivo limpo salvo como: {output_file}")
-        print(f"Linhas removidas: {removed_rows}")
-        
+
+        total_rows = 0
+        removed_rows = 0
+        null_counts = None
+
+        # Os valores são lidos como texto, então cada linha é gravada exatamente como estava
+        # (sem conversões de tipo que mudem de um pedaço para outro, como 1 -> 1.0)
+        with open(input_file, 'rb') as source, \
+                open(output_file, 'w', encoding='utf-8', newline='') as output, \
+                tqdm(total=os.path.getsize(input_file), unit='B', unit_scale=True, desc="Limpando CSV") as pbar:
+            for chunk in pd.read_csv(source, chunksize=chunk_size, dtype=str):
+                # Conta os nulos de cada coluna antes de descartar as linhas
+                chunk_cleaned, chunk_nulls = _clean_chunk(chunk)
+                null_counts = chunk_nulls if null_counts is None else null_counts + chunk_nulls
+
+                # Grava o pedaço limpo (o cabeçalho só uma vez)
+                chunk_cleaned.to_csv(output, index=False, header=total_rows == 0, lineterminator='\n')
+
+                total_rows += len(chunk)
+                removed_rows += len(chunk) - len(chunk_cleaned)
+                pbar.update(source.tell() - pbar.n)
+
+        return _summary(output_file, total_rows, removed_rows, null_counts)
+
+    except FileNotFoundError:
+        print(f"Erro: O arquivo '{input_file}' não foi encontrado.")
+    except Exception as e:
+        print(f"Ocorreu um erro: {e}")
+
+def _split_ranges(input_file, range_bytes):
+    """
+    Divide o arquivo em intervalos de bytes alinhados ao início das linhas.
+
+    Returns:
+        tuple: (cabeçalho em bytes, lista de intervalos (início, fim) dos dados)
+    """
+    size = os.path.getsize(input_file)
+    with open(input_file, 'rb') as f:
+        header = f.readline()
+        ranges = []
+        start = f.tell()
+        while start < size:
+            # Avança até a próxima quebra de linha depois do tamanho alvo
+            f.seek(min(start + range_bytes, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+def _clean_range(input_file, header, start, end):
+    """
+    Limpa um intervalo de linhas do arquivo (executado em um processo do pool).
+
+    Returns:
+        tuple: (linhas limpas em CSV, sem cabeçalho, linhas lidas, linhas removidas, nulos por coluna)
+    """
+    with open(input_file, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    # O cabeçalho é repetido para que cada intervalo tenha as mesmas colunas
+    chunk = pd.read_csv(io.BytesIO(header + data), dtype=str)
+    chunk_cleaned, chunk_nulls = _clean_chunk(chunk)
+    csv_text = chunk_cleaned.to_csv(index=False, header=False, lineterminator='\n')
+    return csv_text.encode('utf-8'), len(chunk), len(chunk) - len(chunk_cleaned), chunk_nulls
+
+def remove_nulls_parallel(input_file, workers=None, range_bytes=RANGE_BYTES):
+    """
+    Versão em vários processos de remove_nulls_with_progress, com a mesma saída.
+    O arquivo é dividido em intervalos de bytes alinhados às quebras de linha, que são
+    limpos em paralelo. Os resultados são gravados na ordem original das linhas por
+    um buffer de remontagem com poucos intervalos, então a memória fica limitada.
+    Campos entre aspas com quebras de linha dentro não são suportados neste modo.
+
+    Args:
+        input_file (str): O caminho do arquivo CSV de entrada.
+        workers (int, optional): Número de processos. Padrão: um por núcleo.
+        range_bytes (int): Tamanho aproximado de cada intervalo. Padrão: 32 MB.
+
+    Returns:
+        dict: Resumo da limpeza, como em remove_nulls_with_progress, ou None em caso de erro.
+    """
+    workers = workers or os.cpu_count() or 1
+    try:
+        # Arquivos pequenos ou um só processo: o modo em fluxo é suficiente
+        if workers == 1 or os.path.getsize(input_file) <= range_bytes:
+            return remove_nulls_with_progress(input_file)
+
+        print(f"Iniciando a limpeza do seu CSV em {workers} processos...")
+        output_file = input_file.replace('.csv', '_null_removed.csv')
+        header, ranges = _split_ranges(input_file, range_bytes)
+        columns = pd.read_csv(io.BytesIO(header), dtype=str).columns
+
+        total_rows = 0
+        removed_rows = 0
+        null_counts = pd.Series(0, index=columns)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor, \
+                open(output_file, 'wb') as output, \
+                tqdm(total=os.path.getsize(input_file), unit='B', unit_scale=True, desc="Limpando CSV") as pbar:
+            output.write(pd.DataFrame(columns=columns).to_csv(index=False, lineterminator='\n').encode('utf-8'))
+            pbar.update(len(header))
+
+            # Buffer de remontagem: no máximo 2 intervalos por processo em andamento,
+            # gravados sempre na ordem em que aparecem no arquivo
+            pending = deque()
+            next_range = iter(ranges)
+            for start, end in next_range:
+                pending.append((end - start, executor.submit(_clean_range, input_file, header, start, end)))
+                if len(pending) >= 2 * workers:
+                    break
+            while pending:
+                range_size, future = pending.popleft()
+                csv_bytes, rows, removed, chunk_nulls = future.result()
+                output.write(csv_bytes)
+                total_rows += rows
+                removed_rows += removed
+                null_counts = null_counts + chunk_nulls
+                pbar.update(range_size)
+
+                for start, end in next_range:
+                    pending.append((end - start, executor.submit(_clean_range, input_file, header, start, end)))
+                    break
+
+        return _summary(output_file, total_rows, removed_rows, null_counts)
+
     except FileNotFoundError:
         print(f"Erro: O arquivo '{input_file}' não foi encontrado.")
     except Exception as e:
@@ -54,8 +188,13 @@ def remove_nulls_with_progress(input_file):
 
 # --- Execução do Script ---
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Uso: python nome_do_script.py nome_do_arquivo.csv")
+    parser = argparse.ArgumentParser(description="Remove as linhas com valores nulos de um arquivo CSV.")
+    parser.add_argument('arquivo', help="Arquivo CSV de entrada.")
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help="Número de processos (0 = um por núcleo). Padrão: 1, em fluxo.")
+    args = parser.parse_args()
+
+    if args.workers == 1:
+        remove_nulls_with_progress(args.arquivo)
     else:
-        nome_do_arquivo = sys.argv[1]
-        remove_nulls_with_progress(nome_do_arquivo)
\ No newline at end of file
+        remove_nulls_parallel(args.arquivo, args.workers or None)
@@ -0,0 +1,382 @@
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from valida_pedidos import MAX_MEMORY_BYTES, build_key_index
+
+class Stage:
+    """
+    Etapa de limpeza de um Pipeline: recebe um pedaço (chunk) do arquivo e devolve o
+    pedaço transformado, possivelmente com menos linhas ou colunas. open() e close()
+    são chamados uma vez, no início e no fim da execução.
+    """
+    name = 'stage'
+
+    def open(self):
+        """Prepara a etapa antes do primeiro pedaço (por exemplo, carrega um índice)."""
+
+    def apply(self, chunk):
+        raise NotImplementedError
+
+    def close(self):
+        """Libera o que foi preparado em open()."""
+
+class DropNulls(Stage):
+    """Remove as linhas com valores nulos (em todas as colunas ou só nas indicadas)."""
+    name = 'drop_nulls'
+
+    def __init__(self, columns=None):
+        """
+        Args:
+            columns (list, optional): Colunas verificadas. Padrão: todas.
+        """
+        self.columns = columns
+
+    def apply(self, chunk):
+        return chunk.dropna(subset=self.columns)
+
+class Trim(Stage):
+    """Remove os espaços do início e do fim dos textos; textos que ficam vazios viram nulos."""
+    name = 'trim'
+
+    def __init__(self, columns=None, empty_as_null=True):
+        """
+        Args:
+            columns (list, optional): Colunas tratadas. Padrão: todas as colunas de texto.
+            empty_as_null (bool): Trata textos vazios como nulos. Padrão: True.
+        """
+        self.columns = columns
+        self.empty_as_null = empty_as_null
+
+    def apply(self, chunk):
+        chunk = chunk.copy()
+        columns = self.columns or [column for column in chunk.columns if chunk[column].dtype == object]
+        for column in columns:
+            values = chunk[column].str.strip()
+            chunk[column] = values.mask(values == '') if self.empty_as_null else values
+        return chunk
+
+class Coerce(Stage):
+    """
+    Converte colunas de texto para 'int', 'float', 'date' ou 'datetime'. Valores que não
+    podem ser convertidos removem a linha (errors='drop') ou viram nulos (errors='null').
+    Valores nulos continuam nulos.
+    """
+    name = 'coerce'
+    TYPES = ('int', 'float', 'date', 'datetime')
+
+    def __init__(self, columns, errors='drop', date_format=None):
+        """
+        Args:
+            columns (dict): Coluna -> tipo, por exemplo {'quantity': 'int', 'order_date': 'date'}.
+            errors (str): 'drop' (remove a linha) ou 'null' (deixa o valor nulo). Padrão: 'drop'.
+            date_format (str, optional): Formato das datas de entrada (por exemplo, '%d/%m/%Y').
+                Padrão: detectado pelo pandas.
+        """
+        for column, kind in columns.items():
+            if kind not in self.TYPES:
+                raise ValueError(f"Tipo '{kind}' inválido para a coluna '{column}'. Use: {', '.join(self.TYPES)}.")
+        if errors not in ('drop', 'null'):
+            raise ValueError("errors deve ser 'drop' ou 'null'.")
+        self.columns = columns
+        self.errors = errors
+        self.date_format = date_format
+
+    def _convert(self, values, kind):
+        if kind in ('date', 'datetime'):
+            converted = pd.to_datetime(values, errors='coerce', format=self.date_format)
+            return converted.dt.normalize() if kind == 'date' else converted
+        converted = pd.to_numeric(values, errors='coerce', dtype_backend='numpy_nullable')
+        if kind == 'int':
+            # Valores com parte decimal não são inteiros válidos
+            if pd.api.types.is_float_dtype(converted.dtype):
+                converted = converted.mask(converted % 1 != 0)
+            return converted.astype('Int64')
+        return converted.astype('float64')
+
+    def apply(self, chunk):
+        chunk = chunk.copy()
+        failed = np.zeros(len(chunk), dtype=bool)
+        for column, kind in self.columns.items():
+            converted = self._convert(chunk[column], kind)
+            failed |= (chunk[column].notna() & converted.isna()).to_numpy()
+            chunk[column] = converted
+        return chunk[~failed] if self.errors == 'drop' else chunk
+
+class RangeFilter(Stage):
+    """
+    Mantém só as linhas com o valor de uma coluna dentro de um intervalo (limites inclusos).
+    Limites numéricos comparam números; limites de texto são lidos como datas. Valores
+    nulos ou que não podem ser comparados removem a linha, a não ser com keep_nulls.
+    """
+    name = 'range'
+
+    def __init__(self, column, min=None, max=None, keep_nulls=False):
+        """
+        Args:
+            column (str): Coluna filtrada.
+            min (int, float ou str, optional): Limite inferior.
+            max (int, float ou str, optional): Limite superior.
+            keep_nulls (bool): Mantém as linhas com o valor nulo. Padrão: False.
+        """
+        if min is None and max is None:
+            raise ValueError(f"O filtro da coluna '{column}' precisa de 'min' ou 'max'.")
+        self.column = column
+        self.keep_nulls = keep_nulls
+        self.dates = isinstance(min, str) or isinstance(max, str)
+        self.min = pd.Timestamp(min) if self.dates and min is not None else min
+        self.max = pd.Timestamp(max) if self.dates and max is not None else max
+
+    def apply(self, chunk):
+        values = chunk[self.column]
+        if self.dates:
+            values = values if pd.api.types.is_datetime64_any_dtype(values) else pd.to_datetime(values, errors='coerce')
+        elif not pd.api.types.is_numeric_dtype(values):
+            values = pd.to_numeric(values, errors='coerce')
+
+        keep = values.notna()
+        if self.min is not None:
+            keep &= values >= self.min
+        if self.max is not None:
+            keep &= values <= self.max
+        if self.keep_nulls:
+            keep |= chunk[self.column].isna()
+        return chunk[keep.fillna(False).to_numpy(dtype=bool)]
+
+class ValidateKeys(Stage):
+    """
+    Remove as linhas cuja chave não existe em outro arquivo (por exemplo, itens de pedidos
+    inexistentes). As chaves de referência são indexadas uma vez, em open(), com o
+    índice de valida_pedidos (em memória ou em disco, conforme o tamanho).
+    """
+    name = 'validate_keys'
+
+    def __init__(self, column, keys_file, keys_column=None, nullable=False, mode='auto', max_memory=MAX_MEMORY_BYTES):
+        """
+        Args:
+            column (str): Coluna verificada.
+            keys_file (str): Arquivo CSV com as chaves válidas.
+            keys_column (str, optional): Coluna das chaves em keys_file. Padrão: o mesmo nome de column.
+            nullable (bool): Aceita valores nulos. Padrão: False.
+            mode (str): Índice das chaves: 'memory', 'disk' ou 'auto' (ver valida_pedidos.new_key_index).
+            max_memory (int): Limite de memória, em bytes, do índice no modo 'auto'.
+        """
+        self.column = column
+        self.keys_file = keys_file
+        self.keys_column = keys_column or column
+        self.nullable = nullable
+        self.mode = mode
+        self.max_memory = max_memory
+        self._index = None
+
+    def open(self):
+        self._index = build_key_index(self.keys_file, self.keys_column, self.mode, max_memory=self.max_memory)
+
+    def apply(self, chunk):
+        values = chunk[self.column]
+        # Chaves já convertidas por Coerce voltam a texto para a comparação
+        keys = values if values.dtype == object else values.astype('string').astype(object)
+        valid = self._index.contains(keys)
+        if self.nullable:
+            valid |= values.isna().to_numpy()
+        return chunk[valid]
+
+    def close(self):
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+class Select(Stage):
+    """Mantém só as colunas indicadas, na ordem dada, opcionalmente renomeadas."""
+    name = 'select'
+
+    def __init__(self, columns, rename=None):
+        """
+        Args:
+            columns (list): Colunas mantidas.
+            rename (dict, optional): Nome atual -> novo nome.
+        """
+        self.columns = columns
+        self.rename = rename or {}
+
+    def apply(self, chunk):
+        return chunk[self.columns].rename(columns=self.rename)
+
+# Tipos de etapa aceitos no arquivo de configuração
+STAGES = {stage.name: stage for stage in (DropNulls, Trim, Coerce, RangeFilter, ValidateKeys, Select)}
+
+class Pipeline:
+    """
+    Encadeia etapas de limpeza sobre um único fluxo de pedaços do arquivo: cada pedaço é
+    lido uma vez (como texto), passa por todas as etapas em ordem e é gravado na saída,
+    então o arquivo é lido uma só vez e a memória não depende do seu tamanho.
+
+    Exemplo:
+        Pipeline([Trim(), DropNulls(), Coerce({'quantity': 'int'})]).run('itens.csv', 'itens_limpos.csv')
+    """
+    def __init__(self, stages, chunk_size=100_000, date_format=None):
+        """
+        Args:
+            stages (list): Etapas (instâncias de Stage), na ordem em que são aplicadas.
+            chunk_size (int): Linhas por pedaço. Padrão: 100.000.
+            date_format (str, optional): Formato das datas na saída. Padrão: ISO.
+        """
+        self.stages = stages
+        self.chunk_size = chunk_size
+        self.date_format = date_format
+
+    @classmethod
+    def from_config(cls, config, base_dir='.'):
+        """
+        Monta um Pipeline a partir de uma configuração (dict, como em load_config).
+        Cada etapa é {"type": <nome>, ...parâmetros da classe}; caminhos de arquivos
+        são relativos a base_dir.
+
+        Raises:
+            ValueError: Se uma etapa tiver um tipo desconhecido ou parâmetros inválidos.
+        """
+        stages = []
+        for spec in config.get('stages', []):
+            params = dict(spec)
+            kind = params.pop('type', None)
+            if kind not in STAGES:
+                raise ValueError(f"Etapa '{kind}' desconhecida. Use: {', '.join(STAGES)}.")
+            if 'keys_file' in params:
+                params['keys_file'] = os.path.join(base_dir, params['keys_file'])
+            try:
+                stages.append(STAGES[kind](**params))
+            except TypeError as e:
+                raise ValueError(f"Parâmetros inválidos na etapa '{kind}': {e}")
+        return cls(stages, config.get('chunk_size', 100_000), config.get('date_format'))
+
+    def run(self, input_file, output_file):
+        """
+        Executa as etapas sobre o arquivo de entrada, em uma única passagem, e grava o resultado.
+
+        Args:
+            input_file (str): Arquivo CSV de entrada.
+            output_file (str): Arquivo CSV de saída.
+
+        Returns:
+            dict: Resumo (arquivo de saída, linhas lidas, linhas gravadas e linhas
+                removidas por etapa, na ordem das etapas).
+        """
+        total_rows = 0
+        output_rows = 0
+        removed = [0] * len(self.stages)
+        first_chunk = True
+
+        opened = []
+        try:
+            for stage in self.stages:
+                stage.open()
+                opened.append(stage)
+
+            with open(input_file, 'rb') as source, \
+                    open(output_file, 'w', encoding='utf-8', newline='') as output, \
+                    tqdm(total=os.path.getsize(input_file), unit='B', unit_scale=True, desc="Limpando CSV") as pbar:
+                for chunk in pd.read_csv(source, dtype=str, chunksize=self.chunk_size):
+                    total_rows += len(chunk)
+                    for i, stage in enumerate(self.stages):
+                        rows = len(chunk)
+                        chunk = stage.apply(chunk)
+                        removed[i] += rows - len(chunk)
+
+                    # O cabeçalho só no primeiro pedaço
+                    chunk.to_csv(output, index=False, header=first_chunk, lineterminator='\n',
+                                 date_format=self.date_format)
+                    first_chunk = False
+                    output_rows += len(chunk)
+                    pbar.update(source.tell() - pbar.n)
+        finally:
+            for stage in opened:
+                stage.close()
+
+        return {
+            'output_file': output_file,
+            'total_rows': total_rows,
+            'output_rows': output_rows,
+            'removed_rows': [{'stage': stage.name, 'rows': count} for stage, count in zip(self.stages, removed)]
+        }
+
+def load_config(config_file):
+    """
+    Lê a configuração de um pipeline de um arquivo JSON. Formato:
+
+        {
+          "input": "order_items.csv",
+          "output": "order_items_clean.csv",
+          "chunk_size": 100000,
+          "stages": [
+            {"type": "trim"},
+            {"type": "drop_nulls", "columns": ["order_id"]},
+            {"type": "coerce", "columns": {"quantity": "int", "list_price": "float"}},
+            {"type": "range", "column": "discount", "min": 0, "max": 1},
+            {"type": "validate_keys", "column": "order_id", "keys_file": "orders.csv"},
+            {"type": "select", "columns": ["order_id", "product_id", "quantity"]}
+          ]
+        }
+
+    Os parâmetros de cada etapa são os das classes DropNulls, Trim, Coerce, RangeFilter,
+    ValidateKeys e Select; os caminhos são relativos à pasta da configuração.
+
+    Returns:
+        tuple: (Pipeline, arquivo de entrada, arquivo de saída)
+    """
+    with open(config_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(config_file))
+    if 'input' not in config:
+        raise ValueError("A configuração não tem o campo 'input'.")
+
+    input_file = os.path.join(base_dir, config['input'])
+    output_file = os.path.join(base_dir, config['output']) if 'output' in config \
+        else input_file.replace('.csv', '_clean.csv')
+    return Pipeline.from_config(config, base_dir), input_file, output_file
+
+def run_config(config_file, input_file=None, output_file=None):
+    """
+    Executa o pipeline descrito em um arquivo de configuração e exibe o resumo.
+
+    Args:
+        config_file (str): Arquivo JSON da configuração (ver load_config).
+        input_file (str, optional): Substitui o arquivo de entrada da configuração.
+        output_file (str, optional): Substitui o arquivo de saída da configuração.
+
+    Returns:
+        dict: Resumo da execução (ver Pipeline.run), ou None em caso de erro.
+    """
+    try:
+        pipeline, config_input, config_output = load_config(config_file)
+        input_file = input_file or config_input
+        output_file = output_file or (config_output if input_file == config_input
+                                      else input_file.replace('.csv', '_clean.csv'))
+
+        print(f"Executando {len(pipeline.stages)} etapas sobre {input_file}...")
+        summary = pipeline.run(input_file, output_file)
+
+        print(f"\nConcluído!")
+        print(f"Arquivo limpo salvo como: {output_file}")
+        print(f"Linhas gravadas: {summary['output_rows']} de {summary['total_rows']}")
+        for stage in summary['removed_rows']:
+            print(f"  {stage['stage']}: {stage['rows']} linhas removidas")
+        return summary
+
+    except FileNotFoundError as e:
+        print(f"Erro: O arquivo '{e.filename}' não foi encontrado.")
+    except Exception as e:
+        print(f"Ocorreu um erro: {e}")
+
+# --- Execução do Script ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Limpa um arquivo CSV em uma única passagem com as etapas de um arquivo de configuração JSON.",
+        epilog="Exemplo: python pipeline.py pipeline_exemplo.json")
+    parser.add_argument('config', help="Arquivo JSON com a entrada, a saída e as etapas.")
+    parser.add_argument('-i', '--entrada', help="Arquivo CSV de entrada (substitui o da configuração).")
+    parser.add_argument('-o', '--saida', help="Arquivo CSV de saída (substitui o da configuração).")
+    args = parser.parse_args()
+    run_config(args.config, args.entrada, args.saida)
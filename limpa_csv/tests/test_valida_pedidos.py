@@ -0,0 +1,58 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from valida_pedidos import DiskKeyIndex, SortedKeyIndex, _integer_keys
+
+BIG = '1234567890123456789'
+
+
+def _index(cls, *chunks):
+    index = cls(100) if cls is DiskKeyIndex else cls()
+    for chunk in chunks:
+        index.add(pd.Series(chunk))
+    index.finish()
+    return index
+
+
+class IntegerKeysTest(unittest.TestCase):
+    def test_same_key_is_classified_alike_in_any_chunk(self):
+        keys = [BIG, '5', '0', '-7', '9223372036854775807', '-9223372036854775808',
+                '9223372036854775808', '-0', '007', '+7', ' 7']
+        alone = [bool(_integer_keys(pd.Series([key]))[0][0]) for key in keys]
+        mixed, values = _integer_keys(pd.Series(keys + ['abc']))
+        self.assertEqual(mixed[:-1].tolist(), alone)
+        self.assertEqual(alone, [True] * 6 + [False] * 5)
+        self.assertEqual(values.tolist(), [int(key) for key in keys[:6]])
+
+
+class KeyIndexTest(unittest.TestCase):
+    def test_mixed_chunks(self):
+        for cls in (SortedKeyIndex, DiskKeyIndex):
+            with self.subTest(index=cls.__name__):
+                index = _index(cls, [BIG, '5', '0'])
+                try:
+                    found = index.contains(pd.Series([BIG, 'abc', '5', '-0', '05', None]))
+                    np.testing.assert_array_equal(found, [True, False, True, False, False, False])
+                    np.testing.assert_array_equal(index.contains(pd.Series([BIG])), [True])
+                finally:
+                    index.close()
+
+    def test_text_and_integer_chunks(self):
+        for cls in (SortedKeyIndex, DiskKeyIndex):
+            with self.subTest(index=cls.__name__):
+                index = _index(cls, ['12', BIG], ['A-1', '0012'])
+                try:
+                    found = index.contains(pd.Series(['12', BIG, 'A-1', '0012', '012', '-0']))
+                    np.testing.assert_array_equal(found, [True, True, True, True, False, False])
+                finally:
+                    index.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
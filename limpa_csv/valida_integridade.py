@@ -0,0 +1,256 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from valida_pedidos import CHUNK_SIZE, MAX_MEMORY_BYTES, new_key_index
+
+def load_schema(schema_file):
+    """
+    Lê o esquema de tabelas e chaves estrangeiras de um arquivo JSON. Formato:
+
+        {
+          "tables": {
+            "orders": {"file": "orders.csv"},
+            "order_items": {
+              "file": "order_items.csv",
+              "foreign_keys": {
+                "order_id": "orders.order_id",
+                "product_id": {"references": "products.product_id", "nullable": true}
+              }
+            }
+          }
+        }
+
+    Os caminhos são relativos à pasta do esquema. "output" define o arquivo limpo de
+    uma tabela (padrão: <arquivo>_validated.csv); com "nullable", valores vazios na
+    coluna não contam como órfãos.
+
+    Returns:
+        dict: Nome da tabela -> {'file', 'output', 'foreign_keys': [{'column', 'table', 'references', 'nullable'}]}
+
+    Raises:
+        ValueError: Se o esquema estiver malformado ou citar uma tabela que não existe.
+    """
+    with open(schema_file, 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(schema_file))
+
+    tables = {}
+    for name, spec in schema.get('tables', {}).items():
+        if 'file' not in spec:
+            raise ValueError(f"A tabela '{name}' não tem o campo 'file'.")
+        path = os.path.join(base_dir, spec['file'])
+        foreign_keys = []
+        for column, reference in spec.get('foreign_keys', {}).items():
+            if isinstance(reference, str):
+                reference = {'references': reference}
+            parent, _, parent_column = reference['references'].partition('.')
+            if not parent_column:
+                raise ValueError(f"Referência inválida em {name}.{column}: use 'tabela.coluna'.")
+            foreign_keys.append({'column': column, 'table': parent, 'references': parent_column,
+                                 'nullable': bool(reference.get('nullable', False))})
+        tables[name] = {
+            'file': path,
+            'output': os.path.join(base_dir, spec['output']) if 'output' in spec else path.replace('.csv', '_validated.csv'),
+            'foreign_keys': foreign_keys
+        }
+
+    for name, table in tables.items():
+        for fk in table['foreign_keys']:
+            if fk['table'] not in tables:
+                raise ValueError(f"{name}.{fk['column']} referencia a tabela '{fk['table']}', que não está no esquema.")
+    return tables
+
+def _levels(tables):
+    """
+    Ordena as tabelas em níveis: cada tabela só depende das de níveis anteriores, então
+    as tabelas de um mesmo nível são independentes e podem ser processadas em paralelo.
+
+    Raises:
+        ValueError: Se as chaves estrangeiras formarem um ciclo.
+    """
+    pending = {name: {fk['table'] for fk in table['foreign_keys']} for name, table in tables.items()}
+    done = set()
+    levels = []
+    while pending:
+        level = sorted(name for name, parents in pending.items() if parents <= done)
+        if not level:
+            # Descarta as tabelas que só dependem do ciclo, sem fazer parte dele
+            cycle = dict(pending)
+            while True:
+                referenced = set().union(*cycle.values())
+                leaves = [name for name in cycle if name not in referenced]
+                if not leaves:
+                    break
+                for name in leaves:
+                    del cycle[name]
+            raise ValueError(f"As chaves estrangeiras formam um ciclo entre: {', '.join(sorted(cycle))}.")
+        levels.append(level)
+        done.update(level)
+        for name in level:
+            del pending[name]
+    return levels
+
+def _process_table(name, table, parent_indexes, key_columns, chunk_size, mode, max_memory, temp_dir):
+    """
+    Lê uma tabela uma única vez: remove as linhas com chaves estrangeiras órfãs, grava
+    o arquivo limpo e, ao mesmo tempo, indexa as colunas que outras tabelas referenciam
+    (só com as linhas mantidas, então a limpeza se propaga em cascata).
+    Tabelas sem chaves estrangeiras só têm as colunas referenciadas lidas.
+    Executado no processo principal ou em um processo do pool.
+
+    Args:
+        name (str): Nome da tabela.
+        table (dict): Definição da tabela, como em load_schema.
+        parent_indexes (dict): (tabela, coluna) -> índice das chaves referenciadas por esta tabela.
+        key_columns (list): Colunas desta tabela referenciadas por outras.
+
+    Returns:
+        tuple: (resumo da tabela, dict coluna -> índice construído)
+    """
+    foreign_keys = table['foreign_keys']
+    indexes = {column: new_key_index(table['file'], mode, max_memory, temp_dir) for column in key_columns}
+    orphans = {fk['column']: 0 for fk in foreign_keys}
+    total_rows = 0
+    removed_rows = 0
+
+    output = open(table['output'], 'w', encoding='utf-8', newline='') if foreign_keys else None
+    try:
+        # Os valores são lidos como texto, então as linhas mantidas são gravadas como estavam
+        for chunk in pd.read_csv(table['file'], dtype=str, chunksize=chunk_size,
+                                 usecols=None if foreign_keys else key_columns):
+            keep = np.ones(len(chunk), dtype=bool)
+            for fk in foreign_keys:
+                values = chunk[fk['column']]
+                valid = parent_indexes[(fk['table'], fk['references'])].contains(values)
+                if fk['nullable']:
+                    valid |= values.isna().to_numpy()
+                orphans[fk['column']] += int((~valid).sum())
+                keep &= valid
+
+            chunk_cleaned = chunk[keep]
+            if output is not None:
+                chunk_cleaned.to_csv(output, index=False, header=total_rows == 0, lineterminator='\n')
+            for column, index in indexes.items():
+                index.add(chunk_cleaned[column])
+
+            total_rows += len(chunk)
+            removed_rows += len(chunk) - len(chunk_cleaned)
+    finally:
+        if output is not None:
+            output.close()
+    for index in indexes.values():
+        index.finish()
+
+    summary = {
+        'table': name,
+        'output_file': table['output'] if foreign_keys else None,
+        'total_rows': total_rows,
+        'removed_rows': removed_rows,
+        'orphans': [{'column': fk['column'], 'references': f"{fk['table']}.{fk['references']}",
+                     'orphan_rows': orphans[fk['column']]} for fk in foreign_keys]
+    }
+    return summary, indexes
+
+def validate_schema(schema_file, workers=1, chunk_size=CHUNK_SIZE, mode='auto', max_memory=MAX_MEMORY_BYTES,
+                    report_file=None):
+    """
+    Valida todas as chaves estrangeiras de um esquema (ver load_schema) e grava, para cada
+    tabela com chaves estrangeiras, um arquivo sem as linhas órfãs.
+    Cada arquivo é lido uma única vez e o índice de cada coluna referenciada é construído
+    uma vez e reutilizado por todas as tabelas que a referenciam. As tabelas são processadas
+    em ordem de dependência (uma linha que referencia uma linha removida também é removida),
+    e as de um mesmo nível, que não dependem umas das outras, em paralelo.
+
+    Args:
+        schema_file (str): Arquivo JSON do esquema.
+        workers (int): Número de processos para as tabelas independentes. Padrão: 1.
+        chunk_size (int): Linhas por pedaço.
+        mode (str): Índice das chaves: 'memory', 'disk' ou 'auto' (ver valida_pedidos.new_key_index).
+        max_memory (int): Limite de memória, em bytes, de cada índice no modo 'auto'.
+        report_file (str, optional): Relatório CSV de órfãos por relacionamento.
+            Padrão: <esquema>_relatorio.csv.
+
+    Returns:
+        list: Resumo de cada tabela processada, ou None em caso de erro.
+    """
+    try:
+        tables = load_schema(schema_file)
+        levels = _levels(tables)
+        # Colunas de cada tabela referenciadas por outras (cada uma indexada uma só vez)
+        key_columns = {name: [] for name in tables}
+        for table in tables.values():
+            for fk in table['foreign_keys']:
+                if fk['references'] not in key_columns[fk['table']]:
+                    key_columns[fk['table']].append(fk['references'])
+
+        print(f"Validando {len(tables)} tabelas em {len(levels)} níveis de dependência...")
+        temp_dir = tempfile.mkdtemp(prefix='valida_integridade_')
+        indexes = {}
+        summaries = []
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            for level in levels:
+                # Tabelas sem chaves estrangeiras que ninguém referencia não têm nada a fazer
+                tasks = [(name, tables[name],
+                          {(fk['table'], fk['references']): indexes[(fk['table'], fk['references'])]
+                           for fk in tables[name]['foreign_keys']},
+                          key_columns[name], chunk_size, mode, max_memory, temp_dir)
+                         for name in level if tables[name]['foreign_keys'] or key_columns[name]]
+                if executor is not None and len(tasks) > 1:
+                    results = [future.result() for future in [executor.submit(_process_table, *task) for task in tasks]]
+                else:
+                    results = [_process_table(*task) for task in tasks]
+
+                for summary, built in results:
+                    for column, index in built.items():
+                        indexes[(summary['table'], column)] = index
+                    summaries.append(summary)
+                    print(f"  {summary['table']}: {summary['removed_rows']} de {summary['total_rows']} linhas removidas")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            for index in indexes.values():
+                index.close()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        # Relatório: linhas órfãs por relacionamento (uma linha pode ser órfã em mais de um)
+        report_file = report_file or os.path.splitext(schema_file)[0] + '_relatorio.csv'
+        report = pd.DataFrame([{'table': summary['table'], 'column': fk['column'], 'references': fk['references'],
+                                'total_rows': summary['total_rows'], 'orphan_rows': fk['orphan_rows']}
+                               for summary in summaries for fk in summary['orphans']],
+                              columns=['table', 'column', 'references', 'total_rows', 'orphan_rows'])
+        report.to_csv(report_file, index=False, lineterminator='\n')
+
+        print("\nValidação concluída.")
+        for row in report.itertuples():
+            print(f"  {row.table}.{row.column} -> {row.references}: {row.orphan_rows} órfãs")
+        print(f"Relatório salvo como: {report_file}")
+        return summaries
+
+    except FileNotFoundError as e:
+        print(f"Erro: O arquivo '{e.filename}' não foi encontrado.")
+    except Exception as e:
+        print(f"Ocorreu um erro: {e}")
+
+# --- Execução do Script ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Valida as chaves estrangeiras de várias tabelas CSV a partir de um esquema JSON.",
+        epilog="Exemplo: python valida_integridade.py esquema_exemplo.json")
+    parser.add_argument('esquema', help="Arquivo JSON com as tabelas e chaves estrangeiras.")
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help="Número de processos para tabelas independentes (0 = um por núcleo). Padrão: 1.")
+    parser.add_argument('--modo', choices=['auto', 'memory', 'disk'], default='auto',
+                        help="Índice das chaves: em memória, em disco (Bloom + SQLite) ou automático. Padrão: auto.")
+    parser.add_argument('--memoria-mb', type=int, default=MAX_MEMORY_BYTES // 1024 ** 2,
+                        help="Memória máxima de cada índice no modo automático, em MB. Padrão: 512.")
+    parser.add_argument('--relatorio', help="Arquivo CSV do relatório. Padrão: <esquema>_relatorio.csv.")
+    args = parser.parse_args()
+    validate_schema(args.esquema, args.workers or os.cpu_count() or 1, mode=args.modo,
+                    max_memory=args.memoria_mb * 1024 ** 2, report_file=args.relatorio)
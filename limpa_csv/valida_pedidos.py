@@ -1,54 +1,355 @@
+import argparse
+import math
+import os
+import shutil
+import sqlite3
+import tempfile
+import numpy as np
 import pandas as pd
-import sys
 from tqdm import tqdm
 
-def validate_and_clean_order_items(orders_file, order_items_file):
+# Linhas lidas por pedaço (chunk) de cada arquivo
+CHUNK_SIZE = 500_000
+# Acima desta estimativa de memória para as chaves de orders, o modo 'auto' usa o índice em disco
+MAX_MEMORY_BYTES = 512 * 1024 * 1024
+# Taxa de falsos positivos do filtro de Bloom do modo em disco (os positivos são sempre verificados)
+BLOOM_ERROR_RATE = 0.01
+# Bytes do início do arquivo usados para estimar o número de linhas
+SAMPLE_BYTES = 64 * 1024
+# Limites de int64 em texto (sem o sinal), para saber se uma chave de 19 dígitos cabe
+INT64_MAX_TEXT = str(np.iinfo(np.int64).max)
+INT64_MIN_TEXT = str(np.iinfo(np.int64).min)[1:]
+
+def _integer_keys(keys):
+    """
+    Separa as chaves que são inteiros na forma canônica (sem zeros à esquerda, espaços
+    nem sinal de +), que podem ser guardadas como int64 sem mudar a comparação textual.
+
+    Args:
+        keys (pd.Series): Chaves em texto, sem valores ausentes.
+
+    Returns:
+        tuple: (máscara das chaves inteiras, seus valores em int64)
+    """
+    text = keys.to_numpy(dtype=str)
+    try:
+        mask = np.ones(len(text), dtype=bool)
+        values = text.astype(np.int64)
+    except (ValueError, OverflowError):
+        # Há chaves que não são inteiros ou não cabem em int64: só as outras são convertidas
+        magnitude = keys.str.removeprefix('-')
+        limit = np.where(keys.str.startswith('-').to_numpy(dtype=bool), INT64_MIN_TEXT, INT64_MAX_TEXT)
+        length = magnitude.str.len().to_numpy()
+        # Com 19 dígitos, a comparação textual equivale à numérica
+        fits = (length < 19) | ((length == 19) & (magnitude.to_numpy(dtype=str) <= limit))
+        mask = keys.str.fullmatch(r'-?\d+').to_numpy(dtype=bool) & fits
+        values = text[mask].astype(np.int64)
+    # A conversão aceita formas como '007', '+7' ou '-0'; a chave só é inteira se o texto volta igual
+    canonical = values.astype(str) == text[mask]
+    mask[mask] = canonical
+    return mask, values[canonical]
+
+def _as_bytes(keys):
+    """Codifica as chaves em um array de bytes de largura fixa, ordenável e compacto."""
+    encoded = keys.str.encode('utf-8')
+    width = max(int(encoded.str.len().max()), 1) if len(encoded) else 1
+    return np.array(encoded.tolist(), dtype=f'S{width}')
+
+class SortedKeyIndex:
+    """
+    Índice exato de chaves em memória: um array numpy ordenado e sem repetições,
+    consultado por busca binária. Chaves inteiras ocupam 8 bytes cada (int64);
+    as demais, o tamanho da maior chave em bytes.
+    """
+    mode = 'memory'
+
+    def __init__(self):
+        self._parts = []
+        self._keys = None
+
+    def add(self, keys):
+        """Acrescenta um pedaço de chaves (pd.Series de texto) ao índice."""
+        keys = keys.dropna()
+        integers, values = _integer_keys(keys)
+        if integers.all():
+            self._parts.append(np.unique(values))
+        else:
+            self._parts.append(np.unique(_as_bytes(keys)))
+
+    def finish(self):
+        """Junta os pedaços em um único array ordenado."""
+        if self._parts and all(part.dtype == np.int64 for part in self._parts):
+            self._keys = np.unique(np.concatenate(self._parts))
+        else:
+            # Algum pedaço tem chaves de texto: os inteiros voltam para texto (a forma canônica não muda)
+            parts = [_as_bytes(pd.Series(part.astype(str))) if part.dtype == np.int64 else part
+                     for part in self._parts]
+            width = max((part.dtype.itemsize for part in parts), default=1)
+            self._keys = np.unique(np.concatenate([part.astype(f'S{width}') for part in parts])) \
+                if parts else np.array([], dtype='S1')
+        self._parts = []
+
+    def close(self):
+        """Nada a liberar: o índice fica só em memória."""
+
+    @property
+    def nbytes(self):
+        return self._keys.nbytes
+
+    def __len__(self):
+        return len(self._keys)
+
+    def contains(self, keys):
+        """
+        Verifica quais chaves existem no índice.
+
+        Args:
+            keys (pd.Series): Chaves em texto (valores ausentes nunca existem).
+
+        Returns:
+            np.ndarray: Máscara booleana, True para as chaves encontradas.
+        """
+        found = np.zeros(len(keys), dtype=bool)
+        present = keys.notna().to_numpy()
+        if self._keys.dtype == np.int64:
+            # Só chaves inteiras canônicas podem estar em um índice de inteiros
+            candidates = present.copy()
+            candidates[present], values = _integer_keys(keys[present])
+        else:
+            # Chaves maiores que a maior chave do índice não podem estar nele (e seriam truncadas)
+            encoded = keys[present].str.encode('utf-8')
+            candidates = present.copy()
+            candidates[present] = (encoded.str.len() <= self._keys.dtype.itemsize).to_numpy()
+            values = np.array(keys[candidates].str.encode('utf-8').tolist(), dtype=self._keys.dtype)
+        if len(self._keys) and len(values):
+            positions = np.minimum(np.searchsorted(self._keys, values), len(self._keys) - 1)
+            found[candidates] = self._keys[positions] == values
+        return found
+
+class DiskKeyIndex:
+    """
+    Índice exato de chaves para conjuntos que não cabem na memória: um filtro de Bloom
+    (em memória, alguns bits por chave) descarta de imediato as chaves ausentes, e as
+    que passam por ele são verificadas em uma tabela SQLite em disco.
+    O índice pode ser enviado a outros processos (pickle): a cópia leva o filtro e
+    abre o mesmo banco, mas só o processo que o criou apaga o banco em close().
+    """
+    mode = 'disk'
+
+    def __init__(self, expected_keys, error_rate=BLOOM_ERROR_RATE, temp_dir=None):
+        """
+        Args:
+            expected_keys (int): Estimativa do número de chaves, para dimensionar o filtro.
+            error_rate (float): Taxa de falsos positivos do filtro.
+            temp_dir (str, optional): Onde criar o banco temporário. Padrão: pasta temporária do sistema.
+        """
+        expected_keys = max(int(expected_keys), 1)
+        self._bits = max(int(-expected_keys * math.log(error_rate) / math.log(2) ** 2), 64)
+        self._hashes = max(int(round(self._bits / expected_keys * math.log(2))), 1)
+        self._filter = np.zeros((self._bits + 7) // 8, dtype=np.uint8)
+
+        self._dir = tempfile.mkdtemp(prefix='valida_pedidos_', dir=temp_dir)
+        self._owner = True
+        self._count = 0
+        self._conn = None
+        self._db().execute('CREATE TABLE keys (key TEXT PRIMARY KEY) WITHOUT ROWID')
+
+    def _db(self):
+        """Conexão com o banco, aberta no primeiro uso (na thread que vai usá-la)."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(os.path.join(self._dir, 'keys.db'))
+            self._conn.execute('PRAGMA synchronous = OFF')
+            self._conn.execute('PRAGMA journal_mode = OFF')
+            self._conn.execute('CREATE TEMP TABLE probe (key TEXT)')
+        return self._conn
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._owner = False
+
+    def _positions(self, keys):
+        """Posições dos bits de cada chave no filtro (hash duplo), com forma (hashes, chaves)."""
+        values = keys.to_numpy(dtype=object)
+        h1 = pd.util.hash_array(values, hash_key='valida_pedidos_1')
+        h2 = pd.util.hash_array(values, hash_key='valida_pedidos_2') | np.uint64(1)
+        steps = np.arange(self._hashes, dtype=np.uint64)[:, None]
+        return (h1[None, :] + steps * h2[None, :]) % np.uint64(self._bits)
+
+    def add(self, keys):
+        """Acrescenta um pedaço de chaves (pd.Series de texto) ao filtro e à tabela."""
+        keys = keys.dropna()
+        positions = self._positions(keys).ravel()
+        np.bitwise_or.at(self._filter, positions >> np.uint64(3),
+                         (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)))
+        self._db().executemany('INSERT OR IGNORE INTO keys VALUES (?)', ((key,) for key in keys.tolist()))
+
+    def finish(self):
+        self._db().commit()
+        self._count = self._db().execute('SELECT COUNT(*) FROM keys').fetchone()[0]
+
+    @property
+    def nbytes(self):
+        return self._filter.nbytes
+
+    def __len__(self):
+        return self._count
+
+    def contains(self, keys):
+        """
+        Verifica quais chaves existem no índice: o filtro elimina a maioria das ausentes
+        e as restantes são conferidas na tabela em disco, então o resultado é exato.
+
+        Args:
+            keys (pd.Series): Chaves em texto (valores ausentes nunca existem).
+
+        Returns:
+            np.ndarray: Máscara booleana, True para as chaves encontradas.
+        """
+        found = np.zeros(len(keys), dtype=bool)
+        present = keys.notna().to_numpy()
+        if not present.any():
+            return found
+        positions = self._positions(keys[present])
+        bits = (self._filter[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        maybe = present.copy()
+        maybe[present] = bits.all(axis=0)
+
+        candidates = keys[maybe].unique().tolist()
+        if candidates:
+            conn = self._db()
+            conn.execute('DELETE FROM probe')
+            conn.executemany('INSERT INTO probe VALUES (?)', ((key,) for key in candidates))
+            confirmed = [row[0] for row in conn.execute('SELECT key FROM probe JOIN keys USING (key)')]
+            found[maybe] = keys[maybe].isin(confirmed).to_numpy()
+        return found
+
+    def close(self):
+        """Fecha o banco temporário e o apaga, se este processo o criou."""
+        if self._conn is not None:
+            self._conn.close()
+        if self._owner:
+            shutil.rmtree(self._dir, ignore_errors=True)
+
+def _estimate_rows(path):
+    """Estima o número de linhas de dados de um arquivo a partir do tamanho médio das primeiras linhas."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        sample = f.read(SAMPLE_BYTES)
+    lines = max(sample.count(b'\n'), 1)
+    return int(size / (len(sample) / lines)) if sample else 0
+
+def new_key_index(path, mode='auto', max_memory=MAX_MEMORY_BYTES, temp_dir=None):
+    """
+    Cria um índice vazio para as chaves de um arquivo, do tipo adequado ao seu tamanho.
+
+    Args:
+        path (str): Arquivo CSV de onde virão as chaves (usado para estimar quantas são).
+        mode (str): 'memory' (SortedKeyIndex), 'disk' (DiskKeyIndex) ou 'auto', que
+            escolhe 'disk' quando a estimativa de memória das chaves passa de max_memory.
+        max_memory (int): Limite de memória, em bytes, do modo 'auto'.
+        temp_dir (str, optional): Pasta do banco temporário do modo 'disk'.
+
+    Returns:
+        SortedKeyIndex ou DiskKeyIndex: O índice, a ser preenchido com add() e finish().
+    """
+    expected_keys = _estimate_rows(path)
+    if mode == 'auto':
+        # Pior caso: chaves de texto, com uns 32 bytes cada
+        mode = 'disk' if expected_keys * 32 > max_memory else 'memory'
+    return DiskKeyIndex(expected_keys, temp_dir=temp_dir) if mode == 'disk' else SortedKeyIndex()
+
+def build_key_index(path, column, mode='auto', chunk_size=CHUNK_SIZE, max_memory=MAX_MEMORY_BYTES, temp_dir=None):
+    """
+    Lê só a coluna de chave de um arquivo, em pedaços, e monta o índice das chaves.
+
+    Args:
+        path (str): Arquivo CSV com as chaves (por exemplo, orders.csv).
+        column (str): Coluna da chave (por exemplo, 'order_id').
+        mode (str): Tipo de índice: 'memory', 'disk' ou 'auto' (ver new_key_index).
+        chunk_size (int): Linhas por pedaço.
+        max_memory (int): Limite de memória, em bytes, do modo 'auto'.
+        temp_dir (str, optional): Pasta do banco temporário do modo 'disk'.
+
+    Returns:
+        SortedKeyIndex ou DiskKeyIndex: O índice pronto para consultas.
+    """
+    index = new_key_index(path, mode, max_memory, temp_dir)
+    try:
+        for chunk in pd.read_csv(path, usecols=[column], dtype=str, chunksize=chunk_size):
+            index.add(chunk[column])
+        index.finish()
+    except BaseException:
+        index.close()
+        raise
+    return index
+
+def validate_and_clean_order_items(orders_file, order_items_file, mode='auto', chunk_size=CHUNK_SIZE,
+                                   max_memory=MAX_MEMORY_BYTES):
     """
     Lê os arquivos orders.csv e order_items.csv, e remove de order_items as
     linhas cujos order_id não existem em orders.
-    Exibe uma barra de progresso durante o processo.
+    De orders só a coluna order_id é lida, para um índice compacto; order_items é
+    lido em pedaços, filtrado e gravado aos poucos, então a memória não depende do
+    tamanho de order_items. Exibe uma barra de progresso durante o processo.
 
     Args:
         orders_file (str): O caminho para o arquivo orders.csv.
         order_items_file (str): O caminho para o arquivo order_items.csv.
+        mode (str): Índice das chaves: 'memory', 'disk' ou 'auto' (ver build_key_index).
+        chunk_size (int): Linhas por pedaço.
+        max_memory (int): Limite de memória, em bytes, das chaves no modo 'auto'.
+
+    Returns:
+        dict: Resumo (arquivo de saída, linhas lidas, linhas removidas e modo do índice),
+            ou None em caso de erro.
     """
     try:
         print("Iniciando a validação de chaves...")
 
-        # Lê os arquivos orders e order_items
-        df_orders = pd.read_csv(orders_file)
-        df_order_items = pd.read_csv(order_items_file)
-        
-        # Converte as colunas de ID para string para evitar problemas de tipo
-        df_orders['order_id'] = df_orders['order_id'].astype(str)
-        df_order_items['order_id'] = df_order_items['order_id'].astype(str)
-
-        # Obtém todos os IDs de pedidos válidos da tabela orders
-        valid_order_ids = set(df_orders['order_id'].tolist())
+        # Lê apenas os IDs de pedidos válidos da tabela orders
+        index = build_key_index(orders_file, 'order_id', mode, chunk_size, max_memory)
+        print(f"{len(index)} pedidos válidos indexados (modo {index.mode}, {index.nbytes / 1024 ** 2:.1f} MB).")
 
         print("Validando itens de pedido...")
 
-        # Prepara a barra de progresso para o processamento
-        tqdm.pandas(desc="Removendo IDs inválidos")
-        
-        # Remove as linhas de df_order_items que não têm um order_id válido
-        # O apply com tqdm.pandas mostra o progresso da operação
-        df_order_items_cleaned = df_order_items[df_order_items['order_id'].isin(valid_order_ids)]
-
-        print("\nProcessamento concluído.")
-        
-        # Calcula o número de linhas removidas
-        removed_rows = len(df_order_items) - len(df_order_items_cleaned)
-        
         # Cria o nome do novo arquivo de saída
         output_file = order_items_file.replace('.csv', '_validated.csv')
-        
-        # Salva o DataFrame limpo em um novo arquivo CSV
-        df_order_items_cleaned.to_csv(output_file, index=False)
-        
+
+        total_rows = 0
+        removed_rows = 0
+        try:
+            # Os valores são lidos como texto, então as linhas válidas são gravadas como estavam
+            with open(order_items_file, 'rb') as source, \
+                    open(output_file, 'w', encoding='utf-8', newline='') as output, \
+                    tqdm(total=os.path.getsize(order_items_file), unit='B', unit_scale=True,
+                         desc="Removendo IDs inválidos") as pbar:
+                for chunk in pd.read_csv(source, dtype=str, chunksize=chunk_size):
+                    # Remove as linhas do pedaço que não têm um order_id válido
+                    chunk_cleaned = chunk[index.contains(chunk['order_id'])]
+                    chunk_cleaned.to_csv(output, index=False, header=total_rows == 0, lineterminator='\n')
+
+                    total_rows += len(chunk)
+                    removed_rows += len(chunk) - len(chunk_cleaned)
+                    pbar.update(source.tell() - pbar.n)
+        finally:
+            index.close()
+
+        print("\nProcessamento concluído.")
         print(f"Arquivo limpo salvo como: {output_file}")
         print(f"Linhas removidas: {removed_rows}")
-    
+
+        return {
+            'output_file': output_file,
+            'total_rows': total_rows,
+            'removed_rows': removed_rows,
+            'index_mode': index.mode
+        }
+
     except FileNotFoundError:
         print("Erro: Um dos arquivos não foi encontrado.")
         print("Certifique-se de que 'orders_null_removed.csv' e 'order_items.csv' estão na mesma pasta.")
@@ -57,10 +358,15 @@ def validate_and_clean_order_items(orders_file, order_items_file):
 
 # --- Execução do Script ---
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Uso: python valida_pedidos.py orders_file.csv order_items_file.csv")
-        print("Exemplo: python valida_pedidos.py orders_null_removed.csv order_items.csv")
-    else:
-        orders_file_name = sys.argv[1]
-        order_items_file_name = sys.argv[2]
-        validate_and_clean_order_items(orders_file_name, order_items_file_name)
\ No newline at end of file
+    parser = argparse.ArgumentParser(
+        description="Remove de order_items as linhas cujo order_id não existe em orders.",
+        epilog="Exemplo: python valida_pedidos.py orders_null_removed.csv order_items.csv")
+    parser.add_argument('orders_file', help="Arquivo orders.csv.")
+    parser.add_argument('order_items_file', help="Arquivo order_items.csv.")
+    parser.add_argument('--modo', choices=['auto', 'memory', 'disk'], default='auto',
+                        help="Índice dos order_id: em memória, em disco (Bloom + SQLite) ou automático. Padrão: auto.")
+    parser.add_argument('--memoria-mb', type=int, default=MAX_MEMORY_BYTES // 1024 ** 2,
+                        help="Memória máxima das chaves no modo automático, em MB. Padrão: 512.")
+    args = parser.parse_args()
+    validate_and_clean_order_items(args.orders_file, args.order_items_file, args.modo,
+                                   max_memory=args.memoria_mb * 1024 ** 2)